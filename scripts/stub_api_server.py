@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Anthropic API, for trying Code Tutor without an API key.
+
+Serves the endpoints the exercise commands use -- messages and Message
+Batches -- with canned replies, so commands such as 'exercise submit-batch'
+can be run end to end against it. Start it with:
+
+    python scripts/stub_api_server.py --port 8765
+
+and point Code Tutor at it by setting "api": {"base_url": "http://127.0.0.1:8765"}
+in ~/.config/code-tutor/config.json (any API key is accepted).
+
+Messages requests are answered with a fixed review (overall assessment
+GOOD), or, when a tool is forced, with a call to that tool whose input is
+filled in from the tool's schema. Batches report 'in_progress' for the
+first --polls status checks and then 'ended'. Streaming is not supported.
+"""
+
+import argparse
+import json
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+
+REVIEW_TEXT = """## Correctness
+The solution addresses the exercise requirements.
+
+## Code Quality
+Readable and clearly organized.
+
+## Understanding Demonstrated
+The learner understands the core concepts of the exercise.
+
+## Suggestions
+Consider adding a few more edge-case checks.
+
+## Overall Assessment
+GOOD
+A solid submission (stub review)."""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _stub_value(schema: Dict[str, Any]) -> Any:
+    """Build a placeholder value matching a JSON schema."""
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: _stub_value(prop) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [_stub_value(schema.get("items", {"type": "string"}))]
+    if kind == "boolean":
+        return True
+    if kind in ("integer", "number"):
+        return 1
+    return "stub"
+
+
+def _message(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the reply to a messages request."""
+    content: List[Dict[str, Any]]
+    tool_choice = params.get("tool_choice") or {}
+    tools = {tool["name"]: tool for tool in params.get("tools", [])}
+
+    if tool_choice.get("type") == "tool" and tool_choice.get("name") in tools:
+        tool = tools[tool_choice["name"]]
+        content = [{
+            "type": "tool_use",
+            "id": f"toolu_{uuid.uuid4().hex[:24]}",
+            "name": tool["name"],
+            "input": _stub_value(tool.get("input_schema", {})),
+        }]
+        stop_reason = "tool_use"
+    else:
+        content = [{"type": "text", "text": REVIEW_TEXT}]
+        stop_reason = "end_turn"
+
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": params.get("model", "stub"),
+        "content": content,
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": {"input_tokens": 10, "output_tokens": 10},
+    }
+
+
+class StubState:
+    """Batches created so far, shared by the request handler threads."""
+
+    def __init__(self, polls: int, fail: List[str]):
+        self.polls = polls
+        self.fail = set(fail)
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Request handler for the stub API."""
+
+    state: StubState
+
+    def do_POST(self) -> None:
+        body = self._read_json()
+        if body is None:
+            return
+
+        path = urlsplit(self.path).path
+        if path == "/v1/messages":
+            if body.get("stream"):
+                self._error(400, "Streaming is not supported by the stub server")
+                return
+            self._send_json(_message(body))
+        elif path == "/v1/messages/batches":
+            self._send_json(self._create_batch(body.get("requests", [])))
+        else:
+            self._error(404, f"Unknown endpoint: {self.path}")
+
+    def do_GET(self) -> None:
+        parts = urlsplit(self.path).path.strip("/").split("/")
+        if parts[:3] != ["v1", "messages", "batches"] or len(parts) not in (4, 5):
+            self._error(404, f"Unknown endpoint: {self.path}")
+            return
+
+        with self.state.lock:
+            batch = self.state.batches.get(parts[3])
+            if batch is None:
+                self._error(404, f"Unknown batch: {parts[3]}")
+                return
+            if len(parts) == 4:
+                self._send_json(self._poll(batch))
+            else:
+                self._send_results(batch)
+
+    def _create_batch(self, requests: List[Dict[str, Any]]) -> Dict[str, Any]:
+        batch_id = f"msgbatch_{uuid.uuid4().hex[:24]}"
+        created = datetime.now(timezone.utc)
+        host, port = self.server.server_address[:2]
+        batch = {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "in_progress",
+            "request_counts": {
+                "processing": len(requests),
+                "succeeded": 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": created.isoformat(),
+            "expires_at": (created + timedelta(days=1)).isoformat(),
+            "ended_at": None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": None,
+            "_results_url": f"http://{host}:{port}/v1/messages/batches/{batch_id}/results",
+            "_requests": requests,
+            "_polls": 0,
+        }
+        with self.state.lock:
+            self.state.batches[batch_id] = batch
+        return self._public(batch)
+
+    def _poll(self, batch: Dict[str, Any]) -> Dict[str, Any]:
+        batch["_polls"] += 1
+        if batch["processing_status"] != "ended" and batch["_polls"] > self.state.polls:
+            errored = sum(
+                1 for request in batch["_requests"] if request["custom_id"] in self.state.fail
+            )
+            batch["processing_status"] = "ended"
+            batch["ended_at"] = _now()
+            batch["results_url"] = batch["_results_url"]
+            batch["request_counts"].update(
+                processing=0, errored=errored, succeeded=len(batch["_requests"]) - errored
+            )
+        return self._public(batch)
+
+    def _send_results(self, batch: Dict[str, Any]) -> None:
+        if batch["processing_status"] != "ended":
+            self._error(400, "Batch has not ended yet")
+            return
+
+        lines = []
+        for request in batch["_requests"]:
+            if request["custom_id"] in self.state.fail:
+                result = {
+                    "type": "errored",
+                    "error": {
+                        "type": "error",
+                        "error": {"type": "api_error", "message": "Stub failure"},
+                    },
+                }
+            else:
+                result = {"type": "succeeded", "message": _message(request["params"])}
+            lines.append(json.dumps({"custom_id": request["custom_id"], "result": result}))
+
+        self._send(200, "\n".join(lines).encode("utf-8"), "application/binary")
+
+    @staticmethod
+    def _public(batch: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in batch.items() if not key.startswith("_")}
+
+    def _read_json(self) -> Optional[Dict[str, Any]]:
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._error(400, "Request body is not valid JSON")
+            return None
+
+    def _send_json(self, data: Dict[str, Any]) -> None:
+        self._send(200, json.dumps(data).encode("utf-8"), "application/json")
+
+    def _error(self, status: int, message: str) -> None:
+        error = {"type": "error", "error": {"type": "invalid_request_error", "message": message}}
+        self._send(status, json.dumps(error).encode("utf-8"), "application/json")
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    polls: int = 1,
+    fail: Optional[List[str]] = None,
+) -> ThreadingHTTPServer:
+    """Create a stub server; call serve_forever() on it, e.g. from a thread.
+
+    Args:
+        host: Interface to listen on.
+        port: Port to listen on, or 0 for any free port (see server_address).
+        polls: Status checks that report a batch as still in progress.
+        fail: Custom IDs of batch requests to report as errored.
+
+    Returns:
+        The HTTP server.
+    """
+    handler = type("Handler", (StubHandler,), {"state": StubState(polls, fail or [])})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument(
+        "--polls", type=int, default=1,
+        help="Status checks that report a batch as still in progress (default: 1)",
+    )
+    parser.add_argument(
+        "--fail", action="append", default=[], metavar="CUSTOM_ID",
+        help="Report this batch request as errored (repeatable), e.g. submission-0001",
+    )
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.polls, args.fail)
+    print(f"Stub Anthropic API listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,7 @@ setup(
     package_dir={"": "src"},
     install_requires=[
         "click>=8.1.0",
-        "anthropic>=0.18.0",
+        "anthropic>=0.40.0",
         "rich>=13.0.0",
     ],
     entry_points={
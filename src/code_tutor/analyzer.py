@@ -1,22 +1,87 @@
 """Code analysis using Claude API."""
 
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Tuple
 import anthropic
 
+from .client import USAGE_FIELDS, ApiCallListener, create_message, get_client
+from .conversation_history import ConversationHistory
+from .response_cache import ResponseCache
+from .structured_output import StructuredResult, create_message_with_result
+
+
+@dataclass
+class ReviewQuestions(StructuredResult):
+    """Clarifying questions asked at the start of a code review."""
+
+    questions: List[str] = field(default_factory=list)
+
+    TOOL_NAME: ClassVar[str] = "ask_clarifying_questions"
+    TOOL_DESCRIPTION: ClassVar[str] = "Ask the programmer clarifying questions about their code."
+    SCHEMA: ClassVar[Dict] = {
+        "type": "object",
+        "properties": {
+            "questions": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "The clarifying questions, one per item, without numbering.",
+            },
+        },
+        "required": ["questions"],
+    }
+
+    def to_markdown(self) -> str:
+        """Get the questions as the Questions section of an analysis."""
+        return "## Questions\n\n" + "\n".join(
+            f"{i}. {question}" for i, question in enumerate(self.questions, 1)
+        )
+
 
 class CodeAnalyzer:
     """Analyzes code using Claude API with educational, respectful approach."""
 
-    def __init__(self, api_key: str, model: str = "claude-sonnet-4-5"):
+    MAX_TOKENS = 4096
+
+    # Output budget for the analysis of a single chunk of a large file
+    CHUNK_MAX_TOKENS = 2048
+
+    # Questions kept after merging the analyses of a chunked file
+    MAX_MERGED_QUESTIONS = 4
+
+    DEFAULT_CHUNK_WORKERS = 4
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "claude-sonnet-4-5",
+        cache: Optional[ResponseCache] = None,
+        client: Optional[anthropic.Anthropic] = None,
+        history_max_tokens: int = ConversationHistory.DEFAULT_MAX_TOKENS,
+        keep_recent_turns: int = ConversationHistory.DEFAULT_KEEP_RECENT_TURNS,
+        on_api_call: Optional[ApiCallListener] = None,
+    ):
         """Initialize the code analyzer.
 
         Args:
             api_key: Anthropic API key.
             model: Claude model to use.
+            cache: Optional response cache for initial analyses.
+            client: Optional Anthropic client; defaults to the shared client.
+            history_max_tokens: Token budget for conversation history; older
+                follow-up exchanges are summarized once it is exceeded.
+            keep_recent_turns: Number of most recent exchanges always kept verbatim.
+            on_api_call: Optional listener for the metrics of each API call,
+                e.g. SessionLogger.log_api_call.
         """
-        self.client = anthropic.Anthropic(api_key=api_key)
+        self.client = client or get_client(api_key)
+        self.on_api_call = on_api_call
         self.model = model
-        self.conversation_history: List[Dict[str, str]] = []
+        self.cache = cache
+        self.conversation_history = ConversationHistory(history_max_tokens, keep_recent_turns)
+        self.system: List[Dict] = []
+        self.usage: Dict[str, int] = dict.fromkeys(USAGE_FIELDS, 0)
+        self.last_output_tokens: Optional[int] = None
 
     def analyze_code(
         self,
@@ -24,6 +89,7 @@ class CodeAnalyzer:
         file_metadata: Dict,
         experience_level: str,
         preferences: Dict,
+        on_text: Optional[Callable[[str], None]] = None,
     ) -> Dict[str, any]:
         """Perform initial code analysis and generate clarifying questions.
 
@@ -32,35 +98,91 @@ class CodeAnalyzer:
             file_metadata: Metadata about the file (language, size, etc.).
             experience_level: User's programming experience level.
             preferences: User preferences (question_style, focus_areas, etc.).
+            on_text: Optional callback receiving text deltas as they stream in.
 
         Returns:
             Dictionary with questions and initial observations.
         """
-        prompt = self._build_initial_prompt(code, file_metadata, experience_level, preferences)
-
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=4096,
-                messages=[{"role": "user", "content": prompt}],
+            prompt, cache_key, content = self._begin_analysis(
+                code, file_metadata, experience_level, preferences
             )
-
-            content = response.content[0].text
+            reply_tokens = None
+            if content is not None and on_text is not None:
+                on_text(content)
+
+            if content is None:
+                content = self._create_analysis(
+                    [{"role": "user", "content": prompt}],
+                    "CodeAnalyzer.analyze_code",
+                    on_text=on_text,
+                )
+                reply_tokens = self.last_output_tokens
+                if cache_key:
+                    self.cache.put(cache_key, content)
 
             # Store in conversation history
             self.conversation_history.append({"role": "user", "content": prompt})
-            self.conversation_history.append({"role": "assistant", "content": content})
+            self.conversation_history.append(
+                {"role": "assistant", "content": content}, tokens=reply_tokens
+            )
 
             return self._parse_initial_response(content)
 
         except Exception as e:
             raise ValueError(f"Failed to analyze code: {e}")
 
+    def analyze_code_chunked(
+        self,
+        code: str,
+        file_metadata: Dict,
+        experience_level: str,
+        preferences: Dict,
+        chunks: List[Dict],
+        max_workers: int = DEFAULT_CHUNK_WORKERS,
+    ) -> Dict[str, any]:
+        """Analyze a large file chunk by chunk and merge the results.
+
+        Each chunk (see FileReader.split_into_chunks) is analyzed concurrently
+        as a standalone request, so no single request has to read and answer
+        for the whole file. The questions and observations are merged into the
+        same structure analyze_code() returns. The review continues with only
+        the chunks the merged questions refer to in the system prompt, and a
+        summary of the other chunks' observations in place of their code.
+
+        Args:
+            code: Full source code of the file.
+            file_metadata: Metadata about the file (language, size, etc.).
+            experience_level: User's programming experience level.
+            preferences: User preferences (question_style, focus_areas, etc.).
+            chunks: Chunks of the file from FileReader.split_into_chunks().
+            max_workers: Maximum number of chunks analyzed at once.
+
+        Returns:
+            Dictionary with questions and initial observations.
+        """
+        try:
+            requests = [
+                self._chunk_request(chunk, len(chunks), file_metadata, experience_level, preferences)
+                for chunk in chunks
+            ]
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                responses = list(executor.map(self._send_chunk_request, requests))
+
+            return self._finish_chunked_analysis(
+                file_metadata, experience_level, preferences, chunks, responses
+            )
+
+        except Exception as e:
+            raise ValueError(f"Failed to analyze code: {e}")
+
     def process_answers(
         self,
         answers: List[str],
         experience_level: str,
         preferences: Dict,
+        on_text: Optional[Callable[[str], None]] = None,
     ) -> Dict[str, any]:
         """Process user's answers to questions and generate feedback.
 
@@ -68,6 +190,7 @@ class CodeAnalyzer:
             answers: User's answers to the questions.
             experience_level: User's programming experience level.
             preferences: User preferences.
+            on_text: Optional callback receiving text deltas as they stream in.
 
         Returns:
             Dictionary with feedback and suggestions.
@@ -78,27 +201,32 @@ class CodeAnalyzer:
             # Add the answers to conversation history
             self.conversation_history.append({"role": "user", "content": prompt})
 
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=4096,
-                messages=self.conversation_history,
+            content = self._create_message(
+                self.conversation_history.messages(),
+                "CodeAnalyzer.process_answers",
+                on_text=on_text,
             )
 
-            content = response.content[0].text
-
             # Store response in history
-            self.conversation_history.append({"role": "assistant", "content": content})
+            self.conversation_history.append(
+                {"role": "assistant", "content": content}, tokens=self.last_output_tokens
+            )
 
             return self._parse_feedback_response(content)
 
         except Exception as e:
             raise ValueError(f"Failed to process answers: {e}")
 
-    def continue_conversation(self, user_message: str) -> str:
+    def continue_conversation(
+        self,
+        user_message: str,
+        on_text: Optional[Callable[[str], None]] = None,
+    ) -> str:
         """Continue the conversation with a follow-up question.
 
         Args:
             user_message: User's follow-up question or comment.
+            on_text: Optional callback receiving text deltas as they stream in.
 
         Returns:
             Assistant's response.
@@ -106,37 +234,463 @@ class CodeAnalyzer:
         try:
             self.conversation_history.append({"role": "user", "content": user_message})
 
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=4096,
-                messages=self.conversation_history,
+            content = self._create_message(
+                self.conversation_history.messages(),
+                "CodeAnalyzer.continue_conversation",
+                on_text=on_text,
+            )
+            self.conversation_history.append(
+                {"role": "assistant", "content": content}, tokens=self.last_output_tokens
             )
-
-            content = response.content[0].text
-            self.conversation_history.append({"role": "assistant", "content": content})
 
             return content
 
         except Exception as e:
             raise ValueError(f"Failed to continue conversation: {e}")
 
-    def _build_initial_prompt(
+    def _create_message(
+        self,
+        messages: List[Dict[str, str]],
+        call_site: str,
+        on_text: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Send messages to Claude and return the response text.
+
+        When ``on_text`` is given the response is streamed and each text delta
+        is passed to the callback as it arrives; the full text is still returned.
+        The cacheable system prompt is sent with every request and the reported
+        token usage is added to ``self.usage``.
+
+        Args:
+            messages: Conversation messages to send.
+            call_site: Name of the calling method, for API call instrumentation.
+            on_text: Optional callback for streamed text deltas.
+
+        Returns:
+            The complete response text.
+        """
+        response = create_message(
+            self.client,
+            call_site,
+            on_text=on_text,
+            on_api_call=self.on_api_call,
+            **self._message_params(messages),
+        )
+
+        self._record_usage(response.usage)
+        return response.content[0].text
+
+    def _create_analysis(
+        self,
+        messages: List[Dict[str, str]],
+        call_site: str,
+        on_text: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Request an initial analysis: streamed observations, then questions.
+
+        The observations arrive as text (streamed to ``on_text`` when given)
+        and the questions as a call to the ReviewQuestions tool, so they don't
+        depend on the model following a Markdown format. The questions are
+        appended to the text as a Questions section, giving the reply kept in
+        the history and the response cache.
+
+        Args:
+            messages: Conversation messages to send.
+            call_site: Name of the calling method, for API call instrumentation.
+            on_text: Optional callback for streamed text deltas.
+
+        Returns:
+            The analysis in the format read by _parse_initial_response().
+        """
+        result, text, responses = create_message_with_result(
+            self.client,
+            call_site,
+            ReviewQuestions,
+            self._build_questions_follow_up_prompt(),
+            on_text=on_text,
+            on_api_call=self.on_api_call,
+            **self._message_params(messages),
+        )
+
+        for response in responses:
+            self._record_usage(response.usage)
+        return self._analysis_text(result, text)
+
+    @staticmethod
+    def _analysis_text(result: Optional[ReviewQuestions], text: str) -> str:
+        """Combine the observations text and the questions of an analysis.
+
+        Args:
+            result: Questions from the tool call, or None if there was none.
+            text: Text of the response(s).
+
+        Returns:
+            The analysis text; without a tool call, the text as the model
+            wrote it (its Questions section is read by the text parser).
+        """
+        if result is None:
+            return text
+        return f"{text.strip()}\n\n{result.to_markdown()}".strip()
+
+    def _begin_analysis(
+        self,
+        code: str,
+        file_metadata: Dict,
+        experience_level: str,
+        preferences: Dict,
+    ) -> Tuple[str, Optional[str], Optional[str]]:
+        """Set up the cacheable system prompt for a new review.
+
+        Args:
+            code: Source code to analyze.
+            file_metadata: Metadata about the file.
+            experience_level: User's programming experience level.
+            preferences: User preferences.
+
+        Returns:
+            Tuple of (first-turn prompt, response cache key, cached response).
+            The cache key and cached response are None when not available.
+        """
+        prompt, cache_key = self._prepare_analysis(
+            code, file_metadata, experience_level, preferences
+        )
+        if cache_key is None:
+            return prompt, None, None
+        return prompt, cache_key, self.cache.get(cache_key)
+
+    def _prepare_analysis(
+        self,
+        code: str,
+        file_metadata: Dict,
+        experience_level: str,
+        preferences: Dict,
+    ) -> Tuple[str, Optional[str]]:
+        """Set up the system prompt for a new review without reading the cache.
+
+        Args:
+            code: Source code to analyze.
+            file_metadata: Metadata about the file.
+            experience_level: User's programming experience level.
+            preferences: User preferences.
+
+        Returns:
+            Tuple of (first-turn prompt, response cache key or None when
+            caching is disabled).
+        """
+        system_prompt = self._build_system_prompt(
+            code, file_metadata, experience_level, preferences
+        )
+        prompt = self._build_initial_prompt()
+        self.system = self._system_blocks(system_prompt)
+
+        if not self.cache:
+            return prompt, None
+
+        cache_key = ResponseCache.make_key(
+            self.model, f"{system_prompt}\n\n{prompt}", self.MAX_TOKENS
+        )
+        return prompt, cache_key
+
+    def _chunk_request(
+        self,
+        chunk: Dict,
+        total_chunks: int,
+        file_metadata: Dict,
+        experience_level: str,
+        preferences: Dict,
+    ) -> Tuple[Dict, Optional[str]]:
+        """Build the standalone request analyzing one chunk of a large file.
+
+        Args:
+            chunk: Chunk from FileReader.split_into_chunks().
+            total_chunks: Number of chunks in the file.
+            file_metadata: Metadata about the whole file.
+            experience_level: User's programming experience level.
+            preferences: User preferences.
+
+        Returns:
+            Tuple of (messages.create keyword arguments, response cache key).
+            The cache key is None when caching is disabled.
+        """
+        chunk_metadata = dict(
+            file_metadata,
+            line_count=chunk["end_line"] - chunk["start_line"] + 1,
+            name=(
+                f"{file_metadata.get('name', 'unknown')} "
+                f"(lines {chunk['start_line']}-{chunk['end_line']})"
+            ),
+        )
+        system_prompt = self._build_system_prompt(
+            chunk["content"], chunk_metadata, experience_level, preferences
+        )
+        prompt = self._build_chunk_prompt(chunk, total_chunks)
+
+        params = {
+            "model": self.model,
+            "max_tokens": self.CHUNK_MAX_TOKENS,
+            "system": self._system_blocks(system_prompt),
+            "messages": [{"role": "user", "content": prompt}],
+        }
+
+        cache_key = None
+        if self.cache:
+            cache_key = ResponseCache.make_key(
+                self.model, f"{system_prompt}\n\n{prompt}", self.CHUNK_MAX_TOKENS
+            )
+        return params, cache_key
+
+    def _send_chunk_request(self, request: Tuple[Dict, Optional[str]]) -> Tuple[str, Any]:
+        """Send one chunk request, using the response cache when possible.
+
+        Safe to run on a worker thread: token usage is returned rather than
+        recorded, so the caller can add it to the totals.
+
+        Args:
+            request: Tuple from _chunk_request().
+
+        Returns:
+            Tuple of (analysis text, usage dictionary or None for a cache hit).
+        """
+        params, cache_key = request
+        if cache_key:
+            content = self.cache.get(cache_key)
+            if content is not None:
+                return content, None
+
+        result, text, responses = create_message_with_result(
+            self.client,
+            "CodeAnalyzer.analyze_code_chunked",
+            ReviewQuestions,
+            self._build_questions_follow_up_prompt(),
+            on_api_call=self.on_api_call,
+            **params,
+        )
+        content = self._analysis_text(result, text)
+        if cache_key:
+            self.cache.put(cache_key, content)
+        return content, self._combined_usage(responses)
+
+    def _finish_chunked_analysis(
+        self,
+        file_metadata: Dict,
+        experience_level: str,
+        preferences: Dict,
+        chunks: List[Dict],
+        responses: List[Tuple[str, Any]],
+    ) -> Dict[str, any]:
+        """Merge chunk analyses and set up the conversation for the review.
+
+        Args:
+            file_metadata: Metadata about the file.
+            experience_level: User's programming experience level.
+            preferences: User preferences.
+            chunks: Chunks that were analyzed.
+            responses: Tuples from _send_chunk_request(), in chunk order.
+
+        Returns:
+            Merged analysis in the structure of _parse_initial_response().
+        """
+        for _, usage in responses:
+            if usage is not None:
+                self._record_usage(usage)
+
+        analyses = [self._parse_initial_response(content) for content, _ in responses]
+        merged = self._merge_chunk_analyses(chunks, analyses)
+
+        # Continue the review with the code the questions are about, so follow-up
+        # turns don't resend the whole file
+        excerpt, summaries = self._chunked_code_context(chunks, analyses, merged["questions"])
+        self.system = self._system_blocks(
+            self._build_system_prompt(
+                excerpt, file_metadata, experience_level, preferences, summaries=summaries
+            )
+        )
+        self.conversation_history.append(
+            {"role": "user", "content": self._build_initial_prompt()}
+        )
+        self.conversation_history.append(
+            {"role": "assistant", "content": merged["raw_response"]}
+        )
+
+        return merged
+
+    @staticmethod
+    def _chunk_label(chunk: Dict) -> str:
+        return f"(lines {chunk['start_line']}-{chunk['end_line']})"
+
+    def _chunked_code_context(
+        self,
+        chunks: List[Dict],
+        analyses: List[Dict[str, any]],
+        questions: List[str],
+    ) -> Tuple[str, List[str]]:
+        """Select the code kept in the review's system prompt after a chunked analysis.
+
+        Args:
+            chunks: Chunks that were analyzed.
+            analyses: Parsed analysis of each chunk, in chunk order.
+            questions: Merged questions, labelled with the lines they refer to.
+
+        Returns:
+            Tuple of (code of the chunks a question refers to, with a marker
+            line for each run of omitted lines; summary line for each omitted
+            chunk, built from its observations).
+        """
+        parts = []
+        summaries = []
+        omitted: Optional[List[int]] = None
+        for chunk, analysis in zip(chunks, analyses):
+            label = self._chunk_label(chunk)
+            if any(question.startswith(label) for question in questions):
+                if omitted:
+                    parts.append(f"... lines {omitted[0]}-{omitted[1]} omitted ...")
+                    omitted = None
+                parts.append(chunk["content"])
+                continue
+
+            observations = "; ".join(analysis["observations"]) or "no observations"
+            summaries.append(f"- Lines {chunk['start_line']}-{chunk['end_line']}: {observations}")
+            omitted = [omitted[0] if omitted else chunk["start_line"], chunk["end_line"]]
+
+        if omitted:
+            parts.append(f"... lines {omitted[0]}-{omitted[1]} omitted ...")
+
+        return "\n".join(parts), summaries
+
+    def _merge_chunk_analyses(
+        self,
+        chunks: List[Dict],
+        analyses: List[Dict[str, any]],
+    ) -> Dict[str, any]:
+        """Merge per-chunk analyses into a single analysis.
+
+        Questions are taken round-robin across chunks (so every part of the
+        file is represented) up to MAX_MERGED_QUESTIONS; all observations are
+        kept. Each item is labelled with the lines it refers to.
+
+        Args:
+            chunks: Chunks that were analyzed.
+            analyses: Parsed analysis of each chunk, in chunk order.
+
+        Returns:
+            Merged analysis in the structure of _parse_initial_response().
+        """
+        labelled_questions = []
+        observations = []
+        for chunk, analysis in zip(chunks, analyses):
+            label = self._chunk_label(chunk)
+            labelled_questions.append([f"{label} {q}" for q in analysis["questions"]])
+            observations.extend(f"{label} {o}" for o in analysis["observations"])
+
+        questions = []
+        seen = set()
+        depth = max((len(qs) for qs in labelled_questions), default=0)
+        for i in range(depth):
+            for chunk_questions in labelled_questions:
+                if i < len(chunk_questions) and len(questions) < self.MAX_MERGED_QUESTIONS:
+                    question = chunk_questions[i]
+                    if question not in seen:
+                        seen.add(question)
+                        questions.append(question)
+
+        raw_response = "## Questions\n\n"
+        raw_response += "\n".join(f"{i}. {q}" for i, q in enumerate(questions, 1))
+        raw_response += "\n\n## Initial Observations\n\n"
+        raw_response += "\n".join(f"- {o}" for o in observations)
+
+        return {
+            "questions": questions,
+            "observations": observations,
+            "raw_response": raw_response,
+        }
+
+    @staticmethod
+    def _system_blocks(system_prompt: str) -> List[Dict]:
+        """Wrap a system prompt as a cacheable system block.
+
+        Args:
+            system_prompt: System prompt text.
+
+        Returns:
+            List of system content blocks.
+        """
+        return [
+            {
+                "type": "text",
+                "text": system_prompt,
+                "cache_control": {"type": "ephemeral"},
+            }
+        ]
+
+    def _message_params(self, messages: List[Dict[str, str]]) -> Dict:
+        """Build the request parameters for a messages call.
+
+        Args:
+            messages: Conversation messages to send.
+
+        Returns:
+            Keyword arguments for client.create_message().
+        """
+        params = {
+            "model": self.model,
+            "max_tokens": self.MAX_TOKENS,
+            "messages": messages,
+        }
+        if self.system:
+            params["system"] = self.system
+        return params
+
+    def _record_usage(self, usage) -> None:
+        """Add a response's token usage to the running totals.
+
+        Args:
+            usage: Usage object from an API response, or a dictionary from
+                _combined_usage().
+        """
+        if not isinstance(usage, dict):
+            usage = {name: getattr(usage, name, 0) for name in USAGE_FIELDS}
+        for name in USAGE_FIELDS:
+            self.usage[name] += usage.get(name, 0) or 0
+        self.last_output_tokens = usage.get("output_tokens")
+
+    @staticmethod
+    def _combined_usage(responses: List[Any]) -> Dict[str, int]:
+        """Sum the token usage of several responses.
+
+        Args:
+            responses: Messages from the API.
+
+        Returns:
+            Dictionary of usage field to total.
+        """
+        return {
+            name: sum(getattr(response.usage, name, 0) or 0 for response in responses)
+            for name in USAGE_FIELDS
+        }
+
+    def _build_system_prompt(
         self,
         code: str,
         file_metadata: Dict,
         experience_level: str,
         preferences: Dict,
+        summaries: Optional[List[str]] = None,
     ) -> str:
-        """Build the initial analysis prompt.
+        """Build the system prompt holding the tutor role, profile and code.
+
+        This prefix stays identical for every turn of the review, so it is sent
+        as a cacheable system block instead of being repeated in the history.
 
         Args:
-            code: Source code.
+            code: Source code, or an excerpt of it.
             file_metadata: File metadata.
             experience_level: User's experience level.
             preferences: User preferences.
+            summaries: Optional summary lines for parts of the file left out
+                of the excerpt.
 
         Returns:
-            Formatted prompt string.
+            Formatted system prompt string.
         """
         focus_areas_str = ", ".join(preferences.get("focus_areas", ["design", "readability"]))
         question_style = preferences.get("question_style", "socratic")
@@ -166,6 +720,13 @@ class CodeAnalyzer:
             ),
         }
 
+        omitted = ""
+        if summaries:
+            omitted = (
+                "\n\nParts of the file not shown above, summarized from an earlier "
+                "analysis:\n" + "\n".join(summaries)
+            )
+
         return f"""You are a respectful, thoughtful code tutor. Your goal is to understand the programmer's code before providing feedback.
 
 Programmer Profile:
@@ -183,36 +744,68 @@ File Information:
 Code to Review:
 ```{file_metadata.get('language', '').lower()}
 {code}
-```
+```{omitted}"""
 
-Your task:
+    def _build_initial_prompt(self) -> str:
+        """Build the initial analysis prompt.
+
+        The code itself lives in the system prompt; this is the task given for
+        the first turn.
+
+        Returns:
+            Formatted prompt string.
+        """
+        return f"""Your task:
 1. Carefully read and understand the code
-2. Ask 2-4 thoughtful clarifying questions about:
+2. Write brief initial observations (not criticism) about:
+   - Overall structure and organization
+   - Notable patterns or approaches used
+   - Areas that might benefit from discussion
+
+   Format them as a bullet list under the heading "## Initial Observations".
+
+3. Then call the {ReviewQuestions.TOOL_NAME} tool with 2-4 thoughtful clarifying questions about:
    - Design decisions and their rationale
    - Intended use cases or constraints
    - Any patterns or choices that seem intentional
    - Trade-offs the programmer considered
 
-3. Provide brief initial observations (not criticism) about:
-   - Overall structure and organization
-   - Notable patterns or approaches used
-   - Areas that might benefit from discussion
+Remember: Be respectful, assume good intentions, and focus on understanding before judging."""
 
-Format your response EXACTLY as follows:
+    def _build_questions_follow_up_prompt(self) -> str:
+        """Build the prompt asking for the questions when the model didn't call the tool.
+
+        The Markdown format is only for endpoints without tool support.
+
+        Returns:
+            Formatted prompt string.
+        """
+        return f"""Now call the {ReviewQuestions.TOOL_NAME} tool with your clarifying questions.
+
+If you can't call tools, write the questions instead, formatted EXACTLY as follows:
 
 ## Questions
 
 1. [Your first question]
 2. [Your second question]
-3. [Your third question, if needed]
+3. [Your third question, if needed]"""
 
-## Initial Observations
+    def _build_chunk_prompt(self, chunk: Dict, total_chunks: int) -> str:
+        """Build the analysis prompt for one chunk of a large file.
 
-- [Observation 1]
-- [Observation 2]
-- [Observation 3]
+        Args:
+            chunk: Chunk from FileReader.split_into_chunks().
+            total_chunks: Number of chunks in the file.
 
-Remember: Be respectful, assume good intentions, and focus on understanding before judging."""
+        Returns:
+            Formatted prompt string.
+        """
+        return (
+            f"The code above is part {chunk['index'] + 1} of {total_chunks} of a larger "
+            f"file (lines {chunk['start_line']}-{chunk['end_line']}). Other parts are "
+            "analyzed separately, so focus on this part and ask at most 2 questions "
+            "about it.\n\n" + self._build_initial_prompt()
+        )
 
     def _build_feedback_prompt(
         self,
@@ -261,8 +854,12 @@ Keep your feedback concise but meaningful. For a {experience_level} programmer,
     def _parse_initial_response(self, response: str) -> Dict[str, any]:
         """Parse the initial analysis response.
 
+        The Questions section is normally the one _create_analysis() built
+        from the tool call; the model only writes it itself on endpoints
+        without tool support.
+
         Args:
-            response: Raw response from Claude.
+            response: Analysis text from _create_analysis() or the cache.
 
         Returns:
             Parsed dictionary with questions and observations.
@@ -321,4 +918,5 @@ Keep your feedback concise but meaningful. For a {experience_level} programmer,
 
     def reset_conversation(self):
         """Reset the conversation history."""
-        self.conversation_history = []
+        self.conversation_history.clear()
+        self.system = []
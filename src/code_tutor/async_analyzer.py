@@ -0,0 +1,448 @@
+"""Asynchronous code and proof analysis for embedding Code Tutor in servers."""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import anthropic
+
+from .analyzer import CodeAnalyzer, ReviewQuestions
+from .client import ApiCallListener, acreate_message, get_async_client
+from .conversation_history import ConversationHistory
+from .proof_analyzer import ProofAnalyzer, ProofQuestions
+from .response_cache import ResponseCache
+from .structured_output import acreate_message_with_result
+
+
+class AsyncCodeAnalyzer(CodeAnalyzer):
+    """Async counterpart of CodeAnalyzer built on anthropic.AsyncAnthropic.
+
+    Prompts, parsing and conversation state are shared with CodeAnalyzer; only
+    the API calls are awaited, so a single event loop can serve many concurrent
+    review sessions. There is no console dependency.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "claude-sonnet-4-5",
+        cache: Optional[ResponseCache] = None,
+        client: Optional[anthropic.AsyncAnthropic] = None,
+        history_max_tokens: int = ConversationHistory.DEFAULT_MAX_TOKENS,
+        keep_recent_turns: int = ConversationHistory.DEFAULT_KEEP_RECENT_TURNS,
+        on_api_call: Optional[ApiCallListener] = None,
+    ):
+        """Initialize the async code analyzer.
+
+        Args:
+            api_key: Anthropic API key.
+            model: Claude model to use.
+            cache: Optional response cache for initial analyses.
+            client: Optional AsyncAnthropic client; defaults to the shared async client.
+            history_max_tokens: Token budget for conversation history.
+            keep_recent_turns: Number of most recent exchanges always kept verbatim.
+            on_api_call: Optional listener for the metrics of each API call.
+        """
+        super().__init__(
+            api_key,
+            model,
+            cache=cache,
+            client=client or get_async_client(api_key),
+            history_max_tokens=history_max_tokens,
+            keep_recent_turns=keep_recent_turns,
+            on_api_call=on_api_call,
+        )
+
+    async def analyze_code(
+        self,
+        code: str,
+        file_metadata: Dict,
+        experience_level: str,
+        preferences: Dict,
+        on_text: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, any]:
+        """Perform initial code analysis and generate clarifying questions.
+
+        Args:
+            code: Source code to analyze.
+            file_metadata: Metadata about the file (language, size, etc.).
+            experience_level: User's programming experience level.
+            preferences: User preferences (question_style, focus_areas, etc.).
+            on_text: Optional callback receiving text deltas as they stream in.
+
+        Returns:
+            Dictionary with questions and initial observations.
+        """
+        try:
+            prompt, cache_key = self._prepare_analysis(
+                code, file_metadata, experience_level, preferences
+            )
+            content = None
+            if cache_key:
+                # Cache lookups and writes do file I/O; keep them off the event loop
+                content = await asyncio.to_thread(self.cache.get, cache_key)
+            reply_tokens = None
+            if content is not None and on_text is not None:
+                on_text(content)
+
+            if content is None:
+                content = await self._create_analysis(
+                    [{"role": "user", "content": prompt}],
+                    "AsyncCodeAnalyzer.analyze_code",
+                    on_text=on_text,
+                )
+                reply_tokens = self.last_output_tokens
+                if cache_key:
+                    await asyncio.to_thread(self.cache.put, cache_key, content)
+
+            # Store in conversation history
+            self.conversation_history.append({"role": "user", "content": prompt})
+            self.conversation_history.append(
+                {"role": "assistant", "content": content}, tokens=reply_tokens
+            )
+
+            return self._parse_initial_response(content)
+
+        except Exception as e:
+            raise ValueError(f"Failed to analyze code: {e}")
+
+    async def analyze_code_chunked(
+        self,
+        code: str,
+        file_metadata: Dict,
+        experience_level: str,
+        preferences: Dict,
+        chunks: List[Dict],
+        max_workers: int = CodeAnalyzer.DEFAULT_CHUNK_WORKERS,
+    ) -> Dict[str, any]:
+        """Analyze a large file chunk by chunk and merge the results.
+
+        Args:
+            code: Full source code of the file.
+            file_metadata: Metadata about the file (language, size, etc.).
+            experience_level: User's programming experience level.
+            preferences: User preferences (question_style, focus_areas, etc.).
+            chunks: Chunks of the file from FileReader.split_into_chunks().
+            max_workers: Maximum number of chunk requests in flight at once.
+
+        Returns:
+            Dictionary with questions and initial observations.
+        """
+        try:
+            requests = [
+                self._chunk_request(chunk, len(chunks), file_metadata, experience_level, preferences)
+                for chunk in chunks
+            ]
+
+            semaphore = asyncio.Semaphore(max_workers)
+
+            async def send(request: Tuple[Dict, Optional[str]]) -> Tuple[str, Any]:
+                async with semaphore:
+                    return await self._send_chunk_request(request)
+
+            responses = await asyncio.gather(*(send(request) for request in requests))
+
+            return self._finish_chunked_analysis(
+                file_metadata, experience_level, preferences, chunks, list(responses)
+            )
+
+        except Exception as e:
+            raise ValueError(f"Failed to analyze code: {e}")
+
+    async def process_answers(
+        self,
+        answers: List[str],
+        experience_level: str,
+        preferences: Dict,
+        on_text: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, any]:
+        """Process user's answers to questions and generate feedback.
+
+        Args:
+            answers: User's answers to the questions.
+            experience_level: User's programming experience level.
+            preferences: User preferences.
+            on_text: Optional callback receiving text deltas as they stream in.
+
+        Returns:
+            Dictionary with feedback and suggestions.
+        """
+        prompt = self._build_feedback_prompt(answers, experience_level, preferences)
+
+        try:
+            self.conversation_history.append({"role": "user", "content": prompt})
+
+            content = await self._create_message(
+                self.conversation_history.messages(),
+                "AsyncCodeAnalyzer.process_answers",
+                on_text=on_text,
+            )
+
+            self.conversation_history.append(
+                {"role": "assistant", "content": content}, tokens=self.last_output_tokens
+            )
+
+            return self._parse_feedback_response(content)
+
+        except Exception as e:
+            raise ValueError(f"Failed to process answers: {e}")
+
+    async def continue_conversation(
+        self,
+        user_message: str,
+        on_text: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Continue the conversation with a follow-up question.
+
+        Args:
+            user_message: User's follow-up question or comment.
+            on_text: Optional callback receiving text deltas as they stream in.
+
+        Returns:
+            Assistant's response.
+        """
+        try:
+            self.conversation_history.append({"role": "user", "content": user_message})
+
+            content = await self._create_message(
+                self.conversation_history.messages(),
+                "AsyncCodeAnalyzer.continue_conversation",
+                on_text=on_text,
+            )
+            self.conversation_history.append(
+                {"role": "assistant", "content": content}, tokens=self.last_output_tokens
+            )
+
+            return content
+
+        except Exception as e:
+            raise ValueError(f"Failed to continue conversation: {e}")
+
+    async def _create_message(
+        self,
+        messages: List[Dict[str, str]],
+        call_site: str,
+        on_text: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Send messages to Claude and return the response text.
+
+        Args:
+            messages: Conversation messages to send.
+            call_site: Name of the calling method, for API call instrumentation.
+            on_text: Optional callback for streamed text deltas.
+
+        Returns:
+            The complete response text.
+        """
+        response = await acreate_message(
+            self.client,
+            call_site,
+            on_text=on_text,
+            on_api_call=self.on_api_call,
+            **self._message_params(messages),
+        )
+
+        self._record_usage(response.usage)
+        return response.content[0].text
+
+    async def _create_analysis(
+        self,
+        messages: List[Dict[str, str]],
+        call_site: str,
+        on_text: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Request an initial analysis: streamed observations, then questions.
+
+        Args:
+            messages: Conversation messages to send.
+            call_site: Name of the calling method, for API call instrumentation.
+            on_text: Optional callback for streamed text deltas.
+
+        Returns:
+            The analysis in the format read by _parse_initial_response().
+        """
+        result, text, responses = await acreate_message_with_result(
+            self.client,
+            call_site,
+            ReviewQuestions,
+            self._build_questions_follow_up_prompt(),
+            on_text=on_text,
+            on_api_call=self.on_api_call,
+            **self._message_params(messages),
+        )
+
+        for response in responses:
+            self._record_usage(response.usage)
+        return self._analysis_text(result, text)
+
+    async def _send_chunk_request(self, request: Tuple[Dict, Optional[str]]) -> Tuple[str, Any]:
+        """Send one chunk request, using the response cache when possible.
+
+        Args:
+            request: Tuple from _chunk_request().
+
+        Returns:
+            Tuple of (analysis text, usage dictionary or None for a cache hit).
+        """
+        params, cache_key = request
+        if cache_key:
+            content = await asyncio.to_thread(self.cache.get, cache_key)
+            if content is not None:
+                return content, None
+
+        result, text, responses = await acreate_message_with_result(
+            self.client,
+            "AsyncCodeAnalyzer.analyze_code_chunked",
+            ReviewQuestions,
+            self._build_questions_follow_up_prompt(),
+            on_api_call=self.on_api_call,
+            **params,
+        )
+        content = self._analysis_text(result, text)
+        if cache_key:
+            await asyncio.to_thread(self.cache.put, cache_key, content)
+        return content, self._combined_usage(responses)
+
+
+class AsyncProofAnalyzer(ProofAnalyzer):
+    """Async counterpart of ProofAnalyzer built on anthropic.AsyncAnthropic."""
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "claude-sonnet-4-5",
+        client: Optional[anthropic.AsyncAnthropic] = None,
+        on_api_call: Optional[ApiCallListener] = None,
+    ):
+        """Initialize the async proof analyzer.
+
+        Args:
+            api_key: Anthropic API key.
+            model: Claude model to use.
+            client: Optional AsyncAnthropic client; defaults to the shared async client.
+            on_api_call: Optional listener for the metrics of each API call.
+        """
+        super().__init__(
+            api_key,
+            model,
+            client=client or get_async_client(api_key),
+            on_api_call=on_api_call,
+        )
+
+    async def analyze_proof(
+        self,
+        content: str,
+        file_metadata: Dict,
+        structure: Dict,
+        experience_level: str,
+        domain: Optional[str] = None,
+        preferences: Optional[Dict] = None,
+    ) -> Dict[str, Any]:
+        """Perform initial proof analysis and generate clarifying questions.
+
+        Args:
+            content: Proof content to analyze.
+            file_metadata: Metadata about the file.
+            structure: Analyzed proof structure.
+            experience_level: User's mathematical experience level.
+            domain: Optional mathematical domain context.
+            preferences: Optional user preferences.
+
+        Returns:
+            Dictionary with questions and initial observations.
+        """
+        prompt = self._build_initial_prompt(
+            content, file_metadata, structure, experience_level, domain, preferences
+        )
+
+        try:
+            result, text, _ = await acreate_message_with_result(
+                self.client,
+                "AsyncProofAnalyzer.analyze_proof",
+                ProofQuestions,
+                self._build_questions_follow_up_prompt(),
+                on_api_call=self.on_api_call,
+                model=self.model,
+                max_tokens=4096,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            response_content = self._analysis_text(result, text)
+
+            self.conversation_history.append({"role": "user", "content": prompt})
+            self.conversation_history.append({"role": "assistant", "content": response_content})
+
+            return self._parse_initial_response(response_content)
+
+        except Exception as e:
+            raise ValueError(f"Failed to analyze proof: {e}")
+
+    async def process_answers(
+        self,
+        answers: List[str],
+        experience_level: str,
+        domain: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Process user's answers to questions and generate feedback.
+
+        Args:
+            answers: User's answers to the questions.
+            experience_level: User's experience level.
+            domain: Mathematical domain context.
+
+        Returns:
+            Dictionary with feedback and suggestions.
+        """
+        prompt = self._build_feedback_prompt(answers, experience_level, domain)
+
+        try:
+            self.conversation_history.append({"role": "user", "content": prompt})
+
+            response_content = await self._create_message(
+                self.conversation_history, "AsyncProofAnalyzer.process_answers"
+            )
+            self.conversation_history.append({"role": "assistant", "content": response_content})
+
+            return self._parse_feedback_response(response_content)
+
+        except Exception as e:
+            raise ValueError(f"Failed to process answers: {e}")
+
+    async def continue_conversation(self, user_message: str) -> str:
+        """Continue the conversation with a follow-up question.
+
+        Args:
+            user_message: User's follow-up question or comment.
+
+        Returns:
+            Assistant's response.
+        """
+        try:
+            self.conversation_history.append({"role": "user", "content": user_message})
+
+            response_content = await self._create_message(
+                self.conversation_history, "AsyncProofAnalyzer.continue_conversation"
+            )
+            self.conversation_history.append({"role": "assistant", "content": response_content})
+
+            return response_content
+
+        except Exception as e:
+            raise ValueError(f"Failed to continue conversation: {e}")
+
+    async def _create_message(self, messages: List[Dict[str, str]], call_site: str) -> str:
+        """Send messages to Claude and return the response text.
+
+        Args:
+            messages: Conversation messages to send.
+            call_site: Name of the calling method, for API call instrumentation.
+
+        Returns:
+            The complete response text.
+        """
+        response = await acreate_message(
+            self.client,
+            call_site,
+            on_api_call=self.on_api_call,
+            model=self.model,
+            max_tokens=4096,
+            messages=messages,
+        )
+        return response.content[0].text
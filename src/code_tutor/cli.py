@@ -9,14 +9,20 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Prompt, Confirm
 
+from .client import ApiCallListener, get_client
 from .config import ConfigManager
 from .session import ReviewSession
 from .teaching_session import TeachingSession
 from .logger import SessionLogger
+from .log_index import LogIndex
+from .log_report import build_report, find_log_files
 from .exercise_manager import ExerciseManager
 from .exercise_generator import ExerciseGenerator
+from .exercise_pool import ExercisePool
+from .exercise_runner import ExerciseRunner
 from .proof_reader import ProofReader
 from .proof_session import ProofSession, ProofTeachingSession
+from .topic_library import TopicLibrary
 
 
 console = Console()
@@ -224,8 +230,20 @@ def setup(ctx):
     default=True,
     help="Recursively search directories (default: True)",
 )
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Always request a fresh analysis instead of using cached results",
+)
+@click.option(
+    "--concurrency", "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Analyze up to N directory files in the background while you review (default: 1)",
+)
 @click.pass_context
-def review(ctx, path: str, recursive: bool):
+def review(ctx, path: str, recursive: bool, no_cache: bool, concurrency: int):
     """Review a source code file or directory.
 
     PATH: Path to the file or directory to review
@@ -247,13 +265,13 @@ def review(ctx, path: str, recursive: bool):
         sys.exit(1)
 
     # Start review session
-    session = ReviewSession(config_manager, console)
+    session = ReviewSession(config_manager, console, use_cache=not no_cache)
 
     path_obj = Path(path)
     if path_obj.is_file():
         session.start_review(path)
     elif path_obj.is_dir():
-        session.review_directory(path, recursive=recursive)
+        session.review_directory(path, recursive=recursive, concurrency=concurrency)
     else:
         console.print(f"[red]Error:[/red] Invalid path: {path}")
         sys.exit(1)
@@ -383,6 +401,7 @@ def info():
         "• proof         - Review mathematical proofs\n"
         "• config        - View/update configuration\n"
         "• export-logs   - Export interaction logs for debugging\n"
+        "• logs          - Query interaction logs\n"
         "• info          - Show this information\n\n"
         "[bold]Learn more:[/bold]\n"
         "https://github.com/yourusername/code-tutor",
@@ -396,7 +415,21 @@ def info():
     "-o",
     type=click.Path(),
     default=None,
-    help="Output file path (default: code_tutor_logs_<timestamp>.json in current directory)",
+    help="Output file path (default: code_tutor_logs_<timestamp>.<format> in current directory)",
+)
+@click.option(
+    "--format",
+    "export_format",
+    type=click.Choice(SessionLogger.EXPORT_FORMATS),
+    default="json",
+    help="Export as one JSON document, or as JSON Lines with one event per line",
+)
+@click.option(
+    "--gzip",
+    "compress",
+    is_flag=True,
+    default=False,
+    help="Compress the exported file with gzip",
 )
 @click.option(
     "--clear",
@@ -405,11 +438,13 @@ def info():
     help="Clear logs after exporting",
 )
 @click.pass_context
-def export_logs(ctx, output: Optional[str], clear: bool):
+def export_logs(ctx, output: Optional[str], export_format: str, compress: bool, clear: bool):
     """Export student interaction logs to JSON for debugging.
 
     This command packages all logged student interactions into a single JSON file
     that can be sent to an instructor or developer for debugging purposes.
+    Sessions are streamed to the file, so large log directories export quickly
+    and with little memory.
 
     Logs are only created if logging is enabled in the configuration.
     Use 'code-tutor setup' to enable logging.
@@ -440,25 +475,25 @@ def export_logs(ctx, output: Optional[str], clear: bool):
         # Export logs
         console.print("\n[cyan]Exporting logs...[/cyan]\n")
 
+        log_dir_config = config_manager.config_dir if config_dir else None
         output_path = SessionLogger.export_all_logs(
-            config_dir=config_manager.config_dir if config_dir else None,
-            output_path=Path(output) if output else None
+            config_dir=log_dir_config,
+            output_path=Path(output) if output else None,
+            export_format=export_format,
+            compress=compress,
         )
 
         console.print(f"[green]✓ Logs exported successfully![/green]")
         console.print(f"[cyan]Output file:[/cyan] {output_path}")
 
-        # Show summary
-        import json
-        with open(output_path, 'r') as f:
-            data = json.load(f)
-            total_sessions = data.get('total_sessions', 0)
-            console.print(f"[cyan]Total sessions:[/cyan] {total_sessions}")
+        # Show summary without re-reading the (possibly very large) export
+        session_files = len(SessionLogger.list_log_files(log_dir_config))
+        console.print(f"[cyan]Log segments:[/cyan] {session_files}")
 
         # Clear logs if requested
         if clear:
             if Confirm.ask("\n[yellow]Are you sure you want to clear all log files?[/yellow]", default=False):
-                count = SessionLogger.clear_logs(config_manager.config_dir if config_dir else None)
+                count = SessionLogger.clear_logs(log_dir_config)
                 console.print(f"[green]✓ Cleared {count} log file(s)[/green]")
 
         console.print("\n[dim]You can now send this file to your instructor or developer for debugging.[/dim]")
@@ -468,6 +503,311 @@ def export_logs(ctx, output: Optional[str], clear: bool):
         sys.exit(1)
 
 
+@main.group()
+@click.pass_context
+def logs(ctx):
+    """Query logged student interactions.
+
+    Queries use an index of the log files that is updated incrementally,
+    so only new log lines are read on each run.
+    """
+    pass
+
+
+@logs.command("query")
+@click.option("--session-type", "-s", default=None, help="Session type (review, teaching, proof_review, proof_teaching, exercise)")
+@click.option("--event-type", "-e", default=None, help="Event type (e.g. teaching_round, api_call, error)")
+@click.option("--since", type=click.DateTime(), default=None, help="Only events on or after this date (UTC)")
+@click.option("--until", type=click.DateTime(), default=None, help="Only events before this date (UTC)")
+@click.option("--topic", "-t", default=None, help="Topic to match (case-insensitive substring)")
+@click.option("--model", "-m", default=None, help="Model name")
+@click.option("--limit", "-n", type=click.IntRange(min=1), default=50, help="Maximum number of events to show")
+@click.option("--json", "as_json", is_flag=True, default=False, help="Print matching events as JSON Lines")
+@click.pass_context
+def logs_query(
+    ctx,
+    session_type: Optional[str],
+    event_type: Optional[str],
+    since,
+    until,
+    topic: Optional[str],
+    model: Optional[str],
+    limit: int,
+    as_json: bool,
+):
+    """Find logged events, most recent first.
+
+    Example: all teaching rounds on recursion since March 1st:
+
+      code-tutor logs query -e teaching_round -t recursion --since 2025-03-01
+    """
+    import json
+
+    config_dir = ctx.obj.get("config_dir")
+    config_manager = ConfigManager(Path(config_dir) if config_dir else None)
+
+    try:
+        events = LogIndex(config_manager.config_dir).query(
+            session_type=session_type,
+            event_type=event_type,
+            since=since,
+            until=until,
+            topic=topic,
+            model=model,
+            limit=limit,
+        )
+    except Exception as e:
+        console.print(f"[red]Error querying logs:[/red] {e}")
+        sys.exit(1)
+
+    if as_json:
+        for event in events:
+            click.echo(json.dumps(event))
+        return
+
+    if not events:
+        console.print("[yellow]No matching events found.[/yellow]")
+        return
+
+    for event in events:
+        console.print(
+            f"[bold]{event.get('timestamp', '')[:19]}[/bold]  "
+            f"[cyan]{event.get('event_type', 'unknown')}[/cyan]  "
+            f"[dim]session {str(event.get('session_id', ''))[:8]}[/dim]"
+        )
+        for label, key in (("Topic", "topic"), ("Model", "model"), ("Call site", "call_site")):
+            if event.get(key):
+                console.print(f"  {label}: {event[key]}")
+        if event.get("latency_seconds") is not None:
+            console.print(f"  Latency: {event['latency_seconds']}s")
+        text = event.get("content") or event.get("student_explanation") or event.get("message")
+        if text:
+            preview = " ".join(str(text).split())
+            console.print(f"  [dim]{preview[:100]}{'...' if len(preview) > 100 else ''}[/dim]")
+        console.print()
+
+    console.print(f"[dim]{len(events)} event(s) shown (limit {limit})[/dim]")
+
+
+@logs.command("report")
+@click.argument("paths", nargs=-1, type=click.Path(exists=True))
+@click.option(
+    "--workers", "-j",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes (default: number of CPUs)",
+)
+@click.pass_context
+def logs_report(ctx, paths, workers: Optional[int]):
+    """Summarize logs per topic and per student.
+
+    PATHS: Log files or directories to include (searched recursively).
+    Defaults to your own log directory. Point this at a directory of
+    collected student logs to report on a whole class.
+    """
+    from rich.table import Table
+
+    config_dir = ctx.obj.get("config_dir")
+    config_manager = ConfigManager(Path(config_dir) if config_dir else None)
+
+    if paths:
+        log_files = find_log_files(Path(p) for p in paths)
+    else:
+        log_files = SessionLogger.list_log_files(config_manager.config_dir)
+
+    if not log_files:
+        console.print("[yellow]No log files found.[/yellow]")
+        return
+
+    with console.status(f"Aggregating {len(log_files)} log file(s)..."):
+        report = build_report(log_files, workers=workers)
+
+    console.print(
+        f"\n[bold]{report['sessions']}[/bold] session(s) in "
+        f"[bold]{report['files']}[/bold] log file(s)\n"
+    )
+
+    if report["topics"]:
+        table = Table(title="Teaching Rounds by Topic")
+        table.add_column("Topic")
+        table.add_column("Rounds", justify="right")
+        table.add_column("Understood", justify="right")
+        table.add_column("Avg rounds to understanding", justify="right")
+        for topic, stats in sorted(report["topics"].items(), key=lambda item: -item[1]["rounds"]):
+            average = (
+                f"{stats['rounds_to_understanding'] / stats['understood']:.1f}"
+                if stats["understood"] else "-"
+            )
+            table.add_row(topic, str(stats["rounds"]), str(stats["understood"]), average)
+        console.print(table)
+        console.print()
+
+    if report["students"]:
+        table = Table(title="Activity by Student")
+        table.add_column("Student")
+        table.add_column("Sessions", justify="right")
+        table.add_column("Rounds", justify="right")
+        table.add_column("Understood", justify="right")
+        table.add_column("Reviews", justify="right")
+        table.add_column("Tokens", justify="right")
+        for student, stats in sorted(report["students"].items()):
+            table.add_row(
+                student,
+                str(stats["sessions"]),
+                str(stats["rounds"]),
+                str(stats["understood"]),
+                str(stats["reviews"]),
+                str(stats["tokens"]),
+            )
+        console.print(table)
+        console.print()
+
+    if report["assessments"]:
+        table = Table(title="Exercise Assessments")
+        table.add_column("Assessment")
+        table.add_column("Count", justify="right")
+        for assessment, count in sorted(report["assessments"].items(), key=lambda item: -item[1]):
+            table.add_row(assessment, str(count))
+        console.print(table)
+        console.print()
+
+    tokens = report["tokens"]
+    console.print(
+        f"[cyan]API calls:[/cyan] {report['api_calls']}  "
+        f"[dim]({tokens['input_tokens']} input, {tokens['output_tokens']} output, "
+        f"{tokens['cache_read_input_tokens']} cache read, "
+        f"{tokens['cache_creation_input_tokens']} cache write tokens)[/dim]"
+    )
+    if not report["api_calls"]:
+        console.print(
+            "[dim]Token usage is only recorded when logging.log_api_calls is enabled.[/dim]"
+        )
+
+
+@logs.command("prune")
+@click.option(
+    "--max-age-days",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="Delete segments older than this (default: logging.max_age_days)",
+)
+@click.option(
+    "--max-total-mb",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="Delete the oldest segments beyond this total size (default: logging.max_total_mb)",
+)
+@click.pass_context
+def logs_prune(ctx, max_age_days: Optional[float], max_total_mb: Optional[float]):
+    """Compress closed log segments and apply the retention policy.
+
+    This also runs automatically whenever a session ends.
+    """
+    config_dir = ctx.obj.get("config_dir")
+    config_manager = ConfigManager(Path(config_dir) if config_dir else None)
+
+    try:
+        config_manager.load()
+        logger = SessionLogger.from_config(config_manager)
+        compressed = SessionLogger.compress_closed_segments(
+            config_manager.config_dir, logger.compression
+        )
+        deleted = SessionLogger.prune_logs(
+            config_manager.config_dir,
+            max_age_days=max_age_days if max_age_days is not None else logger.max_age_days,
+            max_total_mb=max_total_mb if max_total_mb is not None else logger.max_total_mb,
+        )
+    except Exception as e:
+        console.print(f"[red]Error pruning logs:[/red] {e}")
+        sys.exit(1)
+
+    console.print(f"[green]✓ Compressed {compressed} and deleted {deleted} log segment(s)[/green]")
+
+
+@main.group("topic-library")
+def topic_library():
+    """Manage the library of flawed-code examples for teach-me.
+
+    'teach-me' shows new problems from the library when it has examples for
+    the topic, language and experience level, and only calls the API to
+    evaluate your hints. The library is built from logged teaching rounds;
+    a shared library can also be placed in /etc/code-tutor/topic_library.json.
+    """
+    pass
+
+
+@topic_library.command("build")
+@click.option("--since", type=click.DateTime(), default=None, help="Only rounds on or after this date (UTC)")
+@click.option("--topic", "-t", default=None, help="Topic to match (case-insensitive substring)")
+@click.option(
+    "--max-per-topic", "-n",
+    type=click.IntRange(min=1),
+    default=TopicLibrary.DEFAULT_MAX_PER_SLOT,
+    help="Maximum examples per topic, language and level",
+)
+@click.pass_context
+def topic_library_build(ctx, since, topic: Optional[str], max_per_topic: int):
+    """Add successful logged teach-me rounds to the topic library.
+
+    Rounds whose hints led the student to understanding are added, once
+    each; every build that adds examples bumps the library version.
+    """
+    config_dir = ctx.obj.get("config_dir")
+    config_manager = ConfigManager(Path(config_dir) if config_dir else None)
+
+    try:
+        config_manager.load()
+        events = LogIndex(config_manager.config_dir).query(
+            session_type="teaching",
+            event_type="teaching_round",
+            since=since,
+            topic=topic,
+        )
+        library = TopicLibrary.from_config(config_manager)
+        added = library.build(events, max_per_slot=max_per_topic)
+    except Exception as e:
+        console.print(f"[red]Error building topic library:[/red] {e}")
+        sys.exit(1)
+
+    console.print(
+        f"[green]✓ Added {added} example(s) from {len(events)} logged round(s); "
+        f"library version {library.version}[/green]"
+    )
+
+
+@topic_library.command("status")
+@click.pass_context
+def topic_library_status(ctx):
+    """Show how many examples the library holds for each topic."""
+    from rich.table import Table
+
+    config_dir = ctx.obj.get("config_dir")
+    config_manager = ConfigManager(Path(config_dir) if config_dir else None)
+    config_manager.load()
+
+    library = TopicLibrary.from_config(config_manager)
+    slots = library.slots()
+    if not slots:
+        console.print("[yellow]The topic library is empty.[/yellow]")
+        return
+
+    table = Table(title=f"Topic Library (version {library.version})")
+    table.add_column("Topic")
+    table.add_column("Language")
+    table.add_column("Level")
+    table.add_column("Examples", justify="right")
+    table.add_column("System", justify="right")
+    for slot in slots:
+        table.add_row(
+            slot["topic"],
+            slot["language"],
+            slot["level"],
+            str(slot["user"]),
+            str(slot["system"]),
+        )
+    console.print(table)
+
+
 @main.group()
 @click.pass_context
 def exercise(ctx):
@@ -536,17 +876,36 @@ def exercise_generate(ctx, topic: str, language: str, exercise_type: str, diffic
         ))
         console.print()
 
-        # Generate the exercise
-        console.print("[dim]Generating exercise content...[/dim]")
-
-        generator = ExerciseGenerator(api_key, model)
-        exercise_content = generator.generate_exercise(
-            topic=topic,
-            language=language,
-            exercise_type=exercise_type,
-            difficulty=difficulty,
-            experience_level=experience_level,
-        )
+        # Serve a pre-generated exercise if the pool has one
+        exercise_content = None
+        if config_manager.get("exercise_pool.enabled", True):
+            exercise_content = ExercisePool.from_config(config_manager).take({
+                "topic": topic,
+                "language": language,
+                "exercise_type": exercise_type,
+                "difficulty": difficulty,
+                "experience_level": experience_level,
+            })
+
+        if exercise_content is None:
+            # Generate the exercise
+            console.print("[dim]Generating exercise content...[/dim]")
+
+            generator = ExerciseGenerator(
+                api_key,
+                model,
+                client=get_client(api_key, config_manager),
+                on_api_call=_api_call_listener(ctx, config_manager),
+            )
+            exercise_content = generator.generate_exercise(
+                topic=topic,
+                language=language,
+                exercise_type=exercise_type,
+                difficulty=difficulty,
+                experience_level=experience_level,
+            )
+        else:
+            console.print("[dim]Using a pre-generated exercise from the pool.[/dim]")
 
         # Create the exercise in the working directory
         console.print("[dim]Creating exercise files...[/dim]")
@@ -583,6 +942,313 @@ def exercise_generate(ctx, topic: str, language: str, exercise_type: str, diffic
         sys.exit(1)
 
 
+@exercise.command("generate-set")
+@click.argument("topics", nargs=-1)
+@click.option(
+    "--file", "-f", "topics_file",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="File of topics: one per line, or a .json list of topics and/or "
+         "objects with topic, language, exercise_type and difficulty",
+)
+@click.option(
+    "--language", "-l",
+    default="Python",
+    help="Programming language for the exercises",
+)
+@click.option(
+    "--type", "-t", "exercise_types",
+    type=click.Choice(ExerciseManager.EXERCISE_TYPES),
+    multiple=True,
+    help="Exercise type; repeat for several (default: implementation)",
+)
+@click.option(
+    "--difficulty", "-d", "difficulties",
+    type=click.Choice(ConfigManager.EXPERIENCE_LEVELS),
+    multiple=True,
+    help="Difficulty level; repeat for several (defaults to your experience level)",
+)
+@click.option(
+    "--workers", "-j",
+    type=click.IntRange(min=1),
+    default=ExerciseGenerator.DEFAULT_SET_WORKERS,
+    help="Number of exercises generated concurrently",
+)
+@click.pass_context
+def exercise_generate_set(
+    ctx,
+    topics,
+    topics_file: Optional[str],
+    language: str,
+    exercise_types,
+    difficulties,
+    workers: int,
+):
+    """Generate a problem set: every topic in every type and difficulty.
+
+    TOPICS: Topics to generate exercises for (or use --file)
+
+    Example - three topics as bug fixes and implementations at two levels
+    (12 exercises):
+
+      code-tutor exercise generate-set recursion "binary search" closures \\
+          -t bug_fix -t implementation -d beginner -d intermediate
+    """
+    import json
+
+    from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn
+
+    config_dir = ctx.obj.get("config_dir")
+    config_manager = ConfigManager(Path(config_dir) if config_dir else None)
+
+    try:
+        config_manager.load()
+        if not config_manager.is_configured():
+            console.print(
+                "[red]Error:[/red] Code Tutor is not configured.\n"
+                "Run 'code-tutor setup' first."
+            )
+            sys.exit(1)
+
+        experience_level = config_manager.get("experience_level", "intermediate")
+        exercise_types = exercise_types or (ExerciseManager.TYPE_IMPLEMENTATION,)
+        difficulties = difficulties or (experience_level,)
+
+        entries = list(topics)
+        if topics_file:
+            with open(topics_file, "r") as f:
+                if topics_file.endswith(".json"):
+                    file_entries = json.load(f)
+                    if not isinstance(file_entries, list):
+                        console.print(
+                            f"[red]Error:[/red] {topics_file} must hold a JSON list of "
+                            "topics or exercise objects."
+                        )
+                        sys.exit(1)
+                    entries.extend(file_entries)
+                else:
+                    entries.extend(
+                        line.strip() for line in f
+                        if line.strip() and not line.lstrip().startswith("#")
+                    )
+
+        # Plain topics expand to every type and difficulty; objects are used as given
+        requests = []
+        for entry in entries:
+            if isinstance(entry, dict):
+                requests.append({
+                    "topic": entry["topic"],
+                    "language": entry.get("language", language),
+                    "exercise_type": entry.get("exercise_type", exercise_types[0]),
+                    "difficulty": entry.get("difficulty", difficulties[0]),
+                    "experience_level": experience_level,
+                })
+                continue
+            for exercise_type in exercise_types:
+                for difficulty in difficulties:
+                    requests.append({
+                        "topic": str(entry),
+                        "language": language,
+                        "exercise_type": exercise_type,
+                        "difficulty": difficulty,
+                        "experience_level": experience_level,
+                    })
+
+        if not requests:
+            console.print("[red]Error:[/red] No topics given. Pass topics or use --file.")
+            sys.exit(1)
+
+        api_key = config_manager.get_api_key()
+        generator = ExerciseGenerator(
+            api_key,
+            config_manager.get_model(),
+            client=get_client(api_key, config_manager),
+            on_api_call=_api_call_listener(ctx, config_manager),
+        )
+        manager = ExerciseManager(config_manager=config_manager)
+
+        created = []
+        failed = []
+
+        with Progress(
+            TextColumn("[cyan]Generating exercises"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            console=console,
+        ) as progress:
+            task = progress.add_task("generate", total=len(requests))
+
+            def save(request, content, error):
+                label = (
+                    f"{request['topic']} ({request['exercise_type']}, {request['difficulty']})"
+                )
+                exercise_info = None
+                if error is None:
+                    # Errors must not escape: the remaining generations would
+                    # still run but their results would be lost
+                    try:
+                        exercise_info = manager.create_exercise(
+                            topic=request["topic"],
+                            language=request["language"],
+                            exercise_type=request["exercise_type"],
+                            difficulty=request["difficulty"],
+                            instructions=content.get("instructions", ""),
+                            starter_code=content.get("starter_code", ""),
+                            solution_hints=content.get("hints", []),
+                            learning_objectives=content.get("learning_objectives", []),
+                            test_code=content.get("test_code", None),
+                        )
+                    except (OSError, ValueError) as e:
+                        error = f"could not save the exercise: {e}"
+
+                if exercise_info is not None:
+                    created.append(exercise_info)
+                    progress.console.print(f"[green]✓[/green] {label}: {exercise_info['id']}")
+                else:
+                    failed.append(request)
+                    progress.console.print(f"[red]✗[/red] {label}: {error}")
+                progress.advance(task)
+
+            generator.generate_exercise_set(requests, max_workers=workers, on_result=save)
+
+        console.print()
+        console.print(
+            f"[green]Created {len(created)} exercise(s)[/green] in {manager.exercises_dir}"
+        )
+        if failed:
+            console.print(f"[red]{len(failed)} exercise(s) failed to generate or save.[/red]")
+            sys.exit(1)
+
+    except (ValueError, KeyError, IOError) as e:
+        console.print(f"[red]Error:[/red] {e}")
+        sys.exit(1)
+
+
+@exercise.group("pool")
+def exercise_pool():
+    """Manage the pool of pre-generated exercises.
+
+    'exercise generate' takes exercises from the pool when one matches the
+    requested topic, language, type and difficulty, and only calls the API
+    on a miss. Misses and the configured curriculum (exercise_pool.curriculum)
+    tell 'exercise pool refill' which exercises to keep in stock.
+    """
+    pass
+
+
+@exercise_pool.command("status")
+@click.pass_context
+def exercise_pool_status(ctx):
+    """Show how many exercises the pool holds for each topic."""
+    from rich.table import Table
+
+    config_dir = ctx.obj.get("config_dir")
+    config_manager = ConfigManager(Path(config_dir) if config_dir else None)
+    config_manager.load()
+
+    pool = ExercisePool.from_config(config_manager)
+    _warn_invalid_curriculum(pool)
+    slots = pool.slots()
+    if not slots:
+        console.print("[yellow]The exercise pool is empty.[/yellow]")
+        return
+
+    table = Table(title="Exercise Pool")
+    table.add_column("Topic")
+    table.add_column("Language")
+    table.add_column("Type")
+    table.add_column("Difficulty")
+    table.add_column("Level")
+    table.add_column("Available", justify="right")
+    for slot in slots:
+        color = "green" if slot["available"] >= pool.target_size else "yellow"
+        table.add_row(
+            slot["topic"],
+            slot["language"],
+            slot["exercise_type"],
+            slot["difficulty"],
+            slot["experience_level"],
+            f"[{color}]{slot['available']}[/{color}]",
+        )
+    console.print(table)
+
+
+@exercise_pool.command("refill")
+@click.option(
+    "--target", "-n",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Exercises to keep per topic (default: exercise_pool.target_size)",
+)
+@click.option(
+    "--workers", "-j",
+    type=click.IntRange(min=1),
+    default=ExercisePool.DEFAULT_REFILL_WORKERS,
+    help="Number of exercises generated concurrently",
+)
+@click.option(
+    "--watch",
+    type=click.FloatRange(min=1),
+    default=None,
+    help="Keep running, refilling every this many seconds",
+)
+@click.pass_context
+def exercise_pool_refill(ctx, target: Optional[int], workers: int, watch: Optional[float]):
+    """Generate exercises until the pool is stocked.
+
+    Run this from cron, or in the background with --watch, so that
+    'exercise generate' is served instantly.
+    """
+    import time
+
+    config_dir = ctx.obj.get("config_dir")
+    config_manager = ConfigManager(Path(config_dir) if config_dir else None)
+
+    try:
+        config_manager.load()
+        if not config_manager.is_configured():
+            console.print(
+                "[red]Error:[/red] Code Tutor is not configured.\n"
+                "Run 'code-tutor setup' first."
+            )
+            sys.exit(1)
+
+        api_key = config_manager.get_api_key()
+        generator = ExerciseGenerator(
+            api_key,
+            config_manager.get_model(),
+            client=get_client(api_key, config_manager),
+            on_api_call=_api_call_listener(ctx, config_manager),
+        )
+        pool = ExercisePool.from_config(config_manager)
+        _warn_invalid_curriculum(pool)
+
+        def report(slot, error):
+            label = (
+                f"{slot['topic']} "
+                f"({slot['language']}, {slot['exercise_type']}, {slot['difficulty']})"
+            )
+            if error is None:
+                console.print(f"[green]✓[/green] {label}")
+            else:
+                console.print(f"[red]✗[/red] {label}: {error}")
+
+        while True:
+            added = pool.refill(
+                generator, target_size=target, max_workers=workers, on_result=report
+            )
+            console.print(f"[cyan]Added {added} exercise(s) to the pool.[/cyan]")
+            if watch is None:
+                break
+            time.sleep(watch)
+
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Refill stopped.[/yellow]")
+    except Exception as e:
+        console.print(f"[red]Error refilling exercise pool:[/red] {e}")
+        sys.exit(1)
+
+
 @exercise.command("list")
 @click.option(
     "--status", "-s",
@@ -640,11 +1306,21 @@ def exercise_list(ctx, status: Optional[str]):
 
 @exercise.command("submit")
 @click.argument("exercise_path")
+@click.option(
+    "--full-review",
+    is_flag=True,
+    default=False,
+    help="Always get an AI review, even when all tests pass",
+)
 @click.pass_context
-def exercise_submit(ctx, exercise_path: str):
+def exercise_submit(ctx, exercise_path: str, full_review: bool):
     """Submit an exercise for review.
 
     EXERCISE_PATH: Path to the exercise directory or exercise ID
+
+    The exercise tests are run locally first and their results are included
+    in the review. When every test passes on an exercise judged by its tests,
+    the AI review is skipped unless --full-review is given.
     """
     config_dir = ctx.obj.get("config_dir")
     config_manager = ConfigManager(Path(config_dir) if config_dir else None)
@@ -681,21 +1357,32 @@ def exercise_submit(ctx, exercise_path: str):
             border_style="cyan",
         ))
         console.print()
-        console.print("[dim]Analyzing your solution...[/dim]")
-        console.print()
+
+        test_results = _run_exercise_tests(config_manager, exercise)
 
         # Review the submission
         api_key = config_manager.get_api_key()
         model = config_manager.get_model()
         experience_level = config_manager.get("experience_level", "intermediate")
 
-        generator = ExerciseGenerator(api_key, model)
-        review = generator.review_submission(
-            original_exercise=exercise["metadata"],
-            submitted_code=submitted_code,
-            language=exercise["metadata"].get("language", "Python"),
-            experience_level=experience_level,
+        generator = ExerciseGenerator(
+            api_key,
+            model,
+            client=get_client(api_key, config_manager),
+            on_api_call=_api_call_listener(ctx, config_manager),
         )
+        if not full_review and _skip_review_if_passing(config_manager, exercise, test_results):
+            review = generator.review_from_test_results(test_results)
+        else:
+            console.print("[dim]Analyzing your solution...[/dim]")
+            console.print()
+            review = generator.review_submission(
+                original_exercise=exercise["metadata"],
+                submitted_code=submitted_code,
+                language=exercise["metadata"].get("language", "Python"),
+                experience_level=experience_level,
+                test_results=test_results,
+            )
 
         # Display the review
         from rich.markdown import Markdown
@@ -704,6 +1391,7 @@ def exercise_submit(ctx, exercise_path: str):
 
         # Update status
         manager.update_status(exercise_path, ExerciseManager.STATUS_REVIEWED)
+        _log_exercise_reviews(config_manager, [(exercise, review)])
         console.print()
         console.print(f"[green]Exercise marked as reviewed.[/green]")
 
@@ -715,6 +1403,304 @@ def exercise_submit(ctx, exercise_path: str):
         sys.exit(1)
 
 
+@exercise.command("submit-batch")
+@click.argument("exercise_paths", nargs=-1, required=True)
+@click.option(
+    "--poll-interval",
+    type=float,
+    default=30.0,
+    help="Seconds between batch status checks (default: 30)",
+)
+@click.option(
+    "--batch-id",
+    default=None,
+    help="Collect results of an already submitted batch instead of submitting a new one "
+         "(pass the same exercise paths in the same order)",
+)
+@click.pass_context
+def exercise_submit_batch(ctx, exercise_paths, poll_interval: float, batch_id: Optional[str]):
+    """Review many exercise submissions in a single batch job.
+
+    EXERCISE_PATHS: Exercise directories or exercise IDs to review
+
+    All submissions are sent together through the Message Batches API, which
+    is cheaper and has higher throughput than reviewing them one at a time.
+    Each review is written to REVIEW.md in its exercise directory.
+    """
+    config_dir = ctx.obj.get("config_dir")
+    config_manager = ConfigManager(Path(config_dir) if config_dir else None)
+
+    try:
+        config_manager.load()
+        if not config_manager.is_configured():
+            console.print(
+                "[red]Error:[/red] Code Tutor is not configured.\n"
+                "Run 'code-tutor setup' first."
+            )
+            sys.exit(1)
+
+        manager = ExerciseManager(config_manager=config_manager)
+        experience_level = config_manager.get("experience_level", "intermediate")
+
+        api_key = config_manager.get_api_key()
+        model = config_manager.get_model()
+        generator = ExerciseGenerator(
+            api_key,
+            model,
+            client=get_client(api_key, config_manager),
+            on_api_call=_api_call_listener(ctx, config_manager),
+        )
+
+        # Collect the submissions, keyed by their position on the command line
+        submissions = []
+        exercises = {}
+        completed = []
+        for i, exercise_path in enumerate(exercise_paths):
+            exercise = manager.get_exercise(exercise_path)
+            if not exercise or not exercise.get("starter_file"):
+                console.print(f"[yellow]Skipping {exercise_path}: exercise not found.[/yellow]")
+                continue
+
+            with open(exercise["starter_file"], "r") as f:
+                submitted_code = f.read()
+
+            # Tests only run for new batches; a resumed batch already has its prompts
+            test_results = None
+            if batch_id is None:
+                test_results = _run_exercise_tests(config_manager, exercise, quiet=True)
+                if _skip_review_if_passing(config_manager, exercise, test_results):
+                    review = generator.review_from_test_results(test_results)
+                    review_path = manager.save_review(
+                        exercise_path, review["feedback"], review["assessment"]
+                    )
+                    completed.append((exercise, review))
+                    if review_path is None:
+                        console.print(
+                            f"[red]✗[/red] {exercise['id']}: all tests passed, but the "
+                            f"review could not be saved to {exercise['path']}"
+                        )
+                    else:
+                        console.print(
+                            f"[green]✓[/green] {exercise['id']}: all tests passed "
+                            f"[dim]({review_path})[/dim]"
+                        )
+                    continue
+
+            custom_id = f"submission-{i:04d}"
+            exercises[custom_id] = (exercise_path, exercise)
+            submissions.append({
+                "custom_id": custom_id,
+                "original_exercise": exercise["metadata"],
+                "submitted_code": submitted_code,
+                "language": exercise["metadata"].get("language", "Python"),
+                "experience_level": experience_level,
+                "test_results": test_results,
+            })
+
+        if not submissions:
+            if completed:
+                _log_exercise_reviews(config_manager, completed)
+                return
+            console.print("[red]Error:[/red] No exercises to review.")
+            sys.exit(1)
+
+        if batch_id is None:
+            batch_id = generator.submit_review_batch(submissions)
+            for exercise_path, _ in exercises.values():
+                manager.update_status(exercise_path, ExerciseManager.STATUS_SUBMITTED)
+            console.print(
+                f"[green]Submitted {len(submissions)} review(s) as batch[/green] {batch_id}"
+            )
+            console.print(
+                "[dim]If interrupted, collect the results later with --batch-id.[/dim]\n"
+            )
+
+        try:
+            with console.status("Waiting for batch to finish...") as status:
+                def show_progress(batch):
+                    counts = batch.request_counts
+                    status.update(
+                        f"Waiting for batch to finish... "
+                        f"{counts.succeeded + counts.errored} done, "
+                        f"{counts.processing} processing"
+                    )
+
+                generator.wait_for_batch(
+                    batch_id, poll_interval=poll_interval, on_poll=show_progress
+                )
+        except KeyboardInterrupt:
+            _log_exercise_reviews(config_manager, completed)
+            console.print(
+                f"\n[yellow]Stopped waiting; the batch keeps running. Collect its results "
+                f"with --batch-id {batch_id}, passing the same exercise paths in the same "
+                f"order.[/yellow]"
+            )
+            return
+
+        reviews = generator.get_batch_reviews(batch_id)
+
+        unsaved = 0
+        console.print()
+        for custom_id, (exercise_path, exercise) in exercises.items():
+            review = reviews.get(custom_id)
+            if review is None or "error" in review:
+                error = review["error"] if review else "no result returned"
+                console.print(f"[red]✗[/red] {exercise['id']}: {error}")
+                continue
+
+            review_path = manager.save_review(
+                exercise_path, review["feedback"], review["assessment"]
+            )
+            completed.append((exercise, review))
+            if review_path is None:
+                unsaved += 1
+                console.print(
+                    f"[red]✗[/red] {exercise['id']}: {review['assessment']}, but the "
+                    f"review could not be saved to {exercise['path']}"
+                )
+                continue
+            console.print(
+                f"[green]✓[/green] {exercise['id']}: {review['assessment']} "
+                f"[dim]({review_path})[/dim]"
+            )
+
+        _log_exercise_reviews(config_manager, completed)
+        if unsaved:
+            console.print(
+                f"\n[yellow]{unsaved} review(s) could not be saved. Collect them again with "
+                f"--batch-id {batch_id} once the exercise directories are writable.[/yellow]"
+            )
+
+    except ValueError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        sys.exit(1)
+    except Exception as e:
+        console.print(f"[red]Unexpected error:[/red] {e}")
+        sys.exit(1)
+
+
+def _warn_invalid_curriculum(pool: ExercisePool) -> None:
+    """Show the exercise_pool.curriculum entries the pool skipped.
+
+    Args:
+        pool: Exercise pool created from the configuration.
+    """
+    for entry in pool.invalid_curriculum:
+        console.print(
+            f"[yellow]Warning:[/yellow] Skipping exercise_pool.curriculum entry "
+            f"without a topic: {entry!r}"
+        )
+
+
+def _run_exercise_tests(
+    config_manager: ConfigManager, exercise: dict, quiet: bool = False
+) -> Optional[dict]:
+    """Run an exercise's tests locally if enabled and show the results.
+
+    Args:
+        config_manager: Loaded configuration manager.
+        exercise: Exercise info dictionary.
+        quiet: Only show a one-line summary.
+
+    Returns:
+        Test results from ExerciseRunner.run(), or None if no tests were run.
+    """
+    if not config_manager.get("exercise_tests.enabled", True):
+        return None
+
+    runner = ExerciseRunner.from_config(config_manager)
+    if runner.find_test_file(exercise) is None:
+        return None
+
+    with console.status(f"Running tests for {exercise['id']}..."):
+        results = runner.run(exercise)
+
+    color = "green" if results["status"] == "passed" else "yellow"
+    if quiet:
+        console.print(
+            f"[{color}]{exercise['id']}: {results['passed']}/{len(results['tests'])} "
+            f"test(s) passed[/{color}]"
+        )
+        return results
+
+    from rich.markdown import Markdown
+    console.print(Panel(
+        Markdown(ExerciseRunner.summarize(results)),
+        border_style=color,
+        title="Test Results",
+    ))
+    console.print()
+    return results
+
+
+def _skip_review_if_passing(
+    config_manager: ConfigManager, exercise: dict, test_results: Optional[dict]
+) -> bool:
+    """Check whether a submission can be accepted on its test results alone.
+
+    Args:
+        config_manager: Loaded configuration manager.
+        exercise: Exercise info dictionary.
+        test_results: Test results, or None if no tests were run.
+
+    Returns:
+        True if the AI review should be skipped.
+    """
+    return (
+        bool(config_manager.get("exercise_tests.skip_review_if_passing", True))
+        and ExerciseRunner.is_fast_path(exercise, test_results)
+    )
+
+
+def _api_call_listener(ctx, config_manager: ConfigManager) -> Optional[ApiCallListener]:
+    """Log the API calls of an exercise command in a session of their own.
+
+    The session ends when the command's context closes, including on errors.
+
+    Args:
+        ctx: Click context of the running command.
+        config_manager: Loaded configuration manager.
+
+    Returns:
+        Listener to pass to ExerciseGenerator, or None if API calls aren't logged.
+    """
+    if not config_manager.is_logging_enabled() or not config_manager.should_log_api_calls():
+        return None
+
+    logger = SessionLogger.from_config(config_manager)
+    logger.start_session("exercise", {
+        "command": ctx.command_path,
+        "model": config_manager.get_model(),
+    })
+    ctx.call_on_close(logger.end_session)
+    return logger.log_api_call
+
+
+def _log_exercise_reviews(config_manager: ConfigManager, reviews: list) -> None:
+    """Log exercise review results if interaction logging is enabled.
+
+    Args:
+        config_manager: Loaded configuration manager.
+        reviews: List of (exercise, review) tuples.
+    """
+    if not reviews or not config_manager.is_logging_enabled():
+        return
+    if not config_manager.should_log_interactions():
+        return
+
+    logger = SessionLogger.from_config(config_manager)
+    logger.start_session("exercise_review", {"model": config_manager.get_model()})
+    for exercise, review in reviews:
+        metadata = exercise["metadata"]
+        logger.log_exercise_review(
+            exercise["id"],
+            metadata.get("topic", ""),
+            metadata.get("language", ""),
+            review["assessment"],
+        )
+    logger.end_session()
+
+
 @exercise.command("hint")
 @click.argument("exercise_path")
 @click.pass_context
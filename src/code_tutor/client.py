@@ -0,0 +1,307 @@
+"""Shared Anthropic API client for Code Tutor."""
+
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import anthropic
+
+from .config import ConfigManager
+
+
+# Defaults for the shared HTTP connection pool
+DEFAULT_TIMEOUT_SECONDS = 120.0
+DEFAULT_CONNECT_TIMEOUT_SECONDS = 10.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_EXPIRY_SECONDS = 60.0
+
+_clients: Dict[Tuple, anthropic.Anthropic] = {}
+_async_clients: Dict[Tuple, anthropic.AsyncAnthropic] = {}
+_clients_lock = threading.Lock()
+
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+
+def _client_options(config_manager: Optional[ConfigManager]) -> Tuple:
+    """Read the client tuning options from configuration.
+
+    Args:
+        config_manager: Optional configuration manager; defaults are used if None.
+
+    Returns:
+        Tuple of (base_url, timeout, max_retries, max_connections).
+    """
+    if config_manager is None:
+        return (None, DEFAULT_TIMEOUT_SECONDS, DEFAULT_MAX_RETRIES, DEFAULT_MAX_CONNECTIONS)
+
+    return (
+        config_manager.get("api.base_url", "") or None,
+        float(config_manager.get("api.timeout_seconds", DEFAULT_TIMEOUT_SECONDS)),
+        int(config_manager.get("api.max_retries", DEFAULT_MAX_RETRIES)),
+        int(config_manager.get("api.max_connections", DEFAULT_MAX_CONNECTIONS)),
+    )
+
+
+def _connection_limits(max_connections: int):
+    """Build connection pool limits for the given connection count."""
+    # Use the Limits class of whichever HTTP library the installed SDK is built on
+    limits_class = type(anthropic.DEFAULT_CONNECTION_LIMITS)
+    return limits_class(
+        max_connections=max_connections,
+        max_keepalive_connections=min(DEFAULT_MAX_KEEPALIVE_CONNECTIONS, max_connections),
+        keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+def _build_client(
+    api_key: str,
+    base_url: Optional[str],
+    timeout: float,
+    max_retries: int,
+    max_connections: int,
+) -> anthropic.Anthropic:
+    """Create a client backed by a tuned, keep-alive HTTP connection pool."""
+    return anthropic.Anthropic(
+        api_key=api_key,
+        base_url=base_url,
+        timeout=anthropic.Timeout(timeout, connect=DEFAULT_CONNECT_TIMEOUT_SECONDS),
+        max_retries=max_retries,
+        http_client=anthropic.DefaultHttpxClient(limits=_connection_limits(max_connections)),
+    )
+
+
+def _build_async_client(
+    api_key: str,
+    base_url: Optional[str],
+    timeout: float,
+    max_retries: int,
+    max_connections: int,
+) -> anthropic.AsyncAnthropic:
+    """Create an async client backed by a tuned, keep-alive HTTP connection pool."""
+    return anthropic.AsyncAnthropic(
+        api_key=api_key,
+        base_url=base_url,
+        timeout=anthropic.Timeout(timeout, connect=DEFAULT_CONNECT_TIMEOUT_SECONDS),
+        max_retries=max_retries,
+        http_client=anthropic.DefaultAsyncHttpxClient(
+            limits=_connection_limits(max_connections)
+        ),
+    )
+
+
+def get_client(
+    api_key: str,
+    config_manager: Optional[ConfigManager] = None,
+) -> anthropic.Anthropic:
+    """Get the process-wide Anthropic client for an API key.
+
+    Every analyzer and session shares one client (and therefore one HTTP
+    connection pool) per API key and set of options, so connections and TLS
+    sessions are reused across requests instead of re-established per component.
+
+    Args:
+        api_key: Anthropic API key.
+        config_manager: Optional configuration manager providing the 'api' options
+            (base_url, timeout_seconds, max_retries, max_connections).
+
+    Returns:
+        Shared Anthropic client.
+    """
+    options = _client_options(config_manager)
+    key = (api_key,) + options
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _build_client(api_key, *options)
+            _clients[key] = client
+
+    return client
+
+
+def get_async_client(
+    api_key: str,
+    config_manager: Optional[ConfigManager] = None,
+) -> anthropic.AsyncAnthropic:
+    """Get the process-wide async Anthropic client for an API key.
+
+    The async counterpart of get_client(), for embedding Code Tutor in an
+    asyncio server. The client's connection pool belongs to the event loop it
+    is first used on, so share it only within a single event loop.
+
+    Args:
+        api_key: Anthropic API key.
+        config_manager: Optional configuration manager providing the 'api' options.
+
+    Returns:
+        Shared AsyncAnthropic client.
+    """
+    options = _client_options(config_manager)
+    key = (api_key,) + options
+
+    with _clients_lock:
+        client = _async_clients.get(key)
+        if client is None:
+            client = _build_async_client(api_key, *options)
+            _async_clients[key] = client
+
+    return client
+
+
+# Signature of API call listeners such as SessionLogger.log_api_call. They are
+# passed per request (usually by the analyzer, generator or session that owns
+# the logger), so concurrent sessions in one process never see each other's calls.
+ApiCallListener = Callable[..., None]
+
+
+def create_message(
+    client: anthropic.Anthropic,
+    call_site: str,
+    on_text: Optional[Callable[[str], None]] = None,
+    on_api_call: Optional[ApiCallListener] = None,
+    **params: Any,
+) -> Any:
+    """Send a messages request and report its latency and token usage.
+
+    Every messages call in the package goes through this wrapper (or its
+    async counterpart), so an API call listener sees wall time, time to
+    first token when streaming, token usage, model and call site for all of
+    them.
+
+    Args:
+        client: Anthropic client to use.
+        call_site: Name of the calling component, e.g. 'CodeAnalyzer.analyze_code'.
+        on_text: Optional callback; when given the response is streamed and
+            each text delta is passed to it.
+        on_api_call: Optional listener called with the keyword arguments of
+            SessionLogger.log_api_call: model, prompt, response, usage,
+            call_site, latency_seconds, time_to_first_token_seconds and error.
+        **params: Keyword arguments for messages.create / messages.stream.
+
+    Returns:
+        The final Message.
+    """
+    start = time.perf_counter()
+    first_token = None
+
+    try:
+        if on_text is None:
+            response = client.messages.create(**params)
+        else:
+            with client.messages.stream(**params) as stream:
+                for text in stream.text_stream:
+                    if first_token is None:
+                        first_token = time.perf_counter() - start
+                    on_text(text)
+                response = stream.get_final_message()
+    except Exception as e:
+        _report_api_call(
+            on_api_call, call_site, params, None, time.perf_counter() - start, first_token, e
+        )
+        raise
+
+    _report_api_call(
+        on_api_call, call_site, params, response, time.perf_counter() - start, first_token
+    )
+    return response
+
+
+async def acreate_message(
+    client: anthropic.AsyncAnthropic,
+    call_site: str,
+    on_text: Optional[Callable[[str], None]] = None,
+    on_api_call: Optional[ApiCallListener] = None,
+    **params: Any,
+) -> Any:
+    """Async counterpart of create_message() for AsyncAnthropic clients.
+
+    Args:
+        client: AsyncAnthropic client to use.
+        call_site: Name of the calling component.
+        on_text: Optional callback for streamed text deltas.
+        on_api_call: Optional listener for the call's metrics.
+        **params: Keyword arguments for messages.create / messages.stream.
+
+    Returns:
+        The final Message.
+    """
+    start = time.perf_counter()
+    first_token = None
+
+    try:
+        if on_text is None:
+            response = await client.messages.create(**params)
+        else:
+            async with client.messages.stream(**params) as stream:
+                async for text in stream.text_stream:
+                    if first_token is None:
+                        first_token = time.perf_counter() - start
+                    on_text(text)
+                response = await stream.get_final_message()
+    except Exception as e:
+        _report_api_call(
+            on_api_call, call_site, params, None, time.perf_counter() - start, first_token, e
+        )
+        raise
+
+    _report_api_call(
+        on_api_call, call_site, params, response, time.perf_counter() - start, first_token
+    )
+    return response
+
+
+def _report_api_call(
+    on_api_call: Optional[ApiCallListener],
+    call_site: str,
+    params: Dict[str, Any],
+    response: Any,
+    latency: float,
+    first_token: Optional[float],
+    error: Optional[Exception] = None,
+) -> None:
+    """Pass the metrics of one API call to its listener, if any."""
+    if on_api_call is None:
+        return
+
+    messages = params.get("messages") or [{}]
+    prompt = messages[-1].get("content", "")
+    if not isinstance(prompt, str):
+        prompt = str(prompt)
+
+    text = ""
+    usage = {}
+    if response is not None:
+        # Forced tool calls (structured output) are logged as their JSON input
+        text = "".join(
+            json.dumps(block.input) if getattr(block, "type", "") == "tool_use"
+            else getattr(block, "text", "")
+            for block in response.content
+        )
+        usage = {
+            field: getattr(response.usage, field, 0) or 0 for field in USAGE_FIELDS
+        }
+
+    try:
+        on_api_call(
+            model=params.get("model", ""),
+            prompt=prompt,
+            response=text,
+            usage=usage,
+            call_site=call_site,
+            latency_seconds=round(latency, 3),
+            time_to_first_token_seconds=(
+                round(first_token, 3) if first_token is not None else None
+            ),
+            error=str(error) if error is not None else None,
+        )
+    except Exception:
+        # Instrumentation must never break the API call it observes
+        pass
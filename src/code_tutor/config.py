@@ -50,6 +50,7 @@ class ConfigManager:
         "model": "claude-sonnet-4-5",
         "experience_level": "intermediate",
         "exercises_dir": "",  # Empty means use default ~/code-tutor-exercises/
+        "streaming": True,  # Render responses progressively as they arrive
         "preferences": {
             "question_style": "socratic",
             "verbosity": "medium",
@@ -59,6 +60,48 @@ class ConfigManager:
             "enabled": False,
             "log_interactions": True,
             "log_api_calls": False,
+            "compression": "gzip",
+            "max_age_days": 90,
+            "max_total_mb": 500,
+        },
+        "cache": {
+            "enabled": True,
+            "max_size_mb": 50,
+            "max_age_days": 7,
+        },
+        "history": {
+            "max_tokens": 16000,  # Older follow-up turns are summarized past this budget
+            "keep_recent_turns": 3,
+        },
+        "chunking": {
+            "threshold_lines": 800,  # Larger files are analyzed in chunks
+            "chunk_lines": 400,
+            "max_workers": 4,
+        },
+        "teaching": {
+            "prefetch_next_round": True,  # Generate both possible next rounds while the user types
+            "history_rounds": 1,  # Earlier rounds are sent as one-line summaries
+            "use_library": True,  # Serve new problems from the topic library first
+        },
+        "exercise_tests": {
+            "enabled": True,  # Run exercise tests locally before reviewing a submission
+            "skip_review_if_passing": True,
+            "timeout_seconds": 10,
+            "cpu_seconds": 10,
+            "memory_mb": 512,
+        },
+        "exercise_pool": {
+            "enabled": True,  # Serve 'exercise generate' from pre-generated exercises
+            "target_size": 3,
+            "curriculum": [],  # [{"topic", optional "language", "exercise_type", "difficulty"}, ...]
+            "request_ttl_days": 30,  # Drop slots added by misses after this long unrequested
+            "max_requested_slots": 50,  # Keep at most this many slots added by misses
+        },
+        "api": {
+            "base_url": "",  # Empty means the Anthropic default (or ANTHROPIC_BASE_URL)
+            "timeout_seconds": 120,
+            "max_retries": 3,
+            "max_connections": 20,
         },
     }
 
@@ -316,6 +359,14 @@ class ConfigManager:
         """
         return self.get("model", "claude-sonnet-4-5")
 
+    def is_streaming_enabled(self) -> bool:
+        """Check if streaming responses are enabled.
+
+        Returns:
+            True if responses should be rendered as they stream in, False otherwise.
+        """
+        return self.get("streaming", True)
+
     def is_logging_enabled(self) -> bool:
         """Check if logging is enabled.
 
@@ -340,6 +391,14 @@ class ConfigManager:
         """
         return self.get("logging.log_api_calls", False)
 
+    def is_cache_enabled(self) -> bool:
+        """Check if the on-disk response cache is enabled.
+
+        Returns:
+            True if repeat analyses should be served from the cache, False otherwise.
+        """
+        return self.get("cache.enabled", True)
+
     def is_api_key_locked(self) -> bool:
         """Check if the API key is locked from being changed.
 
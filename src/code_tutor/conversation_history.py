@@ -0,0 +1,159 @@
+"""Token-budgeted conversation history for Code Tutor."""
+
+from typing import Dict, Iterator, List, Optional
+
+
+class ConversationHistory:
+    """Conversation turns kept within a token budget.
+
+    Every message carries a token count (exact for assistant replies, where
+    the API reports output tokens, estimated otherwise). Once the history
+    grows past ``max_tokens``, the oldest user/assistant exchanges are dropped
+    and replaced by a short extractive summary. The opening exchange (the
+    initial analysis and its questions) and the ``keep_recent_turns`` most
+    recent exchanges are always kept verbatim. The code under review lives in
+    the system prompt, so it is never affected.
+    """
+
+    DEFAULT_MAX_TOKENS = 16000
+    DEFAULT_KEEP_RECENT_TURNS = 3
+
+    # Rough characters-per-token ratio used when no exact count is known
+    CHARS_PER_TOKEN = 4
+
+    # Number of leading messages (the opening exchange) never compacted
+    KEEP_FIRST_MESSAGES = 2
+
+    # How much of each side of a dropped exchange survives in the summary
+    SUMMARY_USER_CHARS = 200
+    SUMMARY_ASSISTANT_CHARS = 300
+
+    SUMMARY_HEADER = "Summary of earlier discussion (older turns omitted to save context):"
+
+    def __init__(
+        self,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        keep_recent_turns: int = DEFAULT_KEEP_RECENT_TURNS,
+    ):
+        """Initialize an empty history.
+
+        Args:
+            max_tokens: Token budget for the messages sent with each request.
+            keep_recent_turns: Number of most recent exchanges never compacted.
+        """
+        self.max_tokens = max_tokens
+        self.keep_recent_turns = keep_recent_turns
+        self._messages: List[Dict[str, str]] = []
+        self._tokens: List[int] = []
+        self._summary_lines: List[str] = []
+        self.compacted_turns = 0
+
+    @classmethod
+    def estimate_tokens(cls, text: str) -> int:
+        """Estimate the token count of a piece of text.
+
+        Args:
+            text: Text to measure.
+
+        Returns:
+            Approximate number of tokens.
+        """
+        return len(text) // cls.CHARS_PER_TOKEN + 1
+
+    def append(self, message: Dict[str, str], tokens: Optional[int] = None) -> None:
+        """Add a message and compact the history if it is over budget.
+
+        Args:
+            message: Message dict with 'role' and 'content'.
+            tokens: Exact token count if known; estimated from the text otherwise.
+        """
+        if tokens is None:
+            tokens = self.estimate_tokens(message["content"])
+
+        self._messages.append(message)
+        self._tokens.append(tokens)
+        self._compact()
+
+    def messages(self) -> List[Dict[str, str]]:
+        """Get the messages to send to the API.
+
+        Returns:
+            List of message dicts, with any summary of dropped turns prepended
+            to the first message after the opening exchange.
+        """
+        messages = list(self._messages)
+        if self._summary_lines and len(messages) > self.KEEP_FIRST_MESSAGES:
+            first = messages[self.KEEP_FIRST_MESSAGES]
+            messages[self.KEEP_FIRST_MESSAGES] = {
+                "role": first["role"],
+                "content": f"{self._summary_text()}\n\n{first['content']}",
+            }
+        return messages
+
+    @property
+    def total_tokens(self) -> int:
+        """Approximate token count of the messages sent with each request."""
+        summary_tokens = (
+            self.estimate_tokens(self._summary_text()) if self._summary_lines else 0
+        )
+        return sum(self._tokens) + summary_tokens
+
+    def clear(self) -> None:
+        """Remove all messages and any summary."""
+        self._messages = []
+        self._tokens = []
+        self._summary_lines = []
+        self.compacted_turns = 0
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return iter(self._messages)
+
+    def _compact(self) -> None:
+        """Drop the oldest compactable exchanges until the history fits the budget."""
+        # Keep the recent exchanges plus a trailing user message awaiting its reply
+        protected_tail = 2 * self.keep_recent_turns + len(self._messages) % 2
+
+        while self.total_tokens > self.max_tokens:
+            compactable = len(self._messages) - self.KEEP_FIRST_MESSAGES - protected_tail
+            if compactable < 2:
+                break
+
+            start = self.KEEP_FIRST_MESSAGES
+            user, assistant = self._messages[start], self._messages[start + 1]
+            del self._messages[start:start + 2]
+            del self._tokens[start:start + 2]
+            self._summary_lines.append(self._summarize_turn(user, assistant))
+            self.compacted_turns += 1
+
+        # The summary must not itself outgrow a fraction of the budget
+        while len(self._summary_lines) > 1 and (
+            self.estimate_tokens(self._summary_text()) > self.max_tokens // 4
+        ):
+            self._summary_lines.pop(0)
+
+    def _summary_text(self) -> str:
+        return "\n".join([self.SUMMARY_HEADER] + self._summary_lines)
+
+    def _summarize_turn(self, user: Dict[str, str], assistant: Dict[str, str]) -> str:
+        """Condense one exchange into a summary line.
+
+        Args:
+            user: The user message of the exchange.
+            assistant: The assistant reply of the exchange.
+
+        Returns:
+            Summary line for the exchange.
+        """
+        question = self._clip(user["content"], self.SUMMARY_USER_CHARS)
+        answer = self._clip(assistant["content"], self.SUMMARY_ASSISTANT_CHARS)
+        return f"- Student: {question}\n  Tutor: {answer}"
+
+    @staticmethod
+    def _clip(text: str, limit: int) -> str:
+        text = " ".join(text.split())
+        if len(text) <= limit:
+            return text
+        return text[:limit].rsplit(" ", 1)[0] + "..."
@@ -1,24 +1,109 @@
 """Exercise generation using Claude API."""
 
-from typing import Dict, List, Optional, Any
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, ClassVar, Dict, List, Optional
 import anthropic
 
+from .client import ApiCallListener, create_message, get_client
 from .exercise_manager import ExerciseManager
+from .exercise_runner import ExerciseRunner
+from .structured_output import StructuredResult, create_structured_message
+
+
+@dataclass
+class ExerciseContent(StructuredResult):
+    """Generated content of an exercise."""
+
+    instructions: str = ""
+    learning_objectives: List[str] = field(default_factory=list)
+    starter_code: str = ""
+    test_code: str = ""
+    hints: List[str] = field(default_factory=list)
+    solution_explanation: str = ""
+
+    TOOL_NAME: ClassVar[str] = "create_exercise"
+    TOOL_DESCRIPTION: ClassVar[str] = "Create a practice exercise from its components."
+    SCHEMA: ClassVar[Dict[str, Any]] = {
+        "type": "object",
+        "properties": {
+            "instructions": {
+                "type": "string",
+                "description": "Clear, detailed instructions for the learner (Markdown).",
+            },
+            "learning_objectives": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "What concepts the learner will understand.",
+            },
+            "starter_code": {
+                "type": "string",
+                "description": "The code the learner works with, without Markdown fences.",
+            },
+            "test_code": {
+                "type": "string",
+                "description": "Runnable tests for the solution, without Markdown fences.",
+            },
+            "hints": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Progressively more specific hints.",
+            },
+            "solution_explanation": {
+                "type": "string",
+                "description": "What the correct solution looks like and why (hidden).",
+            },
+        },
+        "required": [
+            "instructions",
+            "learning_objectives",
+            "starter_code",
+            "test_code",
+            "hints",
+            "solution_explanation",
+        ],
+    }
 
 
 class ExerciseGenerator:
     """Generates coding exercises using Claude API."""
 
-    def __init__(self, api_key: str, model: str = "claude-sonnet-4-5"):
+    REVIEW_MAX_TOKENS = 2048
+
+    # Backoff for rate-limited requests in generate_exercise_set(), on top of
+    # the client's own retries
+    RATE_LIMIT_RETRIES = 5
+    RATE_LIMIT_BASE_DELAY = 2.0
+    RATE_LIMIT_MAX_DELAY = 60.0
+    DEFAULT_SET_WORKERS = 4
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "claude-sonnet-4-5",
+        client: Optional[anthropic.Anthropic] = None,
+        on_api_call: Optional[ApiCallListener] = None,
+    ):
         """Initialize the exercise generator.
 
         Args:
             api_key: Anthropic API key.
             model: Claude model to use.
+            client: Optional Anthropic client; defaults to the shared client.
+            on_api_call: Optional listener for the metrics of each API call,
+                e.g. SessionLogger.log_api_call.
         """
-        self.client = anthropic.Anthropic(api_key=api_key)
+        self.client = client or get_client(api_key)
+        self.on_api_call = on_api_call
         self.model = model
 
+        # Shared by all generate_exercise_set() workers, so a rate limit pauses them all
+        self._rate_limited_until = 0.0
+        self._rate_limit_lock = threading.Lock()
+
     def generate_exercise(
         self,
         topic: str,
@@ -44,17 +129,112 @@ class ExerciseGenerator:
         )
 
         try:
-            response = self.client.messages.create(
+            result, content = create_structured_message(
+                self.client,
+                "ExerciseGenerator.generate_exercise",
+                ExerciseContent,
+                on_api_call=self.on_api_call,
+                fallback_prompt=self._build_fallback_prompt(language),
                 model=self.model,
                 max_tokens=4096,
                 messages=[{"role": "user", "content": prompt}],
             )
 
-            content = response.content[0].text
-            return self._parse_exercise_response(content)
+            # Fall back to the Markdown format if the response wasn't a tool call
+            if result is None:
+                return self._parse_exercise_response(content)
+            return result.to_dict()
 
         except Exception as e:
-            raise ValueError(f"Failed to generate exercise: {e}")
+            raise ValueError(f"Failed to generate exercise: {e}") from e
+
+    def generate_exercise_set(
+        self,
+        requests: List[Dict[str, str]],
+        max_workers: int = DEFAULT_SET_WORKERS,
+        on_result: Optional[Callable[..., None]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Generate many exercises concurrently.
+
+        When a request is rate limited, every worker pauses (for the
+        server's retry-after time if given, else an exponential backoff with
+        jitter) before the request is retried, up to RATE_LIMIT_RETRIES times.
+
+        Args:
+            requests: Keyword arguments for generate_exercise(), one dict per
+                exercise (topic, language, exercise_type, difficulty,
+                experience_level).
+            max_workers: Maximum number of concurrent generations.
+            on_result: Optional callback, called in the calling thread as each
+                exercise finishes, with the request and either the content or
+                the exception.
+
+        Returns:
+            List of dicts with 'request', 'content' and 'error', in request order.
+        """
+        results: List[Dict[str, Any]] = [
+            {"request": request, "content": None, "error": None} for request in requests
+        ]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._generate_with_backoff, request): i
+                for i, request in enumerate(requests)
+            }
+            for future in as_completed(futures):
+                result = results[futures[future]]
+                try:
+                    result["content"] = future.result()
+                except Exception as e:
+                    result["error"] = e
+                if on_result:
+                    on_result(result["request"], result["content"], result["error"])
+
+        return results
+
+    def _generate_with_backoff(self, request: Dict[str, str]) -> Dict[str, Any]:
+        """Generate one exercise, backing off and retrying when rate limited.
+
+        Args:
+            request: Keyword arguments for generate_exercise().
+
+        Returns:
+            Exercise content.
+        """
+        attempt = 0
+        while True:
+            with self._rate_limit_lock:
+                wait = self._rate_limited_until - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+
+            try:
+                return self.generate_exercise(**request)
+            except ValueError as e:
+                error = e.__cause__
+                if not isinstance(error, anthropic.RateLimitError):
+                    raise
+                if attempt >= self.RATE_LIMIT_RETRIES:
+                    raise
+
+                delay = self._retry_after(error)
+                if delay is None:
+                    delay = min(
+                        self.RATE_LIMIT_MAX_DELAY, self.RATE_LIMIT_BASE_DELAY * 2 ** attempt
+                    ) * random.uniform(0.5, 1.0)
+                with self._rate_limit_lock:
+                    self._rate_limited_until = max(
+                        self._rate_limited_until, time.monotonic() + delay
+                    )
+                attempt += 1
+
+    @staticmethod
+    def _retry_after(error: anthropic.RateLimitError) -> Optional[float]:
+        """Read the server's requested wait from a rate limit error, if any."""
+        try:
+            return max(0.0, float(error.response.headers.get("retry-after")))
+        except (AttributeError, TypeError, ValueError):
+            return None
 
     def _build_generation_prompt(
         self,
@@ -131,42 +311,61 @@ Difficulty Guidance: {difficulty_guidance.get(difficulty, difficulty_guidance['i
 Exercise Type Instructions:
 {type_instructions.get(exercise_type, type_instructions[ExerciseManager.TYPE_IMPLEMENTATION])}
 
-Generate a complete exercise with the following format:
+Generate a complete exercise by calling the {ExerciseContent.TOOL_NAME} tool with:
+- instructions: clear, detailed instructions for what the learner should do. Be specific about requirements and constraints. 2-4 paragraphs.
+- learning_objectives: about 3 objectives - what concepts will they understand?
+- starter_code: the code template/buggy code/signature that the learner will work with, without Markdown fences
+- test_code: test cases the learner can run to verify their solution (optional but recommended), without Markdown fences
+- hints: 3 hints - a gentle nudge in the right direction, then more specific guidance, then one that nearly gives away the approach but not the answer
+- solution_explanation: brief explanation of what the correct solution looks like and why - this will be hidden from the learner
+
+Remember:
+- Make the exercise practical and relevant
+- The starter code should be 15-50 lines depending on complexity
+- Hints should progressively reveal more without giving away the answer
+- Test code should be runnable if the learner has the standard testing framework
+- Test code imports the learner's code from the starter file (e.g. `from starter import ...` in Python)"""
+
+    @staticmethod
+    def _build_fallback_prompt(language: str) -> str:
+        """Build the Markdown format for an exercise, for endpoints without tool support.
+
+        Args:
+            language: Programming language.
+
+        Returns:
+            The format instructions.
+        """
+        return f"""If you can't call tools, use the following format:
 
 ## Instructions
-[Clear, detailed instructions for what the learner should do. Be specific about requirements and constraints. 2-4 paragraphs.]
+[Instructions for the learner]
 
 ## Learning Objectives
-- [Objective 1 - what concept will they understand?]
+- [Objective 1]
 - [Objective 2]
 - [Objective 3]
 
 ## Starter Code
 ```{language.lower()}
-[The code template/buggy code/signature that the learner will work with]
+[The code the learner will work with]
 ```
 
 ## Test Code
 ```{language.lower()}
-[Optional but recommended: test cases the learner can run to verify their solution]
+[Test cases for the solution]
 ```
 
 ## Hints
-1. [First hint - gentle nudge in the right direction]
-2. [Second hint - more specific guidance]
-3. [Third hint - nearly gives away the approach but not the answer]
+1. [First hint]
+2. [Second hint]
+3. [Third hint]
 
 ## Solution Explanation
-[Brief explanation of what the correct solution looks like and why - this will be hidden from the learner]
-
-Remember:
-- Make the exercise practical and relevant
-- The starter code should be 15-50 lines depending on complexity
-- Hints should progressively reveal more without giving away the answer
-- Test code should be runnable if the learner has the standard testing framework"""
+[Hidden explanation of the solution]"""
 
     def _parse_exercise_response(self, response: str) -> Dict[str, Any]:
-        """Parse the exercise generation response.
+        """Parse an exercise generation response given as Markdown instead of a tool call.
 
         Args:
             response: Raw response from Claude.
@@ -292,6 +491,7 @@ Remember:
         submitted_code: str,
         language: str,
         experience_level: str = "intermediate",
+        test_results: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Review a submitted exercise solution.
 
@@ -300,11 +500,175 @@ Remember:
             submitted_code: The learner's submitted code.
             language: Programming language.
             experience_level: User's experience level.
+            test_results: Optional results of running the exercise tests
+                (from ExerciseRunner.run()), included in the prompt.
 
         Returns:
             Dictionary with review feedback.
         """
-        prompt = f"""You are reviewing a coding exercise submission from a {experience_level} programmer.
+        prompt = self._build_review_prompt(
+            original_exercise, submitted_code, language, experience_level, test_results
+        )
+
+        try:
+            response = create_message(
+                self.client,
+                "ExerciseGenerator.review_submission",
+                on_api_call=self.on_api_call,
+                model=self.model,
+                max_tokens=self.REVIEW_MAX_TOKENS,
+                messages=[{"role": "user", "content": prompt}],
+            )
+
+            return self._parse_review_response(response.content[0].text)
+
+        except Exception as e:
+            raise ValueError(f"Failed to review submission: {e}")
+
+    def review_from_test_results(self, test_results: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a review from passing test results without calling the API.
+
+        Args:
+            test_results: Results from ExerciseRunner.run() where every test passed.
+
+        Returns:
+            Dictionary with feedback and assessment, like review_submission().
+        """
+        feedback = (
+            "## Correctness\n"
+            f"{ExerciseRunner.summarize(test_results)}\n\n"
+            "## Overall Assessment\n"
+            "GOOD\n\n"
+            "Your solution passes all of the exercise tests. Run `code-tutor exercise "
+            "submit --full-review` for feedback on code quality and style."
+        )
+        return {
+            "feedback": feedback,
+            "assessment": "GOOD",
+        }
+
+    def submit_review_batch(self, submissions: List[Dict[str, Any]]) -> str:
+        """Submit many exercise reviews as a single Message Batches job.
+
+        Args:
+            submissions: List of dictionaries, each with ``custom_id``,
+                ``original_exercise``, ``submitted_code``, ``language`` and
+                optionally ``experience_level`` and ``test_results``.
+                ``custom_id`` must be unique and match ``[a-zA-Z0-9_-]{1,64}``.
+
+        Returns:
+            The batch ID.
+        """
+        requests = []
+        for submission in submissions:
+            prompt = self._build_review_prompt(
+                submission["original_exercise"],
+                submission["submitted_code"],
+                submission["language"],
+                submission.get("experience_level", "intermediate"),
+                submission.get("test_results"),
+            )
+            requests.append({
+                "custom_id": submission["custom_id"],
+                "params": {
+                    "model": self.model,
+                    "max_tokens": self.REVIEW_MAX_TOKENS,
+                    "messages": [{"role": "user", "content": prompt}],
+                },
+            })
+
+        try:
+            batch = self.client.messages.batches.create(requests=requests)
+            return batch.id
+        except Exception as e:
+            raise ValueError(f"Failed to submit review batch: {e}")
+
+    def wait_for_batch(
+        self,
+        batch_id: str,
+        poll_interval: float = 10.0,
+        on_poll: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        """Poll a batch until it has finished processing.
+
+        Args:
+            batch_id: The batch ID from submit_review_batch().
+            poll_interval: Seconds to wait between status checks.
+            on_poll: Optional callback receiving the batch after each check.
+
+        Returns:
+            The finished batch object.
+        """
+        while True:
+            try:
+                batch = self.client.messages.batches.retrieve(batch_id)
+            except Exception as e:
+                raise ValueError(f"Failed to check batch status: {e}")
+
+            if on_poll:
+                on_poll(batch)
+
+            if batch.processing_status == "ended":
+                return batch
+
+            time.sleep(poll_interval)
+
+    def get_batch_reviews(self, batch_id: str) -> Dict[str, Dict[str, Any]]:
+        """Collect the reviews from a finished batch.
+
+        Args:
+            batch_id: The batch ID from submit_review_batch().
+
+        Returns:
+            Dictionary mapping each custom_id to a review dictionary (as returned
+            by review_submission) or to ``{"error": message}`` if that request failed.
+        """
+        reviews = {}
+        try:
+            for entry in self.client.messages.batches.results(batch_id):
+                result = entry.result
+                if result.type == "succeeded":
+                    reviews[entry.custom_id] = self._parse_review_response(
+                        result.message.content[0].text
+                    )
+                else:
+                    error = getattr(result, "error", None)
+                    reviews[entry.custom_id] = {"error": str(error) if error else result.type}
+        except Exception as e:
+            raise ValueError(f"Failed to fetch batch results: {e}")
+
+        return reviews
+
+    def _build_review_prompt(
+        self,
+        original_exercise: Dict[str, Any],
+        submitted_code: str,
+        language: str,
+        experience_level: str,
+        test_results: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Build the prompt for reviewing a submission.
+
+        Args:
+            original_exercise: The original exercise metadata.
+            submitted_code: The learner's submitted code.
+            language: Programming language.
+            experience_level: User's experience level.
+            test_results: Optional results of running the exercise tests.
+
+        Returns:
+            The prompt string.
+        """
+        test_section = ""
+        if test_results is not None:
+            test_section = f"""
+Automated Test Results (the exercise tests were run against this code):
+{ExerciseRunner.summarize(test_results)}
+
+Use these results when judging correctness, and help the learner understand any failures without simply giving away the fix.
+"""
+
+        return f"""You are reviewing a coding exercise submission from a {experience_level} programmer.
 
 Exercise Topic: {original_exercise.get('topic', 'Unknown')}
 Exercise Type: {original_exercise.get('exercise_type', 'Unknown')}
@@ -315,7 +679,7 @@ Submitted Code:
 ```{language.lower()}
 {submitted_code}
 ```
-
+{test_section}
 Please provide a constructive review:
 
 ## Correctness
@@ -336,26 +700,22 @@ Please provide a constructive review:
 
 Be encouraging but honest. Focus on learning and improvement."""
 
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=2048,
-                messages=[{"role": "user", "content": prompt}],
-            )
-
-            content = response.content[0].text
-
-            # Parse assessment
-            assessment = "ACCEPTABLE"
-            for level in ["EXCELLENT", "GOOD", "ACCEPTABLE", "NEEDS_WORK"]:
-                if level in content:
-                    assessment = level
-                    break
+    def _parse_review_response(self, content: str) -> Dict[str, Any]:
+        """Parse a submission review response.
 
-            return {
-                "feedback": content,
-                "assessment": assessment,
-            }
+        Args:
+            content: Raw response from Claude.
 
-        except Exception as e:
-            raise ValueError(f"Failed to review submission: {e}")
+        Returns:
+            Dictionary with feedback and assessment.
+        """
+        assessment = "ACCEPTABLE"
+        for level in ["EXCELLENT", "GOOD", "ACCEPTABLE", "NEEDS_WORK"]:
+            if level in content:
+                assessment = level
+                break
+
+        return {
+            "feedback": content,
+            "assessment": assessment,
+        }
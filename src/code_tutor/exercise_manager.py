@@ -1,23 +1,42 @@
 """Exercise management for Code Tutor - working directory for practice exercises."""
 
+import copy
+import hashlib
 import json
 import os
 import shutil
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from .config import ConfigManager
+from .fileutil import atomic_write_text, locked
 
 
 class ExerciseManager:
-    """Manages the exercise working directory and exercise lifecycle."""
+    """Manages the exercise working directory and exercise lifecycle.
+
+    Metadata files are replaced atomically, and every read-modify-write of
+    an exercise's metadata or of the index holds an advisory lock, so several
+    processes (e.g. 'hint' and 'submit' in two terminals, or instructor
+    scripts) can share the exercise store safely.
+    """
 
     DEFAULT_EXERCISES_DIR = Path.home() / "code-tutor-exercises"
     METADATA_FILE = ".meta.json"
+    METADATA_LOCK_FILE = ".meta.lock"
     README_FILE = "README.md"
+    REVIEW_FILE = "REVIEW.md"
     STARTER_FILE = "starter"
 
+    # Index of all exercises' metadata, kept in a subdirectory so writing it
+    # does not change the exercises directory's modification time
+    INDEX_DIR = ".code-tutor"
+    INDEX_FILE = "index.json"
+    INDEX_LOCK_FILE = "index.lock"
+    INDEX_VERSION = 2
+
     # Exercise statuses
     STATUS_PENDING = "pending"
     STATUS_IN_PROGRESS = "in_progress"
@@ -80,6 +99,9 @@ class ExerciseManager:
         else:
             self.exercises_dir = self.DEFAULT_EXERCISES_DIR
 
+        # Parsed metadata files keyed by path, valid while the file is unchanged
+        self._metadata_cache: Dict[Path, Tuple[Tuple[int, int, int], Dict[str, Any]]] = {}
+
     def ensure_directory_exists(self) -> Path:
         """Ensure the exercises directory exists.
 
@@ -160,12 +182,43 @@ class ExerciseManager:
         """
         self.ensure_directory_exists()
 
-        # Generate unique ID
-        exercise_id = self.generate_exercise_id(topic)
-        exercise_path = self.get_exercise_path(exercise_id)
+        with self._index_locked():
+            index = self._load_index()
+            exercise = self._create_exercise_files(
+                topic, language, exercise_type, difficulty, instructions,
+                starter_code, solution_hints, learning_objectives, test_code,
+            )
+            self._update_index(index, exercise["id"], exercise["metadata"])
 
-        # Create exercise directory
-        exercise_path.mkdir(parents=True, exist_ok=True)
+        return exercise
+
+    def _create_exercise_files(
+        self,
+        topic: str,
+        language: str,
+        exercise_type: str,
+        difficulty: str,
+        instructions: str,
+        starter_code: str,
+        solution_hints: List[str],
+        learning_objectives: List[str],
+        test_code: Optional[str],
+    ) -> Dict[str, Any]:
+        """Write a new exercise's directory; see create_exercise()."""
+        # Generate unique ID, suffixed if another exercise on the topic was
+        # created in the same second (e.g. when generating a set)
+        base_id = self.generate_exercise_id(topic)
+        exercise_id = base_id
+        suffix = 1
+        while True:
+            exercise_path = self.get_exercise_path(exercise_id)
+            try:
+                # Create exercise directory
+                exercise_path.mkdir(parents=True)
+                break
+            except FileExistsError:
+                suffix += 1
+                exercise_id = f"{base_id}-{suffix}"
 
         # Create metadata
         metadata = {
@@ -181,11 +234,13 @@ class ExerciseManager:
             "solution_hints": solution_hints,
             "hints_revealed": 0,
         }
+        if test_code:
+            # Lets the test runner tell whether the tests were edited
+            test_data = test_code.encode("utf-8")
+            metadata["test_sha256"] = hashlib.sha256(test_data).hexdigest()
 
         # Write metadata
-        metadata_path = exercise_path / self.METADATA_FILE
-        with open(metadata_path, "w") as f:
-            json.dump(metadata, f, indent=2)
+        self._write_metadata(exercise_path, metadata)
 
         # Create README
         readme_content = self._generate_readme(
@@ -204,8 +259,8 @@ class ExerciseManager:
         # Create test file if provided
         if test_code:
             test_path = exercise_path / f"test_exercise{extension}"
-            with open(test_path, "w") as f:
-                f.write(test_code)
+            with open(test_path, "wb") as f:
+                f.write(test_data)
 
         return {
             "id": exercise_id,
@@ -285,6 +340,9 @@ class ExerciseManager:
     ) -> List[Dict[str, Any]]:
         """List all exercises in the working directory.
 
+        Metadata comes from the exercise index, which is rebuilt from the
+        exercise directories when missing or out of date.
+
         Args:
             status_filter: Optional status to filter by.
 
@@ -294,35 +352,272 @@ class ExerciseManager:
         if not self.exercises_dir.exists():
             return []
 
-        exercises = []
+        index = self._load_index()
+        if index is None:
+            with self._index_locked():
+                index = self._load_index()
+                if index is None:
+                    index = self._rebuild_index()
+
+        exercises = [
+            {
+                "id": exercise_id,
+                "path": str(self.exercises_dir / exercise_id),
+                "metadata": entry["metadata"],
+            }
+            for exercise_id, entry in index.items()
+            if not status_filter or entry["metadata"].get("status") == status_filter
+        ]
+
+        # Sort by creation date, newest first
+        exercises.sort(
+            key=lambda x: x["metadata"].get("created_at", ""),
+            reverse=True
+        )
+
+        return exercises
+
+    def _index_path(self) -> Path:
+        return self.exercises_dir / self.INDEX_DIR / self.INDEX_FILE
+
+    @contextmanager
+    def _index_locked(self) -> Iterator[None]:
+        """Hold the index lock, serializing index updates across processes."""
+        lock_path = self.exercises_dir / self.INDEX_DIR / self.INDEX_LOCK_FILE
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, "a") as f, locked(f):
+            yield
+
+    @contextmanager
+    def _metadata_locked(self, exercise_path: Path) -> Iterator[None]:
+        """Hold an exercise's metadata lock for a read-modify-write.
+
+        The lock is a separate file because the metadata file itself is
+        replaced on every write.
+
+        Args:
+            exercise_path: Exercise directory.
+        """
+        with open(exercise_path / self.METADATA_LOCK_FILE, "a") as f, locked(f):
+            yield
+
+    def _read_metadata(self, exercise_path: Path) -> Dict[str, Any]:
+        """Read an exercise's metadata, using the cache while the file is unchanged.
+
+        Args:
+            exercise_path: Exercise directory.
+
+        Returns:
+            A copy of the metadata, safe for the caller to modify.
+
+        Raises:
+            IOError: If the metadata file can't be read.
+            json.JSONDecodeError: If the metadata file is corrupt.
+        """
+        metadata_path = exercise_path / self.METADATA_FILE
+        signature = self._metadata_signature(exercise_path)
+
+        cached = self._metadata_cache.get(metadata_path)
+        if cached is None or cached[0] != signature:
+            with open(metadata_path, "r") as f:
+                cached = (signature, json.load(f))
+            self._metadata_cache[metadata_path] = cached
+
+        return copy.deepcopy(cached[1])
+
+    def _metadata_signature(self, exercise_path: Path) -> Tuple[int, int, int]:
+        """Get the signature of an exercise's metadata file, which changes on every write.
+
+        Args:
+            exercise_path: Exercise directory.
+
+        Returns:
+            Tuple of (mtime in ns, size, inode).
+
+        Raises:
+            OSError: If the metadata file doesn't exist.
+        """
+        stat = (exercise_path / self.METADATA_FILE).stat()
+        # Replacing the file changes its inode even when mtime and size match
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def _index_entry(self, exercise_id: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the index entry of an exercise whose metadata was just read or written.
+
+        Args:
+            exercise_id: Exercise ID.
+            metadata: The exercise's metadata.
+
+        Returns:
+            Dictionary with the metadata and its file's signature (None if the
+            file can't be found, so the entry is treated as out of date).
+        """
+        try:
+            signature = list(self._metadata_signature(self.exercises_dir / exercise_id))
+        except OSError:
+            signature = None
+        return {"metadata": metadata, "signature": signature}
+
+    def _write_metadata(self, exercise_path: Path, metadata: Dict[str, Any]) -> None:
+        """Atomically replace an exercise's metadata file.
+
+        Args:
+            exercise_path: Exercise directory.
+            metadata: Metadata to write.
+
+        Raises:
+            IOError: If the file can't be written.
+        """
+        metadata_path = exercise_path / self.METADATA_FILE
+        atomic_write_text(metadata_path, json.dumps(metadata, indent=2))
+        self._metadata_cache.pop(metadata_path, None)
+
+    def _load_index(self, exclude: Optional[str] = None) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Load the exercise index if it is still valid.
+
+        The index records the exercises directory's modification time when
+        it was written. Adding, removing or renaming an exercise directory
+        changes that time, so a mismatch means the index is out of date.
+        Each entry also records the signature of the exercise's metadata
+        file, so a metadata file changed outside the manager (e.g. edited by
+        hand, or restored from a backup) invalidates the index too.
+
+        Args:
+            exclude: ID of an exercise whose metadata file was just rewritten
+                by the caller, which is about to replace its entry; its
+                signature isn't checked.
+
+        Returns:
+            Mapping of exercise ID to an entry with its metadata (see
+            _index_entry()), or None if the index is missing, unreadable or
+            out of date.
+        """
+        try:
+            with open(self._index_path(), "r") as f:
+                index = json.load(f)
+            dir_mtime = self.exercises_dir.stat().st_mtime_ns
+        except (json.JSONDecodeError, IOError, OSError):
+            return None
+
+        if (
+            not isinstance(index, dict)
+            or index.get("version") != self.INDEX_VERSION
+            or index.get("dir_mtime_ns") != dir_mtime
+        ):
+            return None
+
+        exercises = index.get("exercises", {})
+        for exercise_id, entry in exercises.items():
+            if exercise_id == exclude:
+                continue
+            try:
+                signature = list(self._metadata_signature(self.exercises_dir / exercise_id))
+            except OSError:
+                return None
+            if entry.get("signature") != signature:
+                return None
+
+        return exercises
+
+    def _scan_exercises(self) -> Dict[str, Dict[str, Any]]:
+        """Read the metadata of every exercise directory.
+
+        Returns:
+            Mapping of exercise ID to index entry.
+        """
+        exercises = {}
 
         for item in self.exercises_dir.iterdir():
             if item.is_dir():
                 metadata_path = item / self.METADATA_FILE
                 if metadata_path.exists():
                     try:
-                        with open(metadata_path, "r") as f:
-                            metadata = json.load(f)
-
-                        if status_filter and metadata.get("status") != status_filter:
-                            continue
-
-                        exercises.append({
-                            "id": item.name,
-                            "path": str(item),
-                            "metadata": metadata,
-                        })
+                        exercises[item.name] = self._index_entry(
+                            item.name, self._read_metadata(item)
+                        )
                     except (json.JSONDecodeError, IOError):
                         continue
 
-        # Sort by creation date, newest first
-        exercises.sort(
-            key=lambda x: x["metadata"].get("created_at", ""),
-            reverse=True
-        )
+        return exercises
+
+    def _rebuild_index(self) -> Dict[str, Dict[str, Any]]:
+        """Rebuild the exercise index from the exercise directories.
+
+        Must be called with the index lock held.
 
+        Returns:
+            Mapping of exercise ID to index entry.
+        """
+        exercises = self._scan_exercises()
+        self._write_index(exercises)
         return exercises
 
+    def _write_index(self, exercises: Dict[str, Dict[str, Any]]) -> None:
+        """Write the exercise index, stamped with the directory's current mtime.
+
+        Args:
+            exercises: Mapping of exercise ID to index entry.
+        """
+        index_path = self._index_path()
+        try:
+            # Create the index directory first so its creation is covered by the stamp
+            index_path.parent.mkdir(exist_ok=True)
+            index = {
+                "version": self.INDEX_VERSION,
+                "dir_mtime_ns": self.exercises_dir.stat().st_mtime_ns,
+                "exercises": exercises,
+            }
+            atomic_write_text(index_path, json.dumps(index))
+        except (IOError, OSError):
+            # The index is only an optimization; listing falls back to a scan
+            pass
+
+    def _update_index(
+        self,
+        index: Optional[Dict[str, Dict[str, Any]]],
+        exercise_id: str,
+        metadata: Optional[Dict[str, Any]],
+    ) -> None:
+        """Record a change to one exercise in the index.
+
+        Must be called with the index lock held.
+
+        Args:
+            index: Index loaded before the change was made, or None if it was
+                not valid then (in which case it is rebuilt).
+            exercise_id: ID of the changed exercise.
+            metadata: New metadata, or None if the exercise was removed.
+        """
+        if index is None:
+            self._rebuild_index()
+            return
+
+        if metadata is None:
+            index.pop(exercise_id, None)
+        else:
+            index[exercise_id] = self._index_entry(exercise_id, metadata)
+        self._write_index(index)
+
+    def _indexed_id(self, exercise: Dict[str, Any]) -> Optional[str]:
+        """Get the index key of an exercise, or None if it is not indexed.
+
+        Only exercises directly inside the exercises directory are indexed;
+        exercises opened by path elsewhere (e.g. archived ones) are not.
+
+        Args:
+            exercise: Exercise info dictionary from get_exercise().
+
+        Returns:
+            Exercise ID or None.
+        """
+        path = Path(exercise["path"])
+        try:
+            if path.parent.resolve() != self.exercises_dir.resolve():
+                return None
+        except OSError:
+            return None
+        return path.name
+
     def get_exercise(self, exercise_id_or_path: str) -> Optional[Dict[str, Any]]:
         """Get a specific exercise by ID or path.
 
@@ -346,8 +641,7 @@ class ExerciseManager:
             return None
 
         try:
-            with open(metadata_path, "r") as f:
-                metadata = json.load(f)
+            metadata = self._read_metadata(path)
 
             # Find starter file
             starter_file = None
@@ -379,18 +673,63 @@ class ExerciseManager:
         if not exercise:
             return False
 
-        metadata_path = Path(exercise["path"]) / self.METADATA_FILE
+        exercise_path = Path(exercise["path"])
 
         try:
-            exercise["metadata"]["status"] = new_status
-            exercise["metadata"]["updated_at"] = datetime.now().isoformat()
+            with self._metadata_locked(exercise_path):
+                # Re-read under the lock so concurrent updates aren't lost
+                metadata = self._read_metadata(exercise_path)
+                metadata["status"] = new_status
+                metadata["updated_at"] = datetime.now().isoformat()
+                self._write_metadata(exercise_path, metadata)
+                self._index_metadata(exercise, metadata)
+        except (json.JSONDecodeError, IOError):
+            return False
+
+        return True
+
+    def _index_metadata(self, exercise: Dict[str, Any], metadata: Dict[str, Any]) -> None:
+        """Update the index entry of an exercise whose metadata changed.
+
+        Args:
+            exercise: Exercise info dictionary from get_exercise().
+            metadata: The exercise's new metadata.
+        """
+        exercise_id = self._indexed_id(exercise)
+        if exercise_id:
+            with self._index_locked():
+                self._update_index(self._load_index(exclude=exercise_id), exercise_id, metadata)
 
-            with open(metadata_path, "w") as f:
-                json.dump(exercise["metadata"], f, indent=2)
+    def save_review(
+        self, exercise_id_or_path: str, feedback: str, assessment: str
+    ) -> Optional[Path]:
+        """Write review feedback into the exercise directory and mark it reviewed.
+
+        Args:
+            exercise_id_or_path: Exercise ID or path.
+            feedback: Review feedback (markdown).
+            assessment: Overall assessment (e.g. GOOD, NEEDS_WORK).
+
+        Returns:
+            Path to the written review file, or None if the exercise was not found.
+        """
+        exercise = self.get_exercise(exercise_id_or_path)
+        if not exercise:
+            return None
 
-            return True
+        review_path = Path(exercise["path"]) / self.REVIEW_FILE
+        try:
+            atomic_write_text(
+                review_path,
+                f"# Review: {exercise['metadata'].get('topic', 'Exercise')}\n\n"
+                f"**Overall assessment:** {assessment}\n\n"
+                f"{feedback}\n",
+            )
         except IOError:
-            return False
+            return None
+
+        self.update_status(exercise_id_or_path, self.STATUS_REVIEWED)
+        return review_path
 
     def get_next_hint(self, exercise_id_or_path: str) -> Optional[str]:
         """Get the next hint for an exercise.
@@ -405,23 +744,30 @@ class ExerciseManager:
         if not exercise:
             return None
 
-        metadata = exercise["metadata"]
-        hints = metadata.get("solution_hints", [])
-        revealed = metadata.get("hints_revealed", 0)
-
-        if revealed >= len(hints):
-            return None
-
-        # Update hints revealed count
-        metadata["hints_revealed"] = revealed + 1
-        metadata["updated_at"] = datetime.now().isoformat()
+        exercise_path = Path(exercise["path"])
 
-        metadata_path = Path(exercise["path"]) / self.METADATA_FILE
         try:
-            with open(metadata_path, "w") as f:
-                json.dump(metadata, f, indent=2)
-        except IOError:
-            pass
+            with self._metadata_locked(exercise_path):
+                # Re-read under the lock so two requests reveal two different hints
+                metadata = self._read_metadata(exercise_path)
+                hints = metadata.get("solution_hints", [])
+                revealed = metadata.get("hints_revealed", 0)
+
+                if revealed >= len(hints):
+                    return None
+
+                # Update hints revealed count
+                metadata["hints_revealed"] = revealed + 1
+                metadata["updated_at"] = datetime.now().isoformat()
+
+                try:
+                    self._write_metadata(exercise_path, metadata)
+                except IOError:
+                    pass
+                else:
+                    self._index_metadata(exercise, metadata)
+        except (json.JSONDecodeError, IOError):
+            return None
 
         return hints[revealed]
 
@@ -457,17 +803,24 @@ class ExerciseManager:
         if not exercise:
             return False
 
+        exercise_id = self._indexed_id(exercise)
+
         archive_dir = self.exercises_dir / "archived"
         archive_dir.mkdir(exist_ok=True)
 
         source = Path(exercise["path"])
         dest = archive_dir / source.name
 
-        try:
-            shutil.move(str(source), str(dest))
-            return True
-        except (shutil.Error, IOError):
-            return False
+        with self._index_locked():
+            index = self._load_index()
+            try:
+                shutil.move(str(source), str(dest))
+            except (shutil.Error, IOError):
+                return False
+
+            if exercise_id:
+                self._update_index(index, exercise_id, None)
+        return True
 
     def delete_exercise(self, exercise_id_or_path: str) -> bool:
         """Permanently delete an exercise.
@@ -482,8 +835,15 @@ class ExerciseManager:
         if not exercise:
             return False
 
-        try:
-            shutil.rmtree(exercise["path"])
-            return True
-        except (shutil.Error, IOError):
-            return False
+        exercise_id = self._indexed_id(exercise)
+
+        with self._index_locked():
+            index = self._load_index()
+            try:
+                shutil.rmtree(exercise["path"])
+            except (shutil.Error, IOError):
+                return False
+
+            if exercise_id:
+                self._update_index(index, exercise_id, None)
+        return True
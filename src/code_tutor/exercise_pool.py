@@ -0,0 +1,414 @@
+"""Pool of pre-generated exercises served instantly by 'exercise generate'."""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from uuid import uuid4
+
+from .config import ConfigManager
+from .fileutil import atomic_write_text
+
+
+class ExercisePool:
+    """On-disk pool of generated exercise content, grouped into slots.
+
+    A slot is one (topic, language, exercise type, difficulty, experience
+    level) combination, stored as a directory under the config directory
+    holding a ``slot.json`` description and one JSON file per pooled
+    exercise. Slots come from the configured curriculum and from pool misses,
+    so topics students actually ask for are stocked by the next refill. The
+    modification time of ``slot.json`` records when the slot was last asked
+    for; refills drop requested slots that nobody has asked for recently, and
+    the least recently requested ones beyond a maximum count, so one-off
+    requests and typos aren't stocked forever.
+
+    Taking an exercise claims its file with an atomic rename, so several
+    processes can serve from the same pool without handing out an exercise
+    twice. Exercises generated by a model other than the configured one are
+    never served, and refills delete them.
+    """
+
+    POOL_DIR = "exercise_pool"
+    SLOT_FILE = "slot.json"
+    DEFAULT_TARGET_SIZE = 3
+    DEFAULT_REFILL_WORKERS = 2
+    DEFAULT_REQUEST_TTL_DAYS = 30
+    DEFAULT_MAX_REQUESTED_SLOTS = 50
+
+    SLOT_FIELDS = ("topic", "language", "exercise_type", "difficulty", "experience_level")
+
+    # Defaults for curriculum entries, matching 'exercise generate'
+    DEFAULT_LANGUAGE = "Python"
+    DEFAULT_EXERCISE_TYPE = "implementation"
+
+    def __init__(
+        self,
+        config_dir: Optional[Path] = None,
+        target_size: int = DEFAULT_TARGET_SIZE,
+        curriculum: Optional[List[Dict[str, str]]] = None,
+        experience_level: str = "intermediate",
+        request_ttl_days: float = DEFAULT_REQUEST_TTL_DAYS,
+        max_requested_slots: int = DEFAULT_MAX_REQUESTED_SLOTS,
+        model: Optional[str] = None,
+    ):
+        """Initialize the exercise pool.
+
+        Args:
+            config_dir: Optional custom configuration directory path.
+            target_size: Number of exercises a refill keeps in each slot.
+            curriculum: Slots to keep stocked even before anyone asks for them,
+                as dictionaries with a topic and optionally language,
+                exercise_type, difficulty and experience_level. Entries
+                without a topic are skipped and listed in invalid_curriculum.
+            experience_level: Experience level (and default difficulty) of
+                curriculum slots that don't give one.
+            request_ttl_days: Days a slot registered by a miss is kept without
+                being asked for again.
+            max_requested_slots: Maximum number of slots registered by misses;
+                the least recently requested ones beyond it are dropped.
+            model: Model whose exercises are served, or None to serve
+                exercises from any model.
+        """
+        if config_dir is None:
+            config_dir = Path.home() / ".config" / "code-tutor"
+
+        self.pool_dir = config_dir / self.POOL_DIR
+        self.target_size = target_size
+        self.curriculum: List[Dict[str, str]] = []
+        self.invalid_curriculum: List[Any] = []
+        for entry in curriculum or []:
+            if not isinstance(entry, dict) or not str(entry.get("topic", "")).strip():
+                self.invalid_curriculum.append(entry)
+                continue
+            self.curriculum.append({
+                "topic": str(entry["topic"]),
+                "language": str(entry.get("language", self.DEFAULT_LANGUAGE)),
+                "exercise_type": str(entry.get("exercise_type", self.DEFAULT_EXERCISE_TYPE)),
+                "difficulty": str(entry.get("difficulty", experience_level)),
+                "experience_level": str(entry.get("experience_level", experience_level)),
+            })
+        self.request_ttl_days = request_ttl_days
+        self.max_requested_slots = max_requested_slots
+        self.model = model
+
+    @classmethod
+    def from_config(cls, config_manager: ConfigManager) -> "ExercisePool":
+        """Create a pool using the 'exercise_pool' settings of a configuration.
+
+        Args:
+            config_manager: Loaded configuration manager.
+
+        Returns:
+            Configured ExercisePool.
+        """
+        return cls(
+            config_dir=config_manager.config_dir,
+            target_size=int(
+                config_manager.get("exercise_pool.target_size", cls.DEFAULT_TARGET_SIZE)
+            ),
+            curriculum=config_manager.get("exercise_pool.curriculum", []),
+            experience_level=config_manager.get("experience_level", "intermediate"),
+            request_ttl_days=float(
+                config_manager.get(
+                    "exercise_pool.request_ttl_days", cls.DEFAULT_REQUEST_TTL_DAYS
+                )
+            ),
+            max_requested_slots=int(
+                config_manager.get(
+                    "exercise_pool.max_requested_slots", cls.DEFAULT_MAX_REQUESTED_SLOTS
+                )
+            ),
+            model=config_manager.get_model(),
+        )
+
+    @staticmethod
+    def make_key(
+        topic: str, language: str, exercise_type: str, difficulty: str, experience_level: str
+    ) -> str:
+        """Build the slot key for an exercise request.
+
+        Args:
+            topic: Exercise topic (compared case-insensitively).
+            language: Programming language (compared case-insensitively).
+            exercise_type: Type of exercise.
+            difficulty: Difficulty level.
+            experience_level: Learner's experience level, which shapes the
+                generated explanations.
+
+        Returns:
+            Hex digest identifying the slot.
+        """
+        payload = json.dumps([
+            " ".join(topic.lower().split()),
+            language.lower().strip(),
+            exercise_type,
+            difficulty,
+            experience_level,
+        ])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def _slot_dir(self, slot: Dict[str, str]) -> Path:
+        return self.pool_dir / self.make_key(*(slot[field] for field in self.SLOT_FIELDS))
+
+    def register(self, slot: Dict[str, str]) -> Path:
+        """Make sure a slot exists so that refills stock it.
+
+        Args:
+            slot: Dictionary with topic, language, exercise_type, difficulty
+                and experience_level.
+
+        Returns:
+            The slot directory.
+        """
+        slot_dir = self._slot_dir(slot)
+        slot_file = slot_dir / self.SLOT_FILE
+        if not slot_file.exists():
+            slot_dir.mkdir(parents=True, exist_ok=True)
+            atomic_write_text(
+                slot_file, json.dumps({field: slot[field] for field in self.SLOT_FIELDS})
+            )
+        return slot_dir
+
+    def _entries(self, slot_dir: Path) -> List[Path]:
+        return sorted(
+            path for path in slot_dir.glob("*.json") if path.name != self.SLOT_FILE
+        )
+
+    def take(self, slot: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Take a pooled exercise for a slot, registering the slot on a miss.
+
+        Either way, the slot is marked as just requested. Entries generated
+        by another model are discarded as they are found.
+
+        Args:
+            slot: Dictionary with topic, language, exercise_type, difficulty
+                and experience_level.
+
+        Returns:
+            Exercise content as returned by ExerciseGenerator.generate_exercise(),
+            or None if the slot is empty.
+        """
+        slot_dir = self._slot_dir(slot)
+
+        try:
+            # register() creates slot.json with the current time; an existing
+            # one just needs its time bumped
+            os.utime(slot_dir / self.SLOT_FILE)
+        except OSError:
+            try:
+                self.register(slot)
+            except OSError:
+                pass
+
+        for path in self._entries(slot_dir) if slot_dir.exists() else []:
+            claimed = path.with_name(f".{path.name}.{os.getpid()}.claimed")
+            try:
+                # Only one process can win the rename for a given entry
+                os.rename(path, claimed)
+            except OSError:
+                continue
+
+            try:
+                with open(claimed, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (IOError, json.JSONDecodeError):
+                entry = None
+            finally:
+                try:
+                    claimed.unlink()
+                except OSError:
+                    pass
+
+            if entry is not None and (self.model is None or entry.get("model") == self.model):
+                return entry.get("content")
+
+        return None
+
+    def _is_current(self, path: Path) -> bool:
+        """Check whether a pooled entry was generated by the configured model.
+
+        Args:
+            path: Pooled entry file.
+
+        Returns:
+            True if the pool serves any model or the entry's model matches.
+        """
+        if self.model is None:
+            return True
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f).get("model") == self.model
+        except (IOError, json.JSONDecodeError, AttributeError):
+            return False
+
+    def add(self, slot: Dict[str, str], content: Dict[str, Any], model: str) -> Path:
+        """Add generated exercise content to a slot.
+
+        Args:
+            slot: Dictionary with topic, language, exercise_type, difficulty
+                and experience_level.
+            content: Exercise content from ExerciseGenerator.generate_exercise().
+            model: Model that generated the content.
+
+        Returns:
+            Path of the pooled entry.
+        """
+        slot_dir = self.register(slot)
+        entry = {
+            "created_at": time.time(),
+            "model": model,
+            "content": content,
+        }
+        path = slot_dir / f"{int(time.time())}-{uuid4().hex[:8]}.json"
+        atomic_write_text(path, json.dumps(entry))
+        return path
+
+    def slots(self) -> List[Dict[str, Any]]:
+        """List all slots with the number of exercises they hold.
+
+        Returns:
+            Slot dictionaries (topic, language, exercise_type, difficulty,
+            experience_level) with an added 'available' count and
+            'last_requested' timestamp, sorted by topic.
+        """
+        slots = []
+        if not self.pool_dir.exists():
+            return slots
+
+        for slot_dir in self.pool_dir.iterdir():
+            slot_file = slot_dir / self.SLOT_FILE
+            try:
+                with open(slot_file, "r", encoding="utf-8") as f:
+                    slot = json.load(f)
+                last_requested = slot_file.stat().st_mtime
+            except (IOError, OSError, json.JSONDecodeError):
+                continue
+            if any(field not in slot for field in self.SLOT_FIELDS):
+                # Written before experience levels were part of the key;
+                # prune() removes it
+                continue
+            slot["available"] = sum(
+                1 for path in self._entries(slot_dir) if self._is_current(path)
+            )
+            slot["last_requested"] = last_requested
+            slots.append(slot)
+
+        slots.sort(key=lambda slot: [str(slot.get(field, "")) for field in self.SLOT_FIELDS])
+        return slots
+
+    def prune(self) -> int:
+        """Drop requested slots that nobody has asked for recently.
+
+        Slots registered by misses are removed, with any exercises they hold,
+        once they haven't been requested for request_ttl_days, and the least
+        recently requested ones are removed beyond max_requested_slots.
+        Curriculum slots are always kept. Slots from before experience levels
+        were part of the key are removed too, as are exercises generated by
+        a model other than the configured one.
+
+        Returns:
+            Number of slots removed.
+        """
+        if not self.pool_dir.exists():
+            return 0
+
+        for slot_dir in self.pool_dir.iterdir():
+            for path in self._entries(slot_dir) if slot_dir.is_dir() else []:
+                if not self._is_current(path):
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+
+        curriculum_dirs = {self._slot_dir(slot) for slot in self.curriculum}
+        requested = []
+        stale = []
+        for slot in self.slots():
+            slot_dir = self._slot_dir(slot)
+            if slot_dir not in curriculum_dirs:
+                requested.append((slot["last_requested"], slot_dir))
+        listed = {slot_dir for _, slot_dir in requested} | curriculum_dirs
+        stale.extend(
+            slot_dir for slot_dir in self.pool_dir.iterdir()
+            if slot_dir.is_dir() and slot_dir not in listed
+            and (slot_dir / self.SLOT_FILE).exists()
+        )
+
+        requested.sort(reverse=True)
+        cutoff = time.time() - self.request_ttl_days * 86400
+        stale.extend(
+            slot_dir
+            for position, (last_requested, slot_dir) in enumerate(requested)
+            if position >= self.max_requested_slots or last_requested < cutoff
+        )
+
+        removed = 0
+        for slot_dir in stale:
+            try:
+                shutil.rmtree(slot_dir)
+            except OSError:
+                continue
+            removed += 1
+
+        return removed
+
+    def refill(
+        self,
+        generator: Any,
+        target_size: Optional[int] = None,
+        max_workers: int = DEFAULT_REFILL_WORKERS,
+        on_result: Optional[Callable[[Dict[str, str], Optional[Exception]], None]] = None,
+    ) -> int:
+        """Generate exercises until every slot holds the target number.
+
+        Stale requested slots are pruned first (see prune()).
+
+        Args:
+            generator: ExerciseGenerator used for the live calls.
+            target_size: Exercises to keep per slot; defaults to the pool's target.
+            max_workers: Number of exercises generated concurrently.
+            on_result: Optional callback receiving the slot and None on success
+                or the exception on failure, after each generation.
+
+        Returns:
+            Number of exercises added.
+        """
+        target_size = self.target_size if target_size is None else target_size
+
+        for slot in self.curriculum:
+            self.register(slot)
+        self.prune()
+
+        jobs = []
+        for slot in self.slots():
+            jobs.extend([slot] * max(0, target_size - slot["available"]))
+
+        if not jobs:
+            return 0
+
+        def generate(slot: Dict[str, Any]) -> None:
+            content = generator.generate_exercise(
+                topic=slot["topic"],
+                language=slot["language"],
+                exercise_type=slot["exercise_type"],
+                difficulty=slot["difficulty"],
+                experience_level=slot["experience_level"],
+            )
+            self.add(slot, content, generator.model)
+
+        added = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(generate, slot): slot for slot in jobs}
+            for future in as_completed(futures):
+                error = future.exception()
+                if error is None:
+                    added += 1
+                if on_result:
+                    on_result(futures[future], error)
+
+        return added
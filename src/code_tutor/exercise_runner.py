@@ -0,0 +1,463 @@
+"""Local, resource-limited execution of exercise tests."""
+
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config import ConfigManager
+from .exercise_manager import ExerciseManager
+
+try:
+    import resource
+except ImportError:  # Windows: only the wall-clock timeout applies
+    resource = None
+
+
+# Runs test_* functions and unittest.TestCase tests of a module when pytest is
+# not available, writing one JSON result per test. Arguments: module name,
+# results file.
+_PYTHON_HARNESS = """
+import importlib, inspect, json, sys, traceback, unittest
+
+def failure(exc_info):
+    lines = traceback.format_exception_only(*exc_info[:2])
+    return lines[-1].strip() if lines else ""
+
+sys.path.insert(0, ".")
+results = []
+try:
+    module = importlib.import_module(sys.argv[1])
+except BaseException:
+    results.append({"name": sys.argv[1], "outcome": "error", "message": failure(sys.exc_info())})
+    module = None
+
+for name, obj in sorted(vars(module).items()) if module else []:
+    if isinstance(obj, type) and issubclass(obj, unittest.TestCase):
+        for test in unittest.defaultTestLoader.loadTestsFromTestCase(obj):
+            result = unittest.TestResult()
+            test.run(result)
+            outcome, message = "passed", ""
+            if result.failures:
+                outcome, message = "failed", result.failures[0][1].strip().splitlines()[-1]
+            elif result.errors:
+                outcome, message = "error", result.errors[0][1].strip().splitlines()[-1]
+            elif result.skipped:
+                outcome, message = "skipped", result.skipped[0][1]
+            results.append({"name": test.id().split(".", 1)[-1], "outcome": outcome, "message": message})
+    elif (
+        name.startswith("test")
+        and inspect.isfunction(obj)
+        and obj.__module__ == module.__name__
+        and not inspect.signature(obj).parameters
+    ):
+        try:
+            obj()
+            outcome, message = "passed", ""
+        except AssertionError:
+            outcome, message = "failed", failure(sys.exc_info())
+        except BaseException:
+            outcome, message = "error", failure(sys.exc_info())
+        results.append({"name": name, "outcome": outcome, "message": message})
+
+with open(sys.argv[2], "w") as f:
+    json.dump(results, f)
+"""
+
+
+class ExerciseRunner:
+    """Runs an exercise's tests against the learner's code in a sandbox.
+
+    The exercise files are copied to a fresh directory under a private
+    per-user sandbox directory, and the tests run there in a separate process
+    with a wall-clock timeout, CPU time, memory and file size limits and no
+    stdin. The whole process group is killed on timeout. The tests run as
+    the current user, so these are resource limits only: the learner's code
+    can still read anything the user can.
+
+    pytest is started with an empty configuration file and its root and
+    conftest search confined to the sandbox, with plugin autoloading off,
+    so configuration or plugins outside the sandbox aren't picked up.
+
+    Only Python exercises are supported. Tests run under pytest when it is
+    installed and under a small built-in runner for test_* functions and
+    unittest test cases otherwise.
+    """
+
+    DEFAULT_TIMEOUT_SECONDS = 10
+    DEFAULT_CPU_SECONDS = 10
+    DEFAULT_MEMORY_MB = 512
+    MAX_FILE_SIZE_MB = 16
+    MAX_OUTPUT_CHARS = 4000
+
+    SUPPORTED_LANGUAGES = {"python"}
+
+    SANDBOX_DIR = "sandboxes"
+
+    # Exercise types where passing tests show the exercise is solved; for the
+    # others (e.g. refactoring) the review is about more than the tests
+    FAST_PATH_EXERCISE_TYPES = {
+        ExerciseManager.TYPE_FILL_IN,
+        ExerciseManager.TYPE_BUG_FIX,
+        ExerciseManager.TYPE_IMPLEMENTATION,
+    }
+
+    # Files of the exercise directory not copied into the sandbox
+    EXCLUDED_FILES = {
+        ExerciseManager.METADATA_FILE,
+        ExerciseManager.METADATA_LOCK_FILE,
+        ExerciseManager.REVIEW_FILE,
+    }
+
+    def __init__(
+        self,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+        cpu_seconds: int = DEFAULT_CPU_SECONDS,
+        memory_mb: int = DEFAULT_MEMORY_MB,
+        config_dir: Optional[Path] = None,
+    ):
+        """Initialize the exercise runner.
+
+        Args:
+            timeout_seconds: Wall-clock limit for the whole test run.
+            cpu_seconds: CPU time limit for the test process.
+            memory_mb: Address space limit for the test process.
+            config_dir: Optional custom configuration directory path; test
+                runs happen in its sandboxes subdirectory.
+        """
+        if config_dir is None:
+            config_dir = Path.home() / ".config" / "code-tutor"
+
+        self.timeout_seconds = timeout_seconds
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.sandbox_dir = config_dir / self.SANDBOX_DIR
+
+    @classmethod
+    def from_config(cls, config_manager: ConfigManager) -> "ExerciseRunner":
+        """Create a runner using the 'exercise_tests' settings of a configuration.
+
+        Args:
+            config_manager: Loaded configuration manager.
+
+        Returns:
+            Configured ExerciseRunner.
+        """
+        return cls(
+            timeout_seconds=float(
+                config_manager.get("exercise_tests.timeout_seconds", cls.DEFAULT_TIMEOUT_SECONDS)
+            ),
+            cpu_seconds=int(
+                config_manager.get("exercise_tests.cpu_seconds", cls.DEFAULT_CPU_SECONDS)
+            ),
+            memory_mb=int(
+                config_manager.get("exercise_tests.memory_mb", cls.DEFAULT_MEMORY_MB)
+            ),
+            config_dir=config_manager.config_dir,
+        )
+
+    def find_test_file(self, exercise: Dict[str, Any]) -> Optional[Path]:
+        """Find the test file of an exercise.
+
+        Args:
+            exercise: Exercise info dictionary from ExerciseManager.get_exercise().
+
+        Returns:
+            Path to the test file, or None if the exercise has no runnable tests.
+        """
+        language = exercise["metadata"].get("language", "Python")
+        if language.lower() not in self.SUPPORTED_LANGUAGES:
+            return None
+
+        extension = ExerciseManager.LANGUAGE_EXTENSIONS.get(language.lower(), ".txt")
+        test_file = Path(exercise["path"]) / f"test_exercise{extension}"
+        return test_file if test_file.is_file() else None
+
+    def run(self, exercise: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Run an exercise's tests.
+
+        Args:
+            exercise: Exercise info dictionary from ExerciseManager.get_exercise().
+
+        Returns:
+            Dictionary with 'status' ('passed', 'failed', 'error' or 'timeout'),
+            per-test 'tests' (name, outcome, message), 'passed' and 'failed'
+            counts, 'duration_seconds', the tail of the test 'output' and
+            'test_file_verified' (whether the test file is unchanged since the
+            exercise was created); or None if the exercise has no tests this
+            runner can execute.
+        """
+        test_file = self.find_test_file(exercise)
+        if test_file is None:
+            return None
+
+        test_code = test_file.read_bytes()
+        expected_hash = exercise["metadata"].get("test_sha256")
+        test_file_verified = (
+            expected_hash is not None
+            and hashlib.sha256(test_code).hexdigest() == expected_hash
+        )
+
+        sandbox = self._make_sandbox()
+        try:
+            # Results, output and pytest's configuration live next to the
+            # working directory rather than in it
+            workdir = sandbox / "work"
+            workdir.mkdir()
+            for item in Path(exercise["path"]).iterdir():
+                if item.is_file() and item.name not in self.EXCLUDED_FILES:
+                    shutil.copy2(item, workdir / item.name)
+            # Run exactly the test code that was checked above
+            (workdir / test_file.name).write_bytes(test_code)
+
+            results_path = sandbox / "results"
+            output_path = sandbox / "output"
+
+            if importlib.util.find_spec("pytest") is not None:
+                ini_path = sandbox / "pytest.ini"
+                ini_path.write_text("[pytest]\n")
+                command = [
+                    sys.executable, "-E", "-m", "pytest", test_file.name,
+                    "-q", "-p", "no:cacheprovider",
+                    "-c", str(ini_path),
+                    f"--rootdir={workdir}",
+                    f"--confcutdir={workdir}",
+                    f"--junitxml={results_path}",
+                ]
+            else:
+                command = [
+                    sys.executable, "-E", "-c", _PYTHON_HARNESS,
+                    test_file.stem, str(results_path),
+                ]
+
+            start = time.monotonic()
+            timed_out = self._run_sandboxed(command, workdir, output_path)
+            duration = time.monotonic() - start
+
+            tests = self._read_results(results_path)
+            output = self._read_output(output_path)
+        finally:
+            shutil.rmtree(sandbox, ignore_errors=True)
+
+        passed = sum(1 for test in tests if test["outcome"] == "passed")
+        failed = sum(1 for test in tests if test["outcome"] in ("failed", "error"))
+
+        if timed_out:
+            status = "timeout"
+        elif not tests:
+            status = "error"
+        elif failed:
+            status = "failed"
+        else:
+            status = "passed"
+
+        return {
+            "status": status,
+            "tests": tests,
+            "passed": passed,
+            "failed": failed,
+            "duration_seconds": round(duration, 2),
+            "output": output,
+            "test_file_verified": test_file_verified,
+        }
+
+    def _make_sandbox(self) -> Path:
+        """Create a fresh directory for one test run.
+
+        Runs happen under a per-user directory only its owner can access, not
+        the shared temporary directory, where other users could plant files
+        (e.g. a pytest.ini) in a parent directory.
+
+        Returns:
+            The new sandbox directory.
+        """
+        self.sandbox_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        os.chmod(self.sandbox_dir, 0o700)
+        return Path(tempfile.mkdtemp(prefix="tests-", dir=self.sandbox_dir))
+
+    def _run_sandboxed(self, command: List[str], sandbox: Path, output_path: Path) -> bool:
+        """Run a command in the sandbox directory under the resource limits.
+
+        Output goes to a file rather than a pipe so its size is bounded by
+        the file size limit.
+
+        Args:
+            command: Command to run.
+            sandbox: Working directory.
+            output_path: File receiving stdout and stderr.
+
+        Returns:
+            True if the command was killed for exceeding the timeout.
+        """
+        env = {
+            "PATH": os.environ.get("PATH", ""),
+            "HOME": str(sandbox),
+            "PYTHONDONTWRITEBYTECODE": "1",
+            "PYTEST_DISABLE_PLUGIN_AUTOLOAD": "1",
+        }
+
+        with open(output_path, "wb") as output:
+            process = subprocess.Popen(
+                command,
+                cwd=sandbox,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=output,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+                preexec_fn=self._limit_resources if resource is not None else None,
+            )
+            try:
+                process.wait(timeout=self.timeout_seconds)
+                return False
+            except subprocess.TimeoutExpired:
+                self._kill(process)
+                return True
+
+    def _limit_resources(self) -> None:
+        """Apply resource limits in the child process before it starts the tests."""
+        memory = self.memory_mb * 1024 * 1024
+        file_size = self.MAX_FILE_SIZE_MB * 1024 * 1024
+        for limit, value in (
+            (resource.RLIMIT_CPU, self.cpu_seconds),
+            (resource.RLIMIT_AS, memory),
+            (resource.RLIMIT_FSIZE, file_size),
+            (resource.RLIMIT_CORE, 0),
+        ):
+            try:
+                resource.setrlimit(limit, (value, value))
+            except (ValueError, OSError):
+                # Limits above the hard limit (or unsupported ones) are left as is
+                pass
+
+    @staticmethod
+    def _kill(process: subprocess.Popen) -> None:
+        """Kill a test process and anything it started."""
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (AttributeError, OSError):
+            process.kill()
+        process.wait()
+
+    def _read_results(self, results_path: Path) -> List[Dict[str, str]]:
+        """Read per-test results written by pytest (JUnit XML) or the built-in runner.
+
+        Args:
+            results_path: Results file.
+
+        Returns:
+            List of test results; empty if the run produced none.
+        """
+        try:
+            content = results_path.read_bytes()
+        except OSError:
+            return []
+
+        if content.lstrip().startswith(b"<"):
+            return self._parse_junit_xml(content)
+
+        try:
+            results = json.loads(content)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return []
+        return results if isinstance(results, list) else []
+
+    @staticmethod
+    def _parse_junit_xml(content: bytes) -> List[Dict[str, str]]:
+        try:
+            root = ET.fromstring(content)
+        except ET.ParseError:
+            return []
+
+        tests = []
+        for case in root.iter("testcase"):
+            # classname is "test_exercise" or "test_exercise.TestClass"
+            _, _, test_class = case.get("classname", "").partition(".")
+            name = f"{test_class}.{case.get('name', '')}" if test_class else case.get("name", "")
+            outcome, message = "passed", ""
+            for tag, label in (("failure", "failed"), ("error", "error"), ("skipped", "skipped")):
+                element = case.find(tag)
+                if element is not None:
+                    outcome, message = label, element.get("message", "")
+                    break
+            tests.append({
+                "name": name,
+                "outcome": outcome,
+                "message": message,
+            })
+        return tests
+
+    def _read_output(self, output_path: Path) -> str:
+        try:
+            with open(output_path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - self.MAX_OUTPUT_CHARS))
+                return f.read().decode("utf-8", errors="replace")
+        except OSError:
+            return ""
+
+    @classmethod
+    def is_fast_path(cls, exercise: Dict[str, Any], results: Optional[Dict[str, Any]]) -> bool:
+        """Check whether passing tests are enough to accept a submission without an LLM review.
+
+        Args:
+            exercise: Exercise info dictionary.
+            results: Test results from run(), or None.
+
+        Returns:
+            True if every test passed, the test file is the one generated with
+            the exercise, and the exercise type is judged by its tests.
+        """
+        return (
+            results is not None
+            and results.get("test_file_verified", False)
+            and results["status"] == "passed"
+            and results["passed"] > 0
+            and exercise["metadata"].get("exercise_type") in cls.FAST_PATH_EXERCISE_TYPES
+        )
+
+    @staticmethod
+    def summarize(results: Dict[str, Any]) -> str:
+        """Summarize test results as markdown.
+
+        Args:
+            results: Test results from run().
+
+        Returns:
+            Markdown summary listing every test and its outcome.
+        """
+        if results["status"] == "timeout":
+            headline = "The tests did not finish within the time limit."
+        elif not results["tests"]:
+            headline = "The tests could not be run."
+        else:
+            headline = (
+                f"{results['passed']} of {len(results['tests'])} test(s) passed "
+                f"in {results['duration_seconds']}s."
+            )
+
+        lines = [headline, ""]
+        for test in results["tests"]:
+            line = f"- {test['name']}: {test['outcome']}"
+            message = " ".join(test.get("message", "").split())
+            if message:
+                line += f" ({message[:200]})"
+            lines.append(line)
+
+        crashed = results["status"] in ("error", "timeout") or any(
+            test["outcome"] == "error" for test in results["tests"]
+        )
+        if crashed and results["output"].strip():
+            tail = "\n".join(results["output"].strip().splitlines()[-15:])
+            lines.extend(["", "Output:", "```", tail, "```"])
+
+        return "\n".join(lines).strip()
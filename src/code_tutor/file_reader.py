@@ -1,5 +1,6 @@
 """File reading and parsing utilities."""
 
+import ast
 import os
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -45,6 +46,12 @@ class FileReader:
         ".R": "R",
     }
 
+    # Default maximum size of a chunk when splitting large files for analysis
+    DEFAULT_CHUNK_LINES = 400
+
+    # Lines that close a block in brace- and end-delimited languages
+    BLOCK_END_LINES = {"}", "};", "end", "})", "});"}
+
     def __init__(self):
         """Initialize the file reader."""
         pass
@@ -123,6 +130,109 @@ class FileReader:
             "non_empty_lines": sum(1 for line in lines if line.strip()),
         }
 
+    def split_into_chunks(
+        self,
+        content: str,
+        language: str,
+        max_lines: int = DEFAULT_CHUNK_LINES,
+    ) -> List[Dict[str, any]]:
+        """Split a large file into chunks along function/class boundaries.
+
+        Python files are split at top-level statements and at methods of
+        top-level classes using the AST; other languages (and Python that does
+        not parse) use indentation heuristics. A chunk is only cut mid-block
+        when no boundary exists within ``max_lines``.
+
+        Args:
+            content: File content.
+            language: Language name from SUPPORTED_EXTENSIONS.
+            max_lines: Maximum number of lines per chunk.
+
+        Returns:
+            List of chunk dicts with 'index', 'start_line', 'end_line'
+            (1-based, inclusive) and 'content'.
+        """
+        lines = content.split("\n")
+
+        boundaries = None
+        if language == "Python":
+            boundaries = self._python_boundaries(content)
+        if boundaries is None:
+            boundaries = self._heuristic_boundaries(lines)
+
+        chunks = []
+        start = 0
+        while start < len(lines):
+            end = min(start + max_lines, len(lines))
+            if end < len(lines):
+                # Cut at the last boundary that keeps the chunk within max_lines
+                candidates = [b for b in boundaries if start < b <= end]
+                if candidates:
+                    end = max(candidates)
+
+            chunks.append({
+                "index": len(chunks),
+                "start_line": start + 1,
+                "end_line": end,
+                "content": "\n".join(lines[start:end]),
+            })
+            start = end
+
+        return chunks
+
+    def _python_boundaries(self, content: str) -> Optional[List[int]]:
+        """Find split points in Python source using the AST.
+
+        Args:
+            content: Python source code.
+
+        Returns:
+            Sorted 0-based line indices where a chunk may start, or None if the
+            source does not parse.
+        """
+        try:
+            tree = ast.parse(content)
+        except (SyntaxError, ValueError):
+            return None
+
+        def start_of(node: ast.AST) -> int:
+            decorators = getattr(node, "decorator_list", [])
+            return min([node.lineno] + [d.lineno for d in decorators]) - 1
+
+        boundaries = set()
+        for node in tree.body:
+            boundaries.add(start_of(node))
+            if isinstance(node, ast.ClassDef):
+                # Large classes may be split between their methods
+                for child in node.body:
+                    if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                        boundaries.add(start_of(child))
+
+        return sorted(boundaries)
+
+    def _heuristic_boundaries(self, lines: List[str]) -> List[int]:
+        """Find likely split points from indentation and block structure.
+
+        A split point is an unindented, non-empty line that follows a blank
+        line or a line closing a block, which is where top-level functions and
+        classes start in most languages.
+
+        Args:
+            lines: File content split into lines.
+
+        Returns:
+            Sorted 0-based line indices where a chunk may start.
+        """
+        boundaries = []
+        for i in range(1, len(lines)):
+            line = lines[i]
+            if not line.strip() or line[0].isspace():
+                continue
+            previous = lines[i - 1].strip()
+            if not previous or previous in self.BLOCK_END_LINES:
+                boundaries.append(i)
+        return boundaries
+
     def is_supported(self, file_path: str) -> bool:
         """Check if a file type is supported.
 
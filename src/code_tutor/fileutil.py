@@ -0,0 +1,71 @@
+"""File locking and atomic write helpers shared by Code Tutor's on-disk stores."""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to unlocked access
+    fcntl = None
+
+
+@contextmanager
+def locked(f: IO, exclusive: bool = True) -> Iterator[IO]:
+    """Hold an advisory lock on an open file for the duration of the block.
+
+    Locks coordinate the processes of one or many users sharing a directory
+    (e.g. a home directory on NFS). Where advisory locks are unavailable the
+    block runs unlocked.
+
+    Args:
+        f: Open file object.
+        exclusive: Whether to take an exclusive (write) lock rather than a shared one.
+
+    Yields:
+        The same file object.
+    """
+    if fcntl is None:
+        yield f
+        return
+
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+    try:
+        yield f
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write a file so readers see either the old or the new contents, never a mix.
+
+    Args:
+        path: Destination path.
+        data: Contents to write.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_text(path: Path, text: str, encoding: str = "utf-8") -> None:
+    """Text counterpart of atomic_write_bytes().
+
+    Args:
+        path: Destination path.
+        text: Contents to write.
+        encoding: Text encoding.
+    """
+    atomic_write_bytes(path, text.encode(encoding))
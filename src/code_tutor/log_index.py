@@ -0,0 +1,361 @@
+"""SQLite index over Code Tutor session logs for fast queries."""
+
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .logger import SessionLogger, open_log_file
+
+
+class LogIndex:
+    """Incrementally built SQLite index of the JSONL session logs.
+
+    The index stores, for every event, the log segment and byte offset it
+    came from along with the fields used for filtering (session type, event
+    type, timestamp, topic, model). The log segments stay the source of
+    truth: queries find matching events in the index and read just those
+    lines back. Offsets in compressed segments refer to the decompressed
+    stream.
+
+    Each indexed segment records how far it has been read, so update() only
+    parses lines appended since the last run. Compressed segments are closed
+    and indexed once. Segments that shrink are re-indexed from the start and
+    segments that disappear (e.g. replaced by their compressed copy) are
+    dropped. Session context (type, topic, model) is kept per session ID,
+    since a daily segment interleaves concurrent sessions.
+    """
+
+    INDEX_FILE = "log_index.sqlite3"
+
+    # Bumped whenever the schema changes; older indexes are rebuilt
+    SCHEMA_VERSION = 2
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            name TEXT PRIMARY KEY,
+            indexed_bytes INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            session_type TEXT,
+            topic TEXT,
+            model TEXT
+        );
+        CREATE TABLE IF NOT EXISTS events (
+            file TEXT NOT NULL,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            session_id TEXT,
+            session_type TEXT,
+            event_type TEXT,
+            timestamp TEXT,
+            topic TEXT,
+            model TEXT,
+            PRIMARY KEY (file, offset)
+        );
+        CREATE INDEX IF NOT EXISTS events_timestamp ON events (timestamp);
+        CREATE INDEX IF NOT EXISTS events_type ON events (event_type, session_type);
+        CREATE INDEX IF NOT EXISTS events_topic ON events (topic);
+    """
+
+    def __init__(self, config_dir: Optional[Path] = None):
+        """Initialize the log index.
+
+        Args:
+            config_dir: Optional custom configuration directory path.
+        """
+        if config_dir is None:
+            config_dir = Path.home() / ".config" / "code-tutor"
+
+        self.config_dir = config_dir
+        self.log_dir = config_dir / "logs"
+        self.db_path = self.log_dir / self.INDEX_FILE
+
+    def _connect(self) -> sqlite3.Connection:
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.db_path)
+        connection.row_factory = sqlite3.Row
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            # The index is derived data, so rebuild it rather than migrate
+            connection.executescript("""
+                DROP TABLE IF EXISTS events;
+                DROP TABLE IF EXISTS sessions;
+                DROP TABLE IF EXISTS files;
+            """)
+            connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        connection.executescript(self.SCHEMA)
+        return connection
+
+    def update(self) -> int:
+        """Index events appended to the log files since the last update.
+
+        Returns:
+            Number of newly indexed events.
+        """
+        log_files = {path.name: path for path in SessionLogger.list_log_files(self.config_dir)}
+
+        connection = self._connect()
+        try:
+            with connection:
+                known = {
+                    row["name"]: row
+                    for row in connection.execute("SELECT * FROM files")
+                }
+
+                # Forget files that were cleared or rotated away
+                for name in set(known) - set(log_files):
+                    self._forget_file(connection, name)
+
+                sessions: Dict[str, Dict[str, Any]] = {}
+                indexed = 0
+                for name, path in log_files.items():
+                    indexed += self._index_file(connection, path, known.get(name), sessions)
+                return indexed
+        finally:
+            connection.close()
+
+    def _forget_file(self, connection: sqlite3.Connection, name: str) -> None:
+        connection.execute("DELETE FROM events WHERE file = ?", (name,))
+        connection.execute("DELETE FROM files WHERE name = ?", (name,))
+
+    def _index_file(
+        self,
+        connection: sqlite3.Connection,
+        path: Path,
+        state: Optional[sqlite3.Row],
+        sessions: Dict[str, Dict[str, Any]],
+    ) -> int:
+        """Index the unread tail of one log segment.
+
+        Args:
+            connection: Open index connection.
+            path: Log segment to index.
+            state: The segment's row from the files table, or None if new.
+            sessions: Session context cache shared across segments in one update.
+
+        Returns:
+            Number of events indexed.
+        """
+        compressed = path.suffix != ".jsonl"
+        if compressed and state is not None:
+            # Compressed segments never change once written
+            return 0
+
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return 0
+
+        offset = 0
+        if state is not None:
+            if size < state["indexed_bytes"]:
+                # The file was truncated or replaced; start over
+                self._forget_file(connection, path.name)
+            else:
+                offset = state["indexed_bytes"]
+
+        if offset == size and state is not None:
+            return 0
+
+        rows = []
+        try:
+            with open_log_file(path, "rb") as f:
+                if offset:
+                    f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Partially written line; pick it up on the next update
+                        break
+
+                    line_offset = offset
+                    offset += len(line)
+                    try:
+                        event = json.loads(line)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        continue
+
+                    session_id = event.get("session_id")
+                    if event.get("event_type") == "session_start":
+                        metadata = event.get("metadata") or {}
+                        context = {
+                            "session_type": event.get("session_type"),
+                            "topic": metadata.get("topic"),
+                            "model": metadata.get("model"),
+                        }
+                        sessions[session_id] = context
+                        connection.execute(
+                            "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?)",
+                            (
+                                session_id,
+                                context["session_type"],
+                                context["topic"],
+                                context["model"],
+                            ),
+                        )
+                    else:
+                        context = self._session_context(connection, sessions, session_id)
+
+                    rows.append((
+                        path.name,
+                        line_offset,
+                        len(line),
+                        session_id,
+                        context["session_type"],
+                        event.get("event_type"),
+                        event.get("timestamp"),
+                        event.get("topic") or context["topic"],
+                        event.get("model") or context["model"],
+                    ))
+        except (IOError, EOFError):
+            # Unreadable or truncated (e.g. half-compressed) segment; retry next time
+            return 0
+
+        connection.executemany(
+            "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+        )
+        connection.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?)", (path.name, offset)
+        )
+        return len(rows)
+
+    def _session_context(
+        self,
+        connection: sqlite3.Connection,
+        sessions: Dict[str, Dict[str, Any]],
+        session_id: Optional[str],
+    ) -> Dict[str, Any]:
+        """Look up the context recorded by a session's session_start event.
+
+        Args:
+            connection: Open index connection.
+            sessions: Session context cache, filled on lookup.
+            session_id: Session ID of the event.
+
+        Returns:
+            Dict with session_type, topic and model (None when unknown).
+        """
+        if session_id not in sessions:
+            row = connection.execute(
+                "SELECT session_type, topic, model FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            sessions[session_id] = (
+                dict(row) if row is not None
+                else {"session_type": None, "topic": None, "model": None}
+            )
+        return sessions[session_id]
+
+    def query(
+        self,
+        session_type: Optional[str] = None,
+        event_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        topic: Optional[str] = None,
+        model: Optional[str] = None,
+        limit: Optional[int] = None,
+        update: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Find logged events matching all of the given filters.
+
+        Args:
+            session_type: Session type, e.g. 'review' or 'teaching'.
+            event_type: Event type, e.g. 'teaching_round' or 'api_call'.
+            since: Only events at or after this time (UTC).
+            until: Only events before this time (UTC).
+            topic: Case-insensitive substring of the event or session topic.
+            model: Model name used by the event or its session.
+            limit: Maximum number of events to return (most recent first).
+            update: Whether to index new log lines before querying.
+
+        Returns:
+            List of matching events, most recent first.
+        """
+        if update:
+            self.update()
+
+        clauses = []
+        params: List[Any] = []
+        if session_type:
+            clauses.append("session_type = ?")
+            params.append(session_type)
+        if event_type:
+            clauses.append("event_type = ?")
+            params.append(event_type)
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since.isoformat())
+        if until:
+            clauses.append("timestamp < ?")
+            params.append(until.isoformat())
+        if topic:
+            clauses.append("topic LIKE ?")
+            params.append(f"%{topic}%")
+        if model:
+            clauses.append("model = ?")
+            params.append(model)
+
+        sql = "SELECT file, offset, length FROM events"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        connection = self._connect()
+        try:
+            locations = connection.execute(sql, params).fetchall()
+        finally:
+            connection.close()
+
+        return self._read_events(locations)
+
+    def _read_events(self, locations: List[sqlite3.Row]) -> List[Dict[str, Any]]:
+        """Read events back from the log segments at their indexed offsets.
+
+        Locations are visited in file and offset order so every segment is
+        read front to back, which keeps seeking in compressed segments cheap.
+
+        Args:
+            locations: Rows with file, offset and length.
+
+        Returns:
+            Events in the order given; events that can't be read are skipped.
+        """
+        found: Dict[int, Dict[str, Any]] = {}
+        order = sorted(
+            range(len(locations)),
+            key=lambda i: (locations[i]["file"], locations[i]["offset"]),
+        )
+
+        current_name = None
+        f = None
+        try:
+            for i in order:
+                location = locations[i]
+                name = location["file"]
+                if name != current_name:
+                    if f is not None:
+                        f.close()
+                    current_name = name
+                    try:
+                        f = open_log_file(self.log_dir / name, "rb")
+                    except IOError:
+                        f = None
+                if f is None:
+                    continue
+
+                try:
+                    f.seek(location["offset"])
+                    found[i] = json.loads(f.read(location["length"]))
+                except (json.JSONDecodeError, UnicodeDecodeError, EOFError, IOError):
+                    continue
+        finally:
+            if f is not None:
+                f.close()
+
+        return [found[i] for i in range(len(locations)) if i in found]
@@ -0,0 +1,199 @@
+"""Aggregate reports over Code Tutor session logs."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .client import USAGE_FIELDS
+from .logger import SessionLogger
+
+UNKNOWN = "(unknown)"
+
+
+def empty_report() -> Dict[str, Any]:
+    """Create an empty aggregate report.
+
+    Returns:
+        Report dictionary with zeroed counters.
+    """
+    return {
+        "files": 0,
+        "sessions": 0,
+        "topics": {},
+        "students": {},
+        "assessments": {},
+        "tokens": dict.fromkeys(USAGE_FIELDS, 0),
+        "api_calls": 0,
+    }
+
+
+def _topic_stats(report: Dict[str, Any], topic: str) -> Dict[str, int]:
+    return report["topics"].setdefault(topic, {
+        "rounds": 0,
+        "understood": 0,
+        "rounds_to_understanding": 0,
+    })
+
+
+def _student_stats(report: Dict[str, Any], student: str) -> Dict[str, int]:
+    return report["students"].setdefault(student, {
+        "sessions": 0,
+        "rounds": 0,
+        "understood": 0,
+        "reviews": 0,
+        "tokens": 0,
+    })
+
+
+def scan_log_file(path: str) -> Dict[str, Any]:
+    """Compute the aggregates of a single log file (the map step).
+
+    Events are read one at a time, so memory use is independent of file size.
+    Rounds to understanding counts the teaching rounds of a session on a topic
+    up to and including the round where the simulated student understood;
+    rounds after the last success are counted as rounds but not towards that
+    figure.
+
+    Args:
+        path: Path to a log segment, optionally compressed.
+
+    Returns:
+        Partial report for the file.
+    """
+    report = empty_report()
+    report["files"] = 1
+
+    # Daily segments interleave concurrent sessions, so track each by ID
+    students: Dict[Any, str] = {}
+    pending_rounds: Dict[Any, Dict[str, int]] = {}
+
+    try:
+        for event in SessionLogger.iter_log_events(Path(path)):
+            event_type = event.get("event_type")
+            session_id = event.get("session_id")
+
+            if event_type == "session_start":
+                student = students[session_id] = event.get("user") or UNKNOWN
+                report["sessions"] += 1
+                _student_stats(report, student)["sessions"] += 1
+                continue
+
+            student = students.get(session_id, UNKNOWN)
+            if event_type == "teaching_round":
+                topic = event.get("topic") or UNKNOWN
+                topic_stats = _topic_stats(report, topic)
+                student_stats = _student_stats(report, student)
+                topic_stats["rounds"] += 1
+                student_stats["rounds"] += 1
+                pending = pending_rounds.setdefault(session_id, {})
+                pending[topic] = pending.get(topic, 0) + 1
+
+                if event.get("understanding_achieved"):
+                    topic_stats["understood"] += 1
+                    topic_stats["rounds_to_understanding"] += pending.pop(topic)
+                    student_stats["understood"] += 1
+
+            elif event_type == "exercise_review":
+                assessment = event.get("assessment") or UNKNOWN
+                report["assessments"][assessment] = report["assessments"].get(assessment, 0) + 1
+                _student_stats(report, student)["reviews"] += 1
+
+            elif event_type == "api_call":
+                usage = event.get("usage") or {}
+                report["api_calls"] += 1
+                for field in USAGE_FIELDS:
+                    report["tokens"][field] += usage.get(field, 0) or 0
+                _student_stats(report, student)["tokens"] += (
+                    (usage.get("input_tokens", 0) or 0) + (usage.get("output_tokens", 0) or 0)
+                )
+    except IOError:
+        pass
+
+    return report
+
+
+def merge_reports(total: Dict[str, Any], partial: Dict[str, Any]) -> Dict[str, Any]:
+    """Add a partial report into a running total (the reduce step).
+
+    Args:
+        total: Running total, modified in place.
+        partial: Report to add.
+
+    Returns:
+        The updated total.
+    """
+    for key in ("files", "sessions", "api_calls"):
+        total[key] += partial[key]
+
+    for field in USAGE_FIELDS:
+        total["tokens"][field] += partial["tokens"][field]
+
+    for assessment, count in partial["assessments"].items():
+        total["assessments"][assessment] = total["assessments"].get(assessment, 0) + count
+
+    for topic, stats in partial["topics"].items():
+        totals = _topic_stats(total, topic)
+        for key, value in stats.items():
+            totals[key] += value
+
+    for student, stats in partial["students"].items():
+        totals = _student_stats(total, student)
+        for key, value in stats.items():
+            totals[key] += value
+
+    return total
+
+
+def find_log_files(paths: Iterable[Path]) -> List[Path]:
+    """Collect session log files from files and directories.
+
+    Directories are searched recursively, so a directory of log folders
+    collected from many students can be reported on at once.
+
+    Args:
+        paths: Log files or directories containing them.
+
+    Returns:
+        Sorted, de-duplicated list of log file paths.
+    """
+    found = set()
+    for path in paths:
+        if path.is_dir():
+            found.update(p for p in path.rglob(SessionLogger.LOG_FILE_PATTERN) if p.is_file())
+        elif path.is_file():
+            found.add(path)
+    return sorted(found)
+
+
+def build_report(log_files: List[Path], workers: Optional[int] = None) -> Dict[str, Any]:
+    """Aggregate log files across a pool of worker processes.
+
+    Files are parsed in parallel and each worker returns only a small
+    partial report, which is merged into the running total as it arrives;
+    events never leave the worker that parsed them.
+
+    Args:
+        log_files: Log files to aggregate.
+        workers: Number of worker processes; defaults to the CPU count.
+            With one worker (or one file) everything runs in-process.
+
+    Returns:
+        Aggregate report.
+    """
+    total = empty_report()
+    workers = workers or os.cpu_count() or 1
+    paths = [str(path) for path in log_files]
+
+    if workers == 1 or len(paths) <= 1:
+        for path in paths:
+            merge_reports(total, scan_log_file(path))
+        return total
+
+    # Hand out files in batches to keep inter-process overhead low
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for partial in executor.map(scan_log_file, paths, chunksize=chunksize):
+            merge_reports(total, partial)
+
+    return total
@@ -1,27 +1,125 @@
 """Logging system for Code Tutor student interactions."""
 
+import atexit
+import getpass
+import gzip
 import json
 import os
-from datetime import datetime
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from collections import deque
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import IO, Any, Deque, Dict, Iterator, List, Optional, Set, Tuple
 from uuid import uuid4
 
+from .config import ConfigManager
+from .fileutil import locked
 
-class SessionLogger:
-    """Manages logging of student interactions for debugging and analysis."""
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Loggers with possibly unflushed events, flushed when the interpreter exits
+_active_loggers: "weakref.WeakSet[SessionLogger]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_active_loggers() -> None:
+    for logger in list(_active_loggers):
+        logger.flush()
+
+
+def open_log_file(path: Path, mode: str = "rt") -> IO:
+    """Open a log segment for reading, decompressing .gz and .zst files.
+
+    Args:
+        path: Log segment path.
+        mode: 'rt' for text or 'rb' for bytes.
+
+    Returns:
+        Open file object.
+
+    Raises:
+        IOError: If the file can't be opened, or is zstd-compressed and the
+            optional 'zstandard' package is not installed.
+    """
+    if path.suffix == ".gz":
+        return gzip.open(path, mode)
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise IOError(f"Reading {path.name} requires the 'zstandard' package")
+        return zstandard.open(path, mode)
+    return open(path, mode)
 
-    def __init__(self, config_dir: Optional[Path] = None, enabled: bool = True):
+
+class SessionLogger:
+    """Manages logging of student interactions for debugging and analysis.
+
+    Events from all sessions of a day are appended to a daily segment file,
+    ``logs/session_YYYYMMDD.jsonl``, under an advisory lock so concurrent
+    sessions can share it. Segments from earlier days are compressed and
+    old segments are removed according to the retention policy whenever a
+    session ends.
+
+    Events are buffered and appended in batches: the buffer is flushed when
+    it reaches FLUSH_MAX_EVENTS events or FLUSH_MAX_BYTES bytes,
+    FLUSH_INTERVAL_SECONDS after the first unflushed event, on errors, at
+    session end and at interpreter exit. Only the most recent
+    MAX_EVENTS_IN_MEMORY events are kept in ``events``; the log segments
+    hold the full session.
+    """
+
+    FLUSH_MAX_EVENTS = 50
+    FLUSH_MAX_BYTES = 64 * 1024
+    FLUSH_INTERVAL_SECONDS = 5.0
+    MAX_EVENTS_IN_MEMORY = 1000
+
+    # Events written through immediately so they survive a crash
+    FLUSH_IMMEDIATELY = {"error", "session_end"}
+
+    LOG_FILE_PATTERN = "session_*.jsonl*"
+    COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+    # Uncompressed segments untouched for this long are treated as closed
+    CLOSED_SEGMENT_AGE_SECONDS = 60 * 60
+
+    DEFAULT_MAX_AGE_DAYS = 90
+    DEFAULT_MAX_TOTAL_MB = 500
+
+    def __init__(
+        self,
+        config_dir: Optional[Path] = None,
+        enabled: bool = True,
+        compression: str = "gzip",
+        max_age_days: Optional[float] = DEFAULT_MAX_AGE_DAYS,
+        max_total_mb: Optional[float] = DEFAULT_MAX_TOTAL_MB,
+    ):
         """Initialize the session logger.
 
         Args:
             config_dir: Optional custom configuration directory path.
             enabled: Whether logging is enabled.
+            compression: How closed segments are compressed: 'gzip', 'zstd'
+                (needs the optional 'zstandard' package, else gzip is used)
+                or 'none'.
+            max_age_days: Segments older than this are deleted; None keeps them.
+            max_total_mb: Oldest segments are deleted beyond this total size;
+                None means no limit.
         """
         self.enabled = enabled
         if config_dir is None:
             config_dir = Path.home() / ".config" / "code-tutor"
 
+        self.config_dir = config_dir
+        self.compression = compression
+        self.max_age_days = max_age_days
+        self.max_total_mb = max_total_mb
         self.log_dir = config_dir / "logs"
         self.log_dir.mkdir(parents=True, exist_ok=True)
 
@@ -29,11 +127,41 @@ class SessionLogger:
         self.session_id = str(uuid4())
         self.session_start = datetime.utcnow().isoformat()
         self.session_type = None
-        self.events: List[Dict[str, Any]] = []
+        self.user = self._current_user()
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=self.MAX_EVENTS_IN_MEMORY)
         self.metadata: Dict[str, Any] = {}
 
-        # Log file path (JSONL format for easy appending)
-        self.log_file = self.log_dir / f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self.session_id[:8]}.jsonl"
+        # Write buffer, guarded by a lock since API call events may come from worker threads
+        self._buffer: List[str] = []
+        self._buffer_bytes = 0
+        self._flush_timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+        # Segments this session has written to (more than one if it spans midnight)
+        self.segments_written: Set[Path] = set()
+
+    @classmethod
+    def from_config(cls, config_manager: ConfigManager) -> "SessionLogger":
+        """Create a logger using the 'logging' settings of a configuration.
+
+        Args:
+            config_manager: Loaded configuration manager.
+
+        Returns:
+            Configured SessionLogger.
+        """
+        return cls(
+            config_dir=config_manager.config_dir,
+            enabled=True,
+            compression=config_manager.get("logging.compression", "gzip"),
+            max_age_days=config_manager.get("logging.max_age_days", cls.DEFAULT_MAX_AGE_DAYS),
+            max_total_mb=config_manager.get("logging.max_total_mb", cls.DEFAULT_MAX_TOTAL_MB),
+        )
+
+    @property
+    def log_file(self) -> Path:
+        """Path of today's log segment (JSONL format for easy appending)."""
+        return self.log_dir / f"session_{datetime.now().strftime('%Y%m%d')}.jsonl"
 
     def start_session(self, session_type: str, metadata: Optional[Dict[str, Any]] = None) -> None:
         """Start a new logging session.
@@ -53,6 +181,7 @@ class SessionLogger:
             "timestamp": datetime.utcnow().isoformat(),
             "session_id": self.session_id,
             "session_type": session_type,
+            "user": self.user,
             "metadata": self.metadata,
         }
 
@@ -126,7 +255,11 @@ class SessionLogger:
 
     def log_teaching_round(self, round_num: int, topic: str, language: str,
                           flawed_code: str, student_explanation: str,
-                          ai_evaluation: str) -> None:
+                          ai_evaluation: str,
+                          understanding_achieved: Optional[bool] = None,
+                          student_question: Optional[str] = None,
+                          issues: Optional[List[str]] = None,
+                          experience_level: Optional[str] = None) -> None:
         """Log a teaching mode round.
 
         Args:
@@ -136,6 +269,10 @@ class SessionLogger:
             flawed_code: The flawed code presented.
             student_explanation: Student's teaching explanation.
             ai_evaluation: AI's evaluation of the teaching.
+            understanding_achieved: Whether the simulated student reached understanding.
+            student_question: The simulated student's question about the code.
+            issues: The hidden issues in the flawed code.
+            experience_level: Experience level the code was written for.
         """
         if not self.enabled:
             return
@@ -150,12 +287,45 @@ class SessionLogger:
             "flawed_code": flawed_code,
             "student_explanation": student_explanation,
             "ai_evaluation": ai_evaluation,
+            "understanding_achieved": understanding_achieved,
+            "student_question": student_question,
+            "issues": issues,
+            "experience_level": experience_level,
+        }
+
+        self._log_event(event)
+
+    def log_exercise_review(self, exercise_id: str, topic: str, language: str,
+                            assessment: str) -> None:
+        """Log the review of an exercise submission.
+
+        Args:
+            exercise_id: The reviewed exercise's ID.
+            topic: The exercise topic.
+            language: Programming language.
+            assessment: Overall assessment (e.g. GOOD, NEEDS_WORK).
+        """
+        if not self.enabled:
+            return
+
+        event = {
+            "event_type": "exercise_review",
+            "timestamp": datetime.utcnow().isoformat(),
+            "session_id": self.session_id,
+            "exercise_id": exercise_id,
+            "topic": topic,
+            "language": language,
+            "assessment": assessment,
         }
 
         self._log_event(event)
 
     def log_api_call(self, model: str, prompt: str, response: str,
-                     usage: Optional[Dict[str, int]] = None) -> None:
+                     usage: Optional[Dict[str, int]] = None,
+                     call_site: Optional[str] = None,
+                     latency_seconds: Optional[float] = None,
+                     time_to_first_token_seconds: Optional[float] = None,
+                     error: Optional[str] = None) -> None:
         """Log an API call (if enabled in config).
 
         Args:
@@ -163,6 +333,10 @@ class SessionLogger:
             prompt: The prompt sent to the API.
             response: The API response.
             usage: Optional usage statistics.
+            call_site: Optional name of the component that made the call.
+            latency_seconds: Optional wall time of the call.
+            time_to_first_token_seconds: Optional time until the first streamed text.
+            error: Optional error message if the call failed.
         """
         if not self.enabled:
             return
@@ -172,9 +346,13 @@ class SessionLogger:
             "timestamp": datetime.utcnow().isoformat(),
             "session_id": self.session_id,
             "model": model,
+            "call_site": call_site,
+            "latency_seconds": latency_seconds,
+            "time_to_first_token_seconds": time_to_first_token_seconds,
             "prompt": prompt,
             "response": response,
             "usage": usage or {},
+            "error": error,
         }
 
         self._log_event(event)
@@ -214,23 +392,108 @@ class SessionLogger:
         }
 
         self._log_event(event)
+        self.maintain_logs()
+
+    @staticmethod
+    def _current_user() -> Optional[str]:
+        """Get the login name of the user running the session, if known."""
+        try:
+            return getpass.getuser()
+        except Exception:
+            return None
 
     def _log_event(self, event: Dict[str, Any]) -> None:
-        """Write an event to the log file.
+        """Buffer an event for writing to the log file.
 
         Args:
             event: Event data to log.
         """
-        self.events.append(event)
+        line = json.dumps(event) + "\n"
+
+        with self._lock:
+            self.events.append(event)
+            self._buffer.append(line)
+            self._buffer_bytes += len(line)
+
+            should_flush = (
+                event.get("event_type") in self.FLUSH_IMMEDIATELY
+                or len(self._buffer) >= self.FLUSH_MAX_EVENTS
+                or self._buffer_bytes >= self.FLUSH_MAX_BYTES
+            )
+            if should_flush:
+                self._flush_locked()
+            elif self._flush_timer is None:
+                # Bound how long an event can sit in the buffer during a quiet period
+                self._flush_timer = threading.Timer(self.FLUSH_INTERVAL_SECONDS, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+                _active_loggers.add(self)
+
+    def flush(self) -> None:
+        """Write all buffered events to the log file."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        """Write buffered events; the caller must hold ``self._lock``."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        if not self._buffer:
+            return
 
-        # Write to JSONL file (one JSON object per line)
+        data = "".join(self._buffer)
+        self._buffer = []
+        self._buffer_bytes = 0
+
+        # Append to today's JSONL segment (one JSON object per line)
         try:
-            with open(self.log_file, "a") as f:
-                f.write(json.dumps(event) + "\n")
-        except IOError as e:
-            # If we can't write to the log file, store in memory only
+            self._append_to_segment(data)
+        except (IOError, OSError):
+            # If we can't write to the log file, recent events stay in memory only
             pass
 
+    def _append_to_segment(self, data: str) -> None:
+        """Append data to today's segment under an exclusive lock.
+
+        If the segment is compressed away by another process between opening
+        and locking it, the write is retried on a fresh file.
+
+        Args:
+            data: Serialized events to append.
+        """
+        while True:
+            path = self.log_file
+            with open(path, "a") as f:
+                with locked(f):
+                    if os.fstat(f.fileno()).st_nlink == 0:
+                        continue
+                    f.write(data)
+                    f.flush()
+            self.segments_written.add(path)
+            return
+
+    def _read_session_events(self) -> List[Dict[str, Any]]:
+        """Read this session's events back from the log segments.
+
+        Returns:
+            All logged events, or the in-memory events if nothing can be read.
+        """
+        self.flush()
+
+        events = []
+        for path in sorted(self.segments_written):
+            try:
+                events.extend(
+                    event for event in self.iter_log_events(path)
+                    if event.get("session_id") == self.session_id
+                )
+            except IOError:
+                return list(self.events)
+
+        return events or list(self.events)
+
     def export_session(self, output_path: Optional[Path] = None) -> Path:
         """Export the current session to a JSON file.
 
@@ -243,14 +506,16 @@ class SessionLogger:
         if output_path is None:
             output_path = self.log_dir / f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self.session_id[:8]}.json"
 
+        events = self._read_session_events()
+
         session_data = {
             "session_id": self.session_id,
             "session_type": self.session_type,
             "start_time": self.session_start,
             "end_time": datetime.utcnow().isoformat(),
             "metadata": self.metadata,
-            "events": self.events,
-            "event_count": len(self.events),
+            "events": events,
+            "event_count": len(events),
         }
 
         with open(output_path, "w") as f:
@@ -258,96 +523,385 @@ class SessionLogger:
 
         return output_path
 
+    EXPORT_FORMATS = ("json", "jsonl")
+
     @staticmethod
-    def export_all_logs(config_dir: Optional[Path] = None, output_path: Optional[Path] = None) -> Path:
-        """Export all log files to a single JSON file.
+    def list_log_files(config_dir: Optional[Path] = None) -> List[Path]:
+        """List all log segments, compressed or not, oldest first.
 
         Args:
             config_dir: Optional custom configuration directory path.
-            output_path: Optional output file path.
 
         Returns:
-            Path to the exported file.
+            Sorted list of log segment paths.
         """
         if config_dir is None:
             config_dir = Path.home() / ".config" / "code-tutor"
 
         log_dir = config_dir / "logs"
-
         if not log_dir.exists():
-            # No logs to export
-            if output_path is None:
-                output_path = Path.cwd() / f"code_tutor_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            return []
 
-            with open(output_path, "w") as f:
-                json.dump({"sessions": [], "total_sessions": 0}, f, indent=2)
+        return sorted(
+            log_dir.glob(SessionLogger.LOG_FILE_PATTERN),
+            key=lambda path: (path.name.split(".", 1)[0], path.name),
+        )
 
-            return output_path
+    @staticmethod
+    def iter_log_events(log_file: Path) -> Iterator[Dict[str, Any]]:
+        """Iterate over the events of a log segment one at a time.
+
+        Compressed segments are decompressed on the fly. Lines that are not
+        valid JSON (e.g. a line cut short by a crash) are skipped.
+
+        Args:
+            log_file: Path to a log segment.
+
+        Yields:
+            Event dictionaries in file order.
+        """
+        with open_log_file(log_file) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    @staticmethod
+    def export_all_logs(
+        config_dir: Optional[Path] = None,
+        output_path: Optional[Path] = None,
+        export_format: str = "json",
+        compress: bool = False,
+    ) -> Path:
+        """Export all log files to a single file.
+
+        Sessions are streamed to the output one event at a time, so memory use
+        does not depend on the total volume of logs. For the 'json' format each
+        segment is first copied to a temporary file and indexed by session, so
+        a segment that can't be read is skipped before any of it is written
+        and interleaved sessions are still exported as one object each.
+
+        Args:
+            config_dir: Optional custom configuration directory path.
+            output_path: Optional output file path.
+            export_format: 'json' for a single JSON document with a list of sessions,
+                or 'jsonl' for one event per line.
+            compress: Whether to gzip the output.
+
+        Returns:
+            Path to the exported file.
+        """
+        if export_format not in SessionLogger.EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+        if output_path is None:
+            suffix = f".{export_format}" + (".gz" if compress else "")
+            output_path = Path.cwd() / f"code_tutor_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}{suffix}"
+
+        log_files = SessionLogger.list_log_files(config_dir)
+
+        opener = gzip.open if compress else open
+        with opener(output_path, "wt") as out:
+            if export_format == "jsonl":
+                for log_file in log_files:
+                    try:
+                        for event in SessionLogger.iter_log_events(log_file):
+                            out.write(json.dumps(event) + "\n")
+                    except IOError:
+                        # Skip files that can't be read
+                        continue
+            else:
+                out.write("{\n")
+                out.write(f'  "export_timestamp": {json.dumps(datetime.utcnow().isoformat())},\n')
+                out.write('  "sessions": [')
+                total_sessions = 0
+                for log_file in log_files:
+                    try:
+                        spool, sessions = SessionLogger._index_sessions(log_file)
+                    except (IOError, EOFError):
+                        # Skip files that can't be read; nothing of them has been written yet
+                        continue
+                    with spool:
+                        total_sessions += SessionLogger._write_sessions_json(
+                            out, log_file, spool, sessions, first=total_sessions == 0
+                        )
+                out.write("\n  ],\n" if total_sessions else "],\n")
+                out.write(f'  "total_sessions": {total_sessions}\n')
+                out.write("}\n")
+
+        return output_path
 
-        # Read all JSONL files
-        sessions = []
-        for log_file in sorted(log_dir.glob("session_*.jsonl")):
-            events = []
+    @staticmethod
+    def _index_sessions(log_file: Path) -> Tuple[IO[bytes], Dict[Any, Dict[str, Any]]]:
+        """Read a log segment into a temporary file and index its events by session.
+
+        This is the first of the two passes of the JSON export. Reading the
+        whole segment up front means a file that can't be read fails before
+        any of it is written to the export, and the offsets let the second
+        pass write each session's events together even when sessions ran
+        concurrently and their events interleave in the segment.
+
+        Args:
+            log_file: Log segment to index.
+
+        Returns:
+            Tuple of (temporary file holding the segment's valid event lines,
+            dictionary of session ID to its start event, end time and the
+            offsets of its events in the temporary file, in order of first
+            appearance).
+
+        Raises:
+            IOError: If the segment can't be read.
+            EOFError: If a compressed segment is truncated.
+        """
+        spool = tempfile.TemporaryFile()
+        sessions: Dict[Any, Dict[str, Any]] = {}
+        try:
+            with open_log_file(log_file, "rb") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        # Not valid JSON, e.g. a line cut short by a crash
+                        continue
+
+                    session = sessions.setdefault(
+                        event.get("session_id"), {"start": event, "offsets": []}
+                    )
+                    if event.get("event_type") == "session_start":
+                        session["start"] = event
+                    session["end_time"] = event.get("timestamp")
+                    session["offsets"].append(spool.tell())
+                    spool.write(line + b"\n")
+        except BaseException:
+            spool.close()
+            raise
+
+        return spool, sessions
+
+    @staticmethod
+    def _write_sessions_json(
+        out: IO[str],
+        log_file: Path,
+        spool: IO[bytes],
+        sessions: Dict[Any, Dict[str, Any]],
+        first: bool,
+    ) -> int:
+        """Write the indexed sessions of one log segment as JSON objects.
+
+        Each session in the segment becomes exactly one object, its events
+        read back one at a time from the segment's temporary copy.
+
+        Args:
+            out: Output text stream, positioned inside the sessions array.
+            log_file: Log segment being exported.
+            spool: Temporary copy of the segment from _index_sessions().
+            sessions: Session index from _index_sessions().
+            first: Whether the next session is the first in the array.
+
+        Returns:
+            Number of session objects written.
+        """
+        written = 0
+        for session_id, session in sessions.items():
+            start = session["start"]
+            header = {
+                "session_id": session_id,
+                "session_type": start.get("session_type"),
+                "start_time": start.get("timestamp"),
+                "metadata": start.get("metadata", {}),
+                "log_file": str(log_file.name),
+            }
+            out.write("\n    {" if first and not written else ",\n    {")
+            for key, value in header.items():
+                out.write(f"\n      {json.dumps(key)}: {json.dumps(value)},")
+            out.write('\n      "events": [')
+
+            for index, offset in enumerate(session["offsets"]):
+                spool.seek(offset)
+                out.write("\n        " if index == 0 else ",\n        ")
+                out.write(spool.readline().decode("utf-8").rstrip("\n"))
+
+            out.write("\n      ],")
+            out.write(f'\n      "end_time": {json.dumps(session["end_time"])},')
+            out.write(f'\n      "event_count": {len(session["offsets"])}\n    }}')
+            written += 1
+
+        return written
+
+    def maintain_logs(self) -> None:
+        """Compress closed segments and apply the retention policy.
+
+        Called at the end of every session; errors are ignored since
+        maintenance is retried next time.
+        """
+        if not self.enabled:
+            return
+
+        try:
+            self.compress_closed_segments(self.config_dir, self.compression)
+            self.prune_logs(self.config_dir, self.max_age_days, self.max_total_mb)
+        except OSError:
+            pass
+
+    @staticmethod
+    def compress_closed_segments(
+        config_dir: Optional[Path] = None,
+        compression: str = "gzip",
+    ) -> int:
+        """Compress segments that are no longer being written to.
+
+        Today's segment is never compressed; other uncompressed segments are
+        once they have been untouched for CLOSED_SEGMENT_AGE_SECONDS.
+
+        Args:
+            config_dir: Optional custom configuration directory path.
+            compression: 'gzip', 'zstd' (gzip if 'zstandard' is not installed) or 'none'.
+
+        Returns:
+            Number of segments compressed.
+        """
+        if compression == "none":
+            return 0
+        if compression == "zstd" and zstandard is None:
+            compression = "gzip"
+        suffix = SessionLogger.COMPRESSION_SUFFIXES.get(compression, ".gz")
+
+        today = f"session_{datetime.now().strftime('%Y%m%d')}.jsonl"
+        now = time.time()
+
+        count = 0
+        for path in SessionLogger.list_log_files(config_dir):
+            if path.suffix != ".jsonl" or path.name == today:
+                continue
             try:
-                with open(log_file, "r") as f:
-                    for line in f:
-                        if line.strip():
-                            events.append(json.loads(line))
-
-                if events:
-                    # Extract session info from first event
-                    first_event = events[0]
-                    last_event = events[-1]
-
-                    session_data = {
-                        "session_id": first_event.get("session_id"),
-                        "session_type": first_event.get("session_type"),
-                        "start_time": first_event.get("timestamp"),
-                        "end_time": last_event.get("timestamp"),
-                        "metadata": first_event.get("metadata", {}),
-                        "events": events,
-                        "event_count": len(events),
-                        "log_file": str(log_file.name),
-                    }
-                    sessions.append(session_data)
-            except (IOError, json.JSONDecodeError):
-                # Skip files that can't be read
+                if now - path.stat().st_mtime < SessionLogger.CLOSED_SEGMENT_AGE_SECONDS:
+                    continue
+                if SessionLogger._compress_segment(path, suffix):
+                    count += 1
+            except OSError:
                 continue
 
-        if output_path is None:
-            output_path = Path.cwd() / f"code_tutor_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        return count
 
-        export_data = {
-            "export_timestamp": datetime.utcnow().isoformat(),
-            "total_sessions": len(sessions),
-            "sessions": sessions,
-        }
+    @staticmethod
+    def _compress_segment(path: Path, suffix: str) -> bool:
+        """Replace a segment with a compressed copy, keeping its modification time.
 
-        with open(output_path, "w") as f:
-            json.dump(export_data, f, indent=2)
+        The segment is locked while it is compressed, so a late writer either
+        finishes first or finds the file gone and starts a new one.
 
-        return output_path
+        Args:
+            path: Uncompressed segment.
+            suffix: '.gz' or '.zst'.
+
+        Returns:
+            True if the segment was compressed, False if another process got there first.
+        """
+        target = path.with_name(path.name + suffix)
+
+        with open(path, "rb") as src, locked(src):
+            stat = os.fstat(src.fileno())
+            if stat.st_nlink == 0:
+                return False
+
+            fd, tmp_name = tempfile.mkstemp(
+                dir=path.parent, prefix=f".{target.name}.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "wb") as raw:
+                    if suffix == ".zst":
+                        dst = zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+                    else:
+                        dst = gzip.GzipFile(filename=path.name, mode="wb", fileobj=raw)
+                    with dst:
+                        shutil.copyfileobj(src, dst)
+                os.utime(tmp_name, (stat.st_atime, stat.st_mtime))
+                os.replace(tmp_name, target)
+            except BaseException:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+                raise
+
+            path.unlink()
+
+        return True
 
     @staticmethod
-    def clear_logs(config_dir: Optional[Path] = None) -> int:
-        """Clear all log files.
+    def prune_logs(
+        config_dir: Optional[Path] = None,
+        max_age_days: Optional[float] = None,
+        max_total_mb: Optional[float] = None,
+    ) -> int:
+        """Delete log segments beyond the retention limits.
+
+        Segments older than ``max_age_days`` are deleted, then the oldest
+        remaining ones until the total is within ``max_total_mb``. Today's
+        segment is always kept.
 
         Args:
             config_dir: Optional custom configuration directory path.
+            max_age_days: Maximum segment age; None for no age limit.
+            max_total_mb: Maximum total size of all segments; None for no size limit.
 
         Returns:
-            Number of log files deleted.
+            Number of segments deleted.
         """
-        if config_dir is None:
-            config_dir = Path.home() / ".config" / "code-tutor"
+        today = f"session_{datetime.now().strftime('%Y%m%d')}.jsonl"
 
-        log_dir = config_dir / "logs"
+        entries = []
+        for path in SessionLogger.list_log_files(config_dir):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
 
-        if not log_dir.exists():
-            return 0
+        total = sum(size for _, size, _ in entries)
+        max_bytes = max_total_mb * 1024 * 1024 if max_total_mb is not None else None
+        oldest_allowed = (
+            (datetime.now() - timedelta(days=max_age_days)).timestamp()
+            if max_age_days is not None else None
+        )
+
+        count = 0
+        for mtime, size, path in sorted(entries):
+            too_old = oldest_allowed is not None and mtime < oldest_allowed
+            too_big = max_bytes is not None and total > max_bytes
+            if not (too_old or too_big):
+                # Entries are oldest-first, so the rest are within both limits
+                break
+            if path.name == today:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            count += 1
+
+        return count
 
+    @staticmethod
+    def clear_logs(config_dir: Optional[Path] = None) -> int:
+        """Clear all log files, including compressed segments.
+
+        Args:
+            config_dir: Optional custom configuration directory path.
+
+        Returns:
+            Number of log files deleted.
+        """
         count = 0
-        for log_file in log_dir.glob("session_*.jsonl"):
+        for log_file in SessionLogger.list_log_files(config_dir):
             try:
                 log_file.unlink()
                 count += 1
@@ -1,20 +1,68 @@
 """Proof analysis using Claude API."""
 
-from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Dict, List, Optional
 import anthropic
 
+from .client import ApiCallListener, create_message, get_client
+from .structured_output import StructuredResult, create_message_with_result
+
+
+@dataclass
+class ProofQuestions(StructuredResult):
+    """Main claim of a proof and clarifying questions about it."""
+
+    main_claim: str = ""
+    questions: List[str] = field(default_factory=list)
+
+    TOOL_NAME: ClassVar[str] = "ask_clarifying_questions"
+    TOOL_DESCRIPTION: ClassVar[str] = (
+        "State the proof's main claim and ask the writer clarifying questions."
+    )
+    SCHEMA: ClassVar[Dict] = {
+        "type": "object",
+        "properties": {
+            "main_claim": {
+                "type": "string",
+                "description": "One sentence describing what is being proved.",
+            },
+            "questions": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "The clarifying questions, one per item, without numbering.",
+            },
+        },
+        "required": ["main_claim", "questions"],
+    }
+
+    def to_markdown(self) -> str:
+        """Get the claim and questions as sections of an analysis."""
+        return f"## Main Claim\n\n{self.main_claim}\n\n## Questions\n\n" + "\n".join(
+            f"{i}. {question}" for i, question in enumerate(self.questions, 1)
+        )
+
 
 class ProofAnalyzer:
     """Analyzes mathematical proofs using Claude API with educational approach."""
 
-    def __init__(self, api_key: str, model: str = "claude-sonnet-4-5"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "claude-sonnet-4-5",
+        client: Optional[anthropic.Anthropic] = None,
+        on_api_call: Optional[ApiCallListener] = None,
+    ):
         """Initialize the proof analyzer.
 
         Args:
             api_key: Anthropic API key.
             model: Claude model to use.
+            client: Optional Anthropic client; defaults to the shared client.
+            on_api_call: Optional listener for the metrics of each API call,
+                e.g. SessionLogger.log_api_call.
         """
-        self.client = anthropic.Anthropic(api_key=api_key)
+        self.client = client or get_client(api_key)
+        self.on_api_call = on_api_call
         self.model = model
         self.conversation_history: List[Dict[str, str]] = []
 
@@ -45,13 +93,17 @@ class ProofAnalyzer:
         )
 
         try:
-            response = self.client.messages.create(
+            result, text, _ = create_message_with_result(
+                self.client,
+                "ProofAnalyzer.analyze_proof",
+                ProofQuestions,
+                self._build_questions_follow_up_prompt(),
+                on_api_call=self.on_api_call,
                 model=self.model,
                 max_tokens=4096,
                 messages=[{"role": "user", "content": prompt}],
             )
-
-            response_content = response.content[0].text
+            response_content = self._analysis_text(result, text)
 
             # Store in conversation history
             self.conversation_history.append({"role": "user", "content": prompt})
@@ -83,7 +135,10 @@ class ProofAnalyzer:
         try:
             self.conversation_history.append({"role": "user", "content": prompt})
 
-            response = self.client.messages.create(
+            response = create_message(
+                self.client,
+                "ProofAnalyzer.process_answers",
+                on_api_call=self.on_api_call,
                 model=self.model,
                 max_tokens=4096,
                 messages=self.conversation_history,
@@ -109,7 +164,10 @@ class ProofAnalyzer:
         try:
             self.conversation_history.append({"role": "user", "content": user_message})
 
-            response = self.client.messages.create(
+            response = create_message(
+                self.client,
+                "ProofAnalyzer.continue_conversation",
+                on_api_call=self.on_api_call,
                 model=self.model,
                 max_tokens=4096,
                 messages=self.conversation_history,
@@ -208,18 +266,32 @@ Your task:
 1. Carefully read and understand the proof
 2. Identify the main claim being proved
 3. Trace the logical flow of the argument
-4. Ask 2-4 thoughtful clarifying questions about:
+4. Write brief initial observations (not criticism yet) about:
+   - The overall structure and approach
+   - Proof techniques being employed
+   - Areas that might benefit from discussion
+
+   Format them as a bullet list under the heading "## Initial Observations".
+
+5. Then call the {ProofQuestions.TOOL_NAME} tool with the main claim (one sentence describing what is being proved) and 2-4 thoughtful clarifying questions about:
    - The proof strategy and why it was chosen
    - Any steps that seem unclear or might benefit from more detail
    - Assumptions being made (stated or unstated)
    - The intended level of rigor
 
-5. Provide brief initial observations (not criticism yet) about:
-   - The overall structure and approach
-   - Proof techniques being employed
-   - Areas that might benefit from discussion
+Remember: Be respectful, assume the writer has good mathematical intuition, and focus on understanding their approach before judging its correctness or rigor."""
+
+    def _build_questions_follow_up_prompt(self) -> str:
+        """Build the prompt asking for the questions when the model didn't call the tool.
+
+        The Markdown format is only for endpoints without tool support.
+
+        Returns:
+            Formatted prompt string.
+        """
+        return f"""Now call the {ProofQuestions.TOOL_NAME} tool with the main claim and your clarifying questions.
 
-Format your response EXACTLY as follows:
+If you can't call tools, write them instead, formatted EXACTLY as follows:
 
 ## Main Claim
 [One sentence describing what is being proved]
@@ -228,15 +300,22 @@ Format your response EXACTLY as follows:
 
 1. [Your first question about the proof]
 2. [Your second question]
-3. [Your third question, if needed]
+3. [Your third question, if needed]"""
 
-## Initial Observations
+    @staticmethod
+    def _analysis_text(result: Optional[ProofQuestions], text: str) -> str:
+        """Combine the observations text with the claim and questions of an analysis.
 
-- [Observation 1]
-- [Observation 2]
-- [Observation 3]
+        Args:
+            result: Claim and questions from the tool call, or None if there was none.
+            text: Text of the response(s).
 
-Remember: Be respectful, assume the writer has good mathematical intuition, and focus on understanding their approach before judging its correctness or rigor."""
+        Returns:
+            The analysis text; without a tool call, the text as the model wrote it.
+        """
+        if result is None:
+            return text
+        return f"{text.strip()}\n\n{result.to_markdown()}".strip()
 
     def _build_feedback_prompt(
         self,
@@ -297,8 +376,12 @@ Remember: A {experience_level} might need {'more explanation of fundamentals' if
     def _parse_initial_response(self, response: str) -> Dict[str, Any]:
         """Parse the initial analysis response.
 
+        The Main Claim and Questions sections are normally the ones built
+        from the tool call; the model only writes them itself on endpoints
+        without tool support.
+
         Args:
-            response: Raw response from Claude.
+            response: Analysis text from _analysis_text().
 
         Returns:
             Parsed dictionary with questions and observations.
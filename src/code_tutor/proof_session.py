@@ -1,16 +1,22 @@
 """Interactive proof review session management."""
 
-from typing import Dict, List, Optional, Any
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Tuple
 from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.prompt import Prompt, Confirm
 from rich.syntax import Syntax
 
+from .client import ApiCallListener, create_message, get_client
 from .config import ConfigManager
 from .proof_reader import ProofReader
 from .proof_analyzer import ProofAnalyzer
 from .logger import SessionLogger
+from .round_history import RoundHistory
+from .session import LiveMarkdown
+from .structured_output import StructuredResult, create_structured_message
 
 
 class ProofSession:
@@ -29,13 +35,13 @@ class ProofSession:
         self.analyzer: Optional[ProofAnalyzer] = None
         self.current_proof: Optional[Dict[str, Any]] = None
 
-        # Initialize logger if enabled
+        # Initialize logger if enabled; API calls are reported to this session's logger only
         self.logger: Optional[SessionLogger] = None
+        self.on_api_call: Optional[ApiCallListener] = None
         if self.config.is_logging_enabled():
-            self.logger = SessionLogger(
-                config_dir=self.config.config_dir,
-                enabled=True
-            )
+            self.logger = SessionLogger.from_config(self.config)
+            if self.config.should_log_api_calls():
+                self.on_api_call = self.logger.log_api_call
 
     def start_review(
         self,
@@ -71,7 +77,12 @@ class ProofSession:
             preferences = self.config.get("preferences", {})
 
             # Initialize analyzer
-            self.analyzer = ProofAnalyzer(api_key=api_key, model=model)
+            self.analyzer = ProofAnalyzer(
+                api_key=api_key,
+                model=model,
+                client=get_client(api_key, self.config),
+                on_api_call=self.on_api_call,
+            )
 
             # Read the proof file
             self.console.print(f"[dim]Reading proof from {file_path}...[/dim]\n")
@@ -318,8 +329,44 @@ class ProofSession:
                 break
 
 
+@dataclass
+class FlawedProof(StructuredResult):
+    """A proof with intentional errors for a proof teaching round."""
+
+    theorem: str = ""
+    proof: str = ""
+    issues: List[str] = field(default_factory=list)
+
+    TOOL_NAME: ClassVar[str] = "present_flawed_proof"
+    TOOL_DESCRIPTION: ClassVar[str] = "Present a claim and its flawed proof."
+    SCHEMA: ClassVar[Dict] = {
+        "type": "object",
+        "properties": {
+            "theorem": {
+                "type": "string",
+                "description": "The theorem or claim being \"proved\".",
+            },
+            "proof": {
+                "type": "string",
+                "description": "The proof with the intentional error(s).",
+            },
+            "issues": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "What is actually wrong, for internal tracking only.",
+            },
+        },
+        "required": ["theorem", "proof", "issues"],
+    }
+
+
 class ProofTeachingSession:
-    """Manages an interactive proof teaching session using the Socratic method."""
+    """Manages an interactive proof teaching session using the Socratic method.
+
+    Rounds are pipelined: as soon as the user submits an analysis, the next
+    flawed proof is requested in the background with that analysis in
+    context, while the evaluation streams to the screen.
+    """
 
     def __init__(self, config_manager: ConfigManager, console: Optional[Console] = None):
         """Initialize a proof teaching session.
@@ -332,19 +379,25 @@ class ProofTeachingSession:
         self.console = console or Console()
         self.client = None
         self.model: str = ""
-        self.conversation_history: List[Dict[str, str]] = []
+        self.conversation_history = RoundHistory(
+            int(self.config.get(
+                "teaching.history_rounds", RoundHistory.DEFAULT_KEEP_RECENT_ROUNDS
+            ))
+        )
         self.topic: str = ""
         self.domain: str = ""
         self.round_number: int = 0
         self.max_rounds: int = 5
+        self.streaming = self.config.is_streaming_enabled()
+        self.prefetch_enabled = bool(self.config.get("teaching.prefetch_next_round", True))
 
-        # Initialize logger if enabled
+        # Initialize logger if enabled; API calls are reported to this session's logger only
         self.logger: Optional[SessionLogger] = None
+        self.on_api_call: Optional[ApiCallListener] = None
         if self.config.is_logging_enabled():
-            self.logger = SessionLogger(
-                config_dir=self.config.config_dir,
-                enabled=True
-            )
+            self.logger = SessionLogger.from_config(self.config)
+            if self.config.should_log_api_calls():
+                self.on_api_call = self.logger.log_api_call
 
     def start_session(self, domain: Optional[str] = None) -> None:
         """Start an interactive proof teaching session.
@@ -352,13 +405,13 @@ class ProofTeachingSession:
         Args:
             domain: Optional mathematical domain to focus on.
         """
-        import anthropic
-
         try:
             # Load configuration
             config = self.config.load()
             api_key = self.config.get_api_key()
             self.model = self.config.get_model()
+            self.streaming = self.config.is_streaming_enabled()
+            self.prefetch_enabled = bool(self.config.get("teaching.prefetch_next_round", True))
 
             # Map experience level
             code_level = self.config.get("experience_level", "intermediate")
@@ -371,7 +424,7 @@ class ProofTeachingSession:
             experience_level = level_map.get(code_level, "undergrad")
 
             # Initialize client
-            self.client = anthropic.Anthropic(api_key=api_key)
+            self.client = get_client(api_key, self.config)
 
             # Welcome message
             self._display_welcome()
@@ -476,74 +529,194 @@ class ProofTeachingSession:
             experience_level: User's experience level.
         """
         self.round_number = 0
+        next_proof: Optional[Future] = None
+        executor = ThreadPoolExecutor(max_workers=1)
 
-        while self.round_number < self.max_rounds:
-            self.round_number += 1
+        try:
+            while self.round_number < self.max_rounds:
+                self.round_number += 1
+
+                self.console.print(f"\n[cyan]{'='*60}[/cyan]")
+                self.console.print(f"[bold cyan]Round {self.round_number}[/bold cyan]")
+                self.console.print(f"[cyan]{'='*60}[/cyan]\n")
+
+                # Use the proof generated during the last evaluation, if any
+                proof_data = None
+                if next_proof is not None:
+                    proof_data = self._accept_next_proof(next_proof)
+                    next_proof = None
+                if proof_data is None:
+                    proof_data = self._generate_flawed_proof(experience_level)
+
+                if not proof_data:
+                    self.console.print("[yellow]Failed to generate proof. Ending session.[/yellow]")
+                    break
 
-            self.console.print(f"\n[cyan]{'='*60}[/cyan]")
-            self.console.print(f"[bold cyan]Round {self.round_number}[/bold cyan]")
-            self.console.print(f"[cyan]{'='*60}[/cyan]\n")
+                # Display the proof
+                self._display_proof(proof_data)
 
-            # Generate flawed proof
-            proof_data = self._generate_flawed_proof(experience_level)
+                # Get user's analysis
+                analysis = self._get_user_analysis()
 
-            if not proof_data:
-                self.console.print("[yellow]Failed to generate proof. Ending session.[/yellow]")
-                break
+                if not analysis.strip():
+                    self.console.print("[yellow]Skipping this round...[/yellow]")
+                    self.conversation_history.end_round(self.round_number, proof_data["issues"])
+                    continue
 
-            # Display the proof
-            self._display_proof(proof_data)
+                # Start on the next proof while the evaluation comes in
+                if self.prefetch_enabled and self.round_number < self.max_rounds:
+                    next_proof = executor.submit(
+                        self._request_flawed_proof,
+                        experience_level,
+                        self.round_number + 1,
+                        self.conversation_history.messages(),
+                        analysis,
+                    )
+
+                # Evaluate the analysis
+                if self.streaming:
+                    self.console.print("\n[bold yellow]Feedback:[/bold yellow]\n")
+                    with LiveMarkdown(
+                        self.console,
+                        wrap=lambda md: Panel(md, border_style="green", title="Evaluation"),
+                    ) as live:
+                        evaluation = self._evaluate_analysis(
+                            proof_data["proof"],
+                            proof_data["issues"],
+                            analysis,
+                            experience_level,
+                            on_text=live,
+                        )
+                else:
+                    evaluation = self._evaluate_analysis(
+                        proof_data["proof"],
+                        proof_data["issues"],
+                        analysis,
+                        experience_level,
+                    )
+
+                    # Display evaluation
+                    self._display_evaluation(evaluation)
+
+                self.conversation_history.end_round(
+                    self.round_number,
+                    proof_data["issues"],
+                    analysis,
+                    evaluation.get("understanding_achieved", False),
+                )
 
-            # Get user's analysis
-            analysis = self._get_user_analysis()
+                # Check if we should continue
+                if evaluation.get("understanding_achieved", False):
+                    self.console.print(
+                        "\n[green]Excellent analysis! You identified the key issues.[/green]"
+                    )
 
-            if not analysis.strip():
-                self.console.print("[yellow]Skipping this round...[/yellow]")
-                continue
+                    if not Confirm.ask("\n[cyan]Try another flawed proof?[/cyan]", default=True):
+                        break
+                else:
+                    self.console.print(
+                        "\n[yellow]There's more to find. Let's try another example...[/yellow]"
+                    )
+        finally:
+            if next_proof is not None:
+                next_proof.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _generate_flawed_proof(self, experience_level: str) -> Optional[Dict]:
+        """Generate a proof with intentional flaws.
 
-            # Evaluate the analysis
-            evaluation = self._evaluate_analysis(
-                proof_data["proof"],
-                proof_data["issues"],
-                analysis,
-                experience_level,
+        Args:
+            experience_level: User's experience level.
+
+        Returns:
+            Dictionary with proof and issues, or None if failed.
+        """
+        try:
+            prompt, content, proof_data = self._request_flawed_proof(
+                experience_level, self.round_number, self.conversation_history.messages()
             )
+        except Exception as e:
+            self.console.print(f"[red]Error generating proof:[/red] {e}")
+            return None
 
-            # Display evaluation
-            self._display_evaluation(evaluation)
+        return self._accept_flawed_proof(prompt, content, proof_data)
 
-            # Check if we should continue
-            if evaluation.get("understanding_achieved", False):
-                self.console.print(
-                    "\n[green]Excellent analysis! You identified the key issues.[/green]"
-                )
+    def _accept_next_proof(self, future: Future) -> Optional[Dict]:
+        """Wait for a proof generated in the background and accept it.
 
-                if not Confirm.ask("\n[cyan]Try another flawed proof?[/cyan]", default=True):
-                    break
-            else:
-                self.console.print(
-                    "\n[yellow]There's more to find. Let's try another example...[/yellow]"
-                )
+        Args:
+            future: Future returned by submitting _request_flawed_proof().
 
-    def _generate_flawed_proof(self, experience_level: str) -> Optional[Dict]:
-        """Generate a proof with intentional flaws.
+        Returns:
+            Parsed proof, or None if the background request failed (the
+            caller then generates the proof directly).
+        """
+        try:
+            prompt, content, proof_data = future.result()
+        except Exception:
+            return None
+
+        return self._accept_flawed_proof(prompt, content, proof_data)
+
+    def _accept_flawed_proof(self, prompt: str, content: str, proof_data: Dict) -> Dict:
+        """Record a proof generation exchange in the conversation.
+
+        Args:
+            prompt: Prompt that generated the proof.
+            content: Reply to store in the conversation history.
+            proof_data: The parsed proof.
+
+        Returns:
+            The proof_data dictionary.
+        """
+        self.conversation_history.start_round()
+        self.conversation_history.append({"role": "user", "content": prompt})
+        self.conversation_history.append({"role": "assistant", "content": content})
+
+        return proof_data
+
+    def _request_flawed_proof(
+        self,
+        experience_level: str,
+        round_number: int,
+        history: List[Dict[str, str]],
+        previous_analysis: Optional[str] = None,
+    ) -> Tuple[str, str, Dict]:
+        """Request a flawed proof from the API without touching session state.
+
+        Safe to call from a background thread.
 
         Args:
             experience_level: User's experience level.
+            round_number: Round the proof is for.
+            history: Conversation so far (not modified).
+            previous_analysis: The user's analysis of the previous proof, when
+                its evaluation isn't in the history yet.
 
         Returns:
-            Dictionary with proof and issues, or None if failed.
+            Tuple of (prompt, reply for the conversation history, dictionary
+            with theorem, proof, and issues).
         """
-        if self.round_number == 1:
+        if round_number == 1:
             difficulty = "obvious but instructive"
-        elif self.round_number <= 3:
+        elif round_number <= 3:
             difficulty = "subtle"
         else:
             difficulty = "very subtle and requiring careful attention"
 
+        if previous_analysis:
+            context = f"""The student's analysis of the previous proof was:
+"{previous_analysis}"
+
+If their analysis missed or misjudged the error, target the same kind of mistake in a new setting. If they found it, move on to a different pitfall.
+
+"""
+        else:
+            context = ""
+
         prompt = f"""You are creating a teaching exercise about mathematical proofs.
 
-Create a SHORT proof (5-15 lines) related to {self.topic} in {self.domain} that contains a {difficulty} error.
+{context}Create a SHORT proof (5-15 lines) related to {self.topic} in {self.domain} that contains a {difficulty} error.
 
 The error should be:
 1. Instructive - teaches an important concept about proof writing
@@ -552,7 +725,12 @@ The error should be:
 
 For a {experience_level} level mathematician, adjust the sophistication accordingly.
 
-Format your response as:
+Present it by calling the {FlawedProof.TOOL_NAME} tool with:
+- theorem: the theorem or claim being "proved"
+- proof: the proof with the intentional error(s)
+- issues: what's actually wrong, one item per issue - for internal tracking only"""
+
+        fallback_prompt = """If you can't call tools, format your response as:
 
 ## Theorem
 [State the theorem or claim being "proved"]
@@ -565,26 +743,24 @@ Format your response as:
 - Issue 1: [description]
 - Issue 2: [if applicable]"""
 
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=2048,
-                messages=self.conversation_history + [{"role": "user", "content": prompt}],
-            )
-
-            content = response.content[0].text
-
-            self.conversation_history.append({"role": "user", "content": prompt})
-            self.conversation_history.append({"role": "assistant", "content": content})
-
-            return self._parse_proof_response(content)
+        result, text = create_structured_message(
+            self.client,
+            "ProofTeachingSession.generate_flawed_proof",
+            FlawedProof,
+            on_api_call=self.on_api_call,
+            fallback_prompt=fallback_prompt,
+            model=self.model,
+            max_tokens=2048,
+            messages=history + [{"role": "user", "content": prompt}],
+        )
 
-        except Exception as e:
-            self.console.print(f"[red]Error generating proof:[/red] {e}")
-            return None
+        # Fall back to the Markdown format if the response wasn't a tool call
+        if result is None:
+            return prompt, text, self._parse_proof_response(text)
+        return prompt, result.to_message(), result.to_dict()
 
     def _parse_proof_response(self, response: str) -> Dict:
-        """Parse the proof generation response.
+        """Parse a proof generation response given as Markdown instead of a tool call.
 
         Args:
             response: Raw response from Claude.
@@ -679,6 +855,7 @@ Format your response as:
         expected_issues: List[str],
         user_analysis: str,
         experience_level: str,
+        on_text: Optional[Callable[[str], None]] = None,
     ) -> Dict:
         """Evaluate the user's analysis.
 
@@ -687,6 +864,7 @@ Format your response as:
             expected_issues: List of issues in the proof.
             user_analysis: User's analysis.
             experience_level: User's experience level.
+            on_text: Optional callback receiving text deltas as they stream in.
 
         Returns:
             Evaluation dictionary.
@@ -716,10 +894,14 @@ Respond with:
 [YES if they identified the key issue(s), NO if they need more guidance]"""
 
         try:
-            response = self.client.messages.create(
+            response = create_message(
+                self.client,
+                "ProofTeachingSession.evaluate_analysis",
+                on_text=on_text,
+                on_api_call=self.on_api_call,
                 model=self.model,
                 max_tokens=1024,
-                messages=self.conversation_history + [{"role": "user", "content": prompt}],
+                messages=self.conversation_history.messages() + [{"role": "user", "content": prompt}],
             )
 
             content = response.content[0].text
@@ -0,0 +1,157 @@
+"""On-disk cache of Claude API responses for Code Tutor."""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class ResponseCache:
+    """Content-addressed cache of API responses stored under the config directory.
+
+    Entries are keyed by a hash of everything that determines the response
+    (model, prompt, max_tokens), so identical requests - e.g. a whole class
+    reviewing the same starter file - are answered from disk. Entries expire
+    after ``max_age_days`` and the least recently used entries are evicted
+    once the cache grows beyond ``max_size_mb``.
+    """
+
+    CACHE_DIR = "cache"
+    DEFAULT_MAX_SIZE_MB = 50
+    DEFAULT_MAX_AGE_DAYS = 7
+
+    def __init__(
+        self,
+        config_dir: Optional[Path] = None,
+        max_size_mb: float = DEFAULT_MAX_SIZE_MB,
+        max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+    ):
+        """Initialize the response cache.
+
+        Args:
+            config_dir: Optional custom configuration directory path.
+            max_size_mb: Maximum total size of cached entries in megabytes.
+            max_age_days: Maximum age of an entry before it is discarded.
+        """
+        if config_dir is None:
+            config_dir = Path.home() / ".config" / "code-tutor"
+
+        self.cache_dir = config_dir / self.CACHE_DIR
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.max_age_seconds = max_age_days * 24 * 60 * 60
+
+    @staticmethod
+    def make_key(model: str, prompt: str, max_tokens: int) -> str:
+        """Build the cache key for a request.
+
+        Args:
+            model: Claude model name.
+            prompt: Full prompt text sent to the model.
+            max_tokens: Maximum tokens requested.
+
+        Returns:
+            Hex digest identifying the request.
+        """
+        payload = json.dumps([model, prompt, max_tokens], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a cached response.
+
+        Args:
+            key: Cache key from make_key().
+
+        Returns:
+            The cached response text, or None on a miss.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (IOError, json.JSONDecodeError):
+            return None
+
+        if time.time() - entry.get("created_at", 0) > self.max_age_seconds:
+            self._remove(path)
+            return None
+
+        # Bump the modification time so eviction treats this entry as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return entry.get("response")
+
+    def put(self, key: str, response: str) -> None:
+        """Store a response and evict old entries if needed.
+
+        Args:
+            key: Cache key from make_key().
+            response: Response text to cache.
+        """
+        entry = {"created_at": time.time(), "response": response}
+        tmp_path = None
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            tmp_path = Path(tmp_name)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._entry_path(key))
+        except (IOError, OSError):
+            # Caching is best-effort; a failed write only costs a future API call
+            if tmp_path is not None:
+                self._remove(tmp_path)
+            return
+
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove expired entries, then least recently used ones until under the size limit."""
+        entries = []
+        now = time.time()
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in sorted(entries):
+            # Entries are oldest-first, so once one is fresh and we fit, the rest do too
+            if total <= self.max_size_bytes and now - mtime <= self.max_age_seconds:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self) -> int:
+        """Remove all cached entries.
+
+        Returns:
+            Number of entries removed.
+        """
+        if not self.cache_dir.exists():
+            return 0
+
+        count = 0
+        for path in self.cache_dir.glob("*.json"):
+            if self._remove(path):
+                count += 1
+        return count
+
+    @staticmethod
+    def _remove(path: Path) -> bool:
+        try:
+            path.unlink()
+            return True
+        except OSError:
+            return False
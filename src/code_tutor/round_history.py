@@ -0,0 +1,145 @@
+"""Windowed round history for the teaching modes."""
+
+from typing import Dict, Iterator, List, Optional
+
+
+class RoundHistory:
+    """Conversation of a teaching session, kept as a window of rounds.
+
+    Each round's messages (the generated example and the evaluation of the
+    user's response) are kept verbatim only while the round is among the
+    ``keep_recent_rounds`` most recently completed ones, plus the round in
+    progress. Older rounds are replaced by a one-line summary of the issues
+    they covered and how the user did, so late rounds send about as much
+    context as early ones.
+    """
+
+    DEFAULT_KEEP_RECENT_ROUNDS = 1
+
+    # How much of the issues and the user's response survive in a round summary
+    SUMMARY_ISSUES_CHARS = 300
+    SUMMARY_RESPONSE_CHARS = 200
+
+    SUMMARY_HEADER = (
+        "Summary of earlier rounds (full transcripts omitted to save context; "
+        "don't repeat these issues unless reinforcing one the user missed):"
+    )
+
+    def __init__(self, keep_recent_rounds: int = DEFAULT_KEEP_RECENT_ROUNDS):
+        """Initialize an empty history.
+
+        Args:
+            keep_recent_rounds: Number of completed rounds kept verbatim
+                (at least 1).
+        """
+        self.keep_recent_rounds = max(1, keep_recent_rounds)
+        self._rounds: List[Dict] = []
+        self._summary_lines: List[str] = []
+
+    def start_round(self) -> None:
+        """Begin a new round; following messages belong to it."""
+        self._rounds.append({"messages": [], "complete": False})
+
+    def append(self, message: Dict[str, str]) -> None:
+        """Add a message to the current round.
+
+        Args:
+            message: Message dict with 'role' and 'content'.
+        """
+        if not self._rounds or self._rounds[-1]["complete"]:
+            self.start_round()
+        self._rounds[-1]["messages"].append(message)
+
+    def end_round(
+        self,
+        round_number: int,
+        issues: List[str],
+        response: Optional[str] = None,
+        understanding_achieved: bool = False,
+    ) -> None:
+        """Complete the current round and summarize rounds leaving the window.
+
+        Args:
+            round_number: Number of the round being completed.
+            issues: Issues the round's example contained.
+            response: The user's hints or analysis, or None if skipped.
+            understanding_achieved: Whether the evaluation judged the
+                response as reaching understanding.
+        """
+        if not self._rounds or self._rounds[-1]["complete"]:
+            return
+
+        current = self._rounds[-1]
+        current["complete"] = True
+        current["summary"] = self._summarize_round(
+            round_number, issues, response, understanding_achieved
+        )
+
+        while len(self._rounds) > self.keep_recent_rounds:
+            dropped = self._rounds.pop(0)
+            self._summary_lines.append(dropped["summary"])
+
+    def messages(self) -> List[Dict[str, str]]:
+        """Get the messages to send to the API.
+
+        Returns:
+            Messages of the rounds in the window, with the summary of earlier
+            rounds prepended to the first one.
+        """
+        messages = [message for round_ in self._rounds for message in round_["messages"]]
+        if self._summary_lines and messages:
+            first = messages[0]
+            messages[0] = {
+                "role": first["role"],
+                "content": f"{self._summary_text()}\n\n{first['content']}",
+            }
+        return messages
+
+    def clear(self) -> None:
+        """Remove all rounds and any summary."""
+        self._rounds = []
+        self._summary_lines = []
+
+    def __len__(self) -> int:
+        return sum(len(round_["messages"]) for round_ in self._rounds)
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return iter(self.messages())
+
+    def _summary_text(self) -> str:
+        return "\n".join([self.SUMMARY_HEADER] + self._summary_lines)
+
+    def _summarize_round(
+        self,
+        round_number: int,
+        issues: List[str],
+        response: Optional[str],
+        understanding_achieved: bool,
+    ) -> str:
+        """Condense one round into a summary line.
+
+        Args:
+            round_number: Number of the round.
+            issues: Issues the round's example contained.
+            response: The user's response, or None if skipped.
+            understanding_achieved: Whether the user reached understanding.
+
+        Returns:
+            Summary line for the round.
+        """
+        covered = "not recorded"
+        if issues:
+            covered = self._clip("; ".join(issues), self.SUMMARY_ISSUES_CHARS)
+        if response is None:
+            outcome = "skipped by the user"
+        else:
+            result = "understood" if understanding_achieved else "needed more guidance"
+            outcome = f"{result}; user said: {self._clip(response, self.SUMMARY_RESPONSE_CHARS)}"
+        return f"- Round {round_number}: issues: {covered}\n  Outcome: {outcome}"
+
+    @staticmethod
+    def _clip(text: str, limit: int) -> str:
+        text = " ".join(text.split())
+        if len(text) <= limit:
+            return text
+        return text[:limit].rsplit(" ", 1)[0] + "..."
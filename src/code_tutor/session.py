@@ -1,45 +1,109 @@
 """Interactive code review session management."""
 
-from typing import Dict, List, Optional
-from rich.console import Console
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from rich.console import Console, RenderableType
+from rich.live import Live
 from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.prompt import Prompt, Confirm
 
 from .analyzer import CodeAnalyzer
+from .client import ApiCallListener, get_client
 from .config import ConfigManager
+from .conversation_history import ConversationHistory
 from .file_reader import FileReader
 from .logger import SessionLogger
+from .response_cache import ResponseCache
+
+
+class LiveMarkdown:
+    """Progressively renders streamed Markdown text using Rich Live.
+
+    Use as a context manager; the instance itself is the text callback to pass
+    to the analyzer, so each delta re-renders the accumulated Markdown.
+    """
+
+    def __init__(
+        self,
+        console: Console,
+        wrap: Optional[Callable[[Markdown], RenderableType]] = None,
+    ):
+        """Initialize the live renderer.
+
+        Args:
+            console: Rich console to render to.
+            wrap: Optional function wrapping the Markdown (e.g. in a Panel).
+        """
+        self.console = console
+        self.wrap = wrap
+        self.text = ""
+        self._live: Optional[Live] = None
+
+    def _render(self) -> RenderableType:
+        md = Markdown(self.text)
+        return self.wrap(md) if self.wrap else md
+
+    def __enter__(self) -> "LiveMarkdown":
+        self._live = Live(
+            self._render(),
+            console=self.console,
+            refresh_per_second=8,
+            vertical_overflow="visible",
+        )
+        self._live.__enter__()
+        return self
+
+    def __call__(self, delta: str) -> None:
+        self.text += delta
+        self._live.update(self._render())
+
+    def __exit__(self, exc_type, exc_value, tb) -> None:
+        self._live.update(self._render(), refresh=True)
+        self._live.__exit__(exc_type, exc_value, tb)
 
 
 class ReviewSession:
     """Manages an interactive code review session."""
 
-    def __init__(self, config_manager: ConfigManager, console: Optional[Console] = None):
+    # Files with more lines than this are analyzed in chunks by default
+    CHUNK_THRESHOLD_LINES = 800
+
+    def __init__(
+        self,
+        config_manager: ConfigManager,
+        console: Optional[Console] = None,
+        use_cache: bool = True,
+    ):
         """Initialize a review session.
 
         Args:
             config_manager: Configuration manager instance.
             console: Optional Rich console for formatted output.
+            use_cache: Whether to serve repeat analyses from the response cache.
         """
         self.config = config_manager
         self.console = console or Console()
+        self.use_cache = use_cache
         self.file_reader = FileReader()
         self.analyzer: Optional[CodeAnalyzer] = None
+        self.streaming = self.config.is_streaming_enabled()
 
-        # Initialize logger if enabled
+        # Initialize logger if enabled; API calls are reported to this session's logger only
         self.logger: Optional[SessionLogger] = None
+        self.on_api_call: Optional[ApiCallListener] = None
         if self.config.is_logging_enabled():
-            self.logger = SessionLogger(
-                config_dir=self.config.config_dir,
-                enabled=True
-            )
+            self.logger = SessionLogger.from_config(self.config)
+            if self.config.should_log_api_calls():
+                self.on_api_call = self.logger.log_api_call
 
-    def start_review(self, file_path: str) -> None:
+    def start_review(self, file_path: str, prepared: Optional[Future] = None) -> None:
         """Start an interactive code review session.
 
         Args:
             file_path: Path to the file to review.
+            prepared: Optional future from _prepare_review() whose initial
+                analysis was started in the background.
         """
         try:
             # Load configuration
@@ -48,6 +112,7 @@ class ReviewSession:
             model = self.config.get_model()
             experience_level = self.config.get("experience_level", "intermediate")
             preferences = self.config.get("preferences", {})
+            self.streaming = self.config.is_streaming_enabled()
 
             # Initialize logger and start session
             if self.logger:
@@ -58,28 +123,32 @@ class ReviewSession:
                     "model": model,
                 })
 
-            # Initialize analyzer
-            self.analyzer = CodeAnalyzer(api_key, model)
-
-            # Read the file
             self.console.print(f"\n[cyan]Reading file:[/cyan] {file_path}")
-            file_data = self.file_reader.read_file(file_path)
 
-            metadata = file_data["metadata"]
-            self.console.print(
-                f"[dim]Language: {metadata['language']} | "
-                f"Lines: {metadata['line_count']} | "
-                f"Size: {metadata['size_bytes']} bytes[/dim]\n"
-            )
+            if prepared is not None:
+                # Analysis was started in the background by review_directory
+                if not prepared.done():
+                    self.console.print("[cyan]Waiting for analysis to finish...[/cyan]")
+                self.analyzer, file_data, analysis = prepared.result()
+                self._display_file_info(file_data["metadata"])
+            else:
+                # Initialize analyzer
+                self.analyzer = self._create_analyzer(api_key, model, self._get_cache())
 
-            # Perform initial analysis
-            self.console.print("[cyan]Analyzing code...[/cyan]")
-            analysis = self.analyzer.analyze_code(
-                file_data["content"],
-                metadata,
-                experience_level,
-                preferences,
-            )
+                # Read the file
+                file_data = self.file_reader.read_file(file_path)
+                self._display_file_info(file_data["metadata"])
+
+                # Perform initial analysis
+                if self._is_large_file(file_data):
+                    self.console.print(
+                        "[cyan]Analyzing code in parts (large file)...[/cyan]"
+                    )
+                else:
+                    self.console.print("[cyan]Analyzing code...[/cyan]")
+                analysis = self._analyze_file(
+                    self.analyzer, file_data, experience_level, preferences
+                )
 
             # Log the code analysis
             if self.logger and self.config.should_log_interactions():
@@ -107,11 +176,19 @@ class ReviewSession:
 
                 # Get feedback based on answers
                 self.console.print("\n[cyan]Generating personalized feedback...[/cyan]\n")
-                feedback_data = self.analyzer.process_answers(
-                    answers, experience_level, preferences
-                )
-
-                self._display_feedback(feedback_data["feedback"])
+                if self.streaming:
+                    self._display_feedback_header()
+                    with LiveMarkdown(self.console) as live:
+                        feedback_data = self.analyzer.process_answers(
+                            answers, experience_level, preferences, on_text=live
+                        )
+                    self.console.print()
+                    self._log_feedback(feedback_data["feedback"])
+                else:
+                    feedback_data = self.analyzer.process_answers(
+                        answers, experience_level, preferences
+                    )
+                    self._display_feedback(feedback_data["feedback"])
 
                 # Offer follow-up conversation
                 self._follow_up_conversation()
@@ -120,6 +197,8 @@ class ReviewSession:
                     "[yellow]No questions generated. This might indicate an issue.[/yellow]"
                 )
 
+            self._display_token_usage()
+
             # End session logging
             if self.logger:
                 self.logger.end_session()
@@ -138,6 +217,150 @@ class ReviewSession:
                 self.logger.log_error("UnexpectedException", str(e), traceback.format_exc())
             self.console.print(f"[red]Unexpected error:[/red] {e}")
 
+    def _prepare_review(
+        self,
+        file_path: str,
+        api_key: str,
+        model: str,
+        experience_level: str,
+        preferences: Dict,
+        cache: Optional[ResponseCache] = None,
+    ) -> Tuple[CodeAnalyzer, Dict, Dict]:
+        """Read a file and run its initial analysis without any console output.
+
+        Safe to run on a worker thread; each call uses its own analyzer.
+
+        Args:
+            file_path: Path to the file to analyze.
+            api_key: Anthropic API key.
+            model: Claude model to use.
+            experience_level: User's programming experience level.
+            preferences: User preferences.
+            cache: Optional response cache.
+
+        Returns:
+            Tuple of (analyzer, file data, initial analysis).
+        """
+        analyzer = self._create_analyzer(api_key, model, cache)
+        file_data = self.file_reader.read_file(file_path)
+        analysis = self._analyze_file(analyzer, file_data, experience_level, preferences)
+        return analyzer, file_data, analysis
+
+    def _is_large_file(self, file_data: Dict) -> bool:
+        """Check whether a file is large enough to be analyzed in chunks.
+
+        Args:
+            file_data: File data from FileReader.read_file().
+
+        Returns:
+            True if the file exceeds the configured chunking threshold.
+        """
+        threshold = int(self.config.get("chunking.threshold_lines", self.CHUNK_THRESHOLD_LINES))
+        return file_data["metadata"]["line_count"] > threshold
+
+    def _analyze_file(
+        self,
+        analyzer: CodeAnalyzer,
+        file_data: Dict,
+        experience_level: str,
+        preferences: Dict,
+    ) -> Dict:
+        """Run the initial analysis, splitting large files into chunks.
+
+        Args:
+            analyzer: Analyzer for this review.
+            file_data: File data from FileReader.read_file().
+            experience_level: User's programming experience level.
+            preferences: User preferences.
+
+        Returns:
+            Initial analysis with questions and observations.
+        """
+        if not self._is_large_file(file_data):
+            return analyzer.analyze_code(
+                file_data["content"],
+                file_data["metadata"],
+                experience_level,
+                preferences,
+            )
+
+        chunks = self.file_reader.split_into_chunks(
+            file_data["content"],
+            file_data["metadata"]["language"],
+            max_lines=int(
+                self.config.get("chunking.chunk_lines", FileReader.DEFAULT_CHUNK_LINES)
+            ),
+        )
+        return analyzer.analyze_code_chunked(
+            file_data["content"],
+            file_data["metadata"],
+            experience_level,
+            preferences,
+            chunks,
+            max_workers=int(
+                self.config.get("chunking.max_workers", CodeAnalyzer.DEFAULT_CHUNK_WORKERS)
+            ),
+        )
+
+    def _create_analyzer(
+        self,
+        api_key: str,
+        model: str,
+        cache: Optional[ResponseCache] = None,
+    ) -> CodeAnalyzer:
+        """Create a code analyzer using the shared client and history settings.
+
+        Args:
+            api_key: Anthropic API key.
+            model: Claude model to use.
+            cache: Optional response cache.
+
+        Returns:
+            Configured CodeAnalyzer.
+        """
+        return CodeAnalyzer(
+            api_key,
+            model,
+            cache=cache,
+            client=get_client(api_key, self.config),
+            on_api_call=self.on_api_call,
+            history_max_tokens=int(
+                self.config.get("history.max_tokens", ConversationHistory.DEFAULT_MAX_TOKENS)
+            ),
+            keep_recent_turns=int(
+                self.config.get(
+                    "history.keep_recent_turns", ConversationHistory.DEFAULT_KEEP_RECENT_TURNS
+                )
+            ),
+        )
+
+    def _display_file_info(self, metadata: Dict) -> None:
+        """Display basic information about the file being reviewed.
+
+        Args:
+            metadata: File metadata from FileReader.
+        """
+        self.console.print(
+            f"[dim]Language: {metadata['language']} | "
+            f"Lines: {metadata['line_count']} | "
+            f"Size: {metadata['size_bytes']} bytes[/dim]\n"
+        )
+
+    def _get_cache(self) -> Optional[ResponseCache]:
+        """Create the response cache if caching is enabled.
+
+        Returns:
+            ResponseCache instance, or None if caching is disabled.
+        """
+        if not self.use_cache or not self.config.is_cache_enabled():
+            return None
+
+        return ResponseCache(
+            config_dir=self.config.config_dir,
+            max_size_mb=self.config.get("cache.max_size_mb", ResponseCache.DEFAULT_MAX_SIZE_MB),
+            max_age_days=self.config.get("cache.max_age_days", ResponseCache.DEFAULT_MAX_AGE_DAYS),
+        )
+
     def _display_observations(self, observations: List[str]) -> None:
         """Display initial observations.
 
@@ -199,20 +422,43 @@ class ReviewSession:
         Args:
             feedback: Feedback text (markdown formatted).
         """
-        # Log the feedback
-        if self.logger and self.config.should_log_interactions():
-            self.logger.log_ai_response("feedback", feedback)
+        self._log_feedback(feedback)
+        self._display_feedback_header()
+
+        # Render as markdown
+        md = Markdown(feedback)
+        self.console.print(md)
+        self.console.print()
 
+    def _display_feedback_header(self) -> None:
+        """Display the heading shown above the feedback."""
         self.console.print(Panel.fit(
             "[bold green]Feedback & Suggestions[/bold green]",
             border_style="green",
         ))
         self.console.print()
 
-        # Render as markdown
-        md = Markdown(feedback)
-        self.console.print(md)
-        self.console.print()
+    def _log_feedback(self, feedback: str) -> None:
+        """Log the feedback if interaction logging is enabled.
+
+        Args:
+            feedback: Feedback text.
+        """
+        if self.logger and self.config.should_log_interactions():
+            self.logger.log_ai_response("feedback", feedback)
+
+    def _display_token_usage(self) -> None:
+        """Display token usage for the review, including prompt cache hits."""
+        usage = self.analyzer.usage
+        if not usage["input_tokens"] and not usage["cache_read_input_tokens"]:
+            return
+
+        self.console.print(
+            f"[dim]Tokens: {usage['cache_read_input_tokens']} cache hit, "
+            f"{usage['cache_creation_input_tokens']} cache write, "
+            f"{usage['input_tokens']} uncached input, "
+            f"{usage['output_tokens']} output[/dim]"
+        )
 
     def _follow_up_conversation(self) -> None:
         """Allow user to ask follow-up questions."""
@@ -240,26 +486,42 @@ class ReviewSession:
                     self.logger.log_user_input("question", question, {"type": "follow_up"})
 
                 self.console.print("\n[cyan]Thinking...[/cyan]\n")
-                response = self.analyzer.continue_conversation(question)
+                if self.streaming:
+                    with LiveMarkdown(
+                        self.console,
+                        wrap=lambda md: Panel(md, border_style="blue"),
+                    ) as live:
+                        response = self.analyzer.continue_conversation(question, on_text=live)
+                else:
+                    response = self.analyzer.continue_conversation(question)
+                    md = Markdown(response)
+                    self.console.print(Panel(md, border_style="blue"))
 
                 # Log the AI response
                 if self.logger and self.config.should_log_interactions():
                     self.logger.log_ai_response("answer", response, {"type": "follow_up"})
 
-                md = Markdown(response)
-                self.console.print(Panel(md, border_style="blue"))
                 self.console.print()
 
         except KeyboardInterrupt:
             self.console.print("\n\n[yellow]Session interrupted. Goodbye![/yellow]")
 
-    def review_directory(self, directory: str, recursive: bool = True) -> None:
+    def review_directory(
+        self,
+        directory: str,
+        recursive: bool = True,
+        concurrency: int = 1,
+    ) -> None:
         """Review multiple files in a directory.
 
         Args:
             directory: Directory path to review.
             recursive: Whether to search recursively.
+            concurrency: Number of initial analyses to run in the background
+                while earlier files are being reviewed. 1 reviews strictly
+                one file at a time.
         """
+        executor: Optional[ThreadPoolExecutor] = None
         try:
             files = self.file_reader.find_files(directory, recursive)
 
@@ -291,13 +553,35 @@ class ReviewSession:
                         self.console.print("[red]Invalid selection[/red]")
                         return
 
+            # Start the initial analyses for all files in the background
+            prepared: List[Optional[Future]] = [None] * len(files)
+            if concurrency > 1 and len(files) > 1:
+                self.config.load()
+                api_key = self.config.get_api_key()
+                model = self.config.get_model()
+                experience_level = self.config.get("experience_level", "intermediate")
+                preferences = self.config.get("preferences", {})
+                cache = self._get_cache()
+
+                executor = ThreadPoolExecutor(max_workers=concurrency)
+                prepared = [
+                    executor.submit(
+                        self._prepare_review,
+                        file, api_key, model, experience_level, preferences, cache,
+                    )
+                    for file in files
+                ]
+                self.console.print(
+                    f"[dim]Analyzing up to {concurrency} files in the background...[/dim]"
+                )
+
             # Review each file
             for i, file in enumerate(files, 1):
                 self.console.print(f"\n[bold cyan]{'='*60}[/bold cyan]")
                 self.console.print(f"[bold cyan]Reviewing file {i}/{len(files)}[/bold cyan]")
                 self.console.print(f"[bold cyan]{'='*60}[/bold cyan]")
 
-                self.start_review(file)
+                self.start_review(file, prepared=prepared[i - 1])
 
                 if i < len(files):
                     self.console.print()
@@ -310,3 +594,7 @@ class ReviewSession:
 
         except Exception as e:
             self.console.print(f"[red]Error:[/red] {e}")
+        finally:
+            if executor:
+                # Don't pay for analyses of files the user chose not to reach
+                executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,284 @@
+"""Schema-constrained output for generation calls, using tool use."""
+
+import json
+from dataclasses import MISSING, asdict, dataclass, fields
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Tuple, Type, TypeVar
+
+import anthropic
+
+from .client import ApiCallListener, acreate_message, create_message
+
+
+T = TypeVar("T", bound="StructuredResult")
+
+
+@dataclass
+class StructuredResult:
+    """Base class for typed results returned through a forced tool call.
+
+    Subclasses are dataclasses whose fields all have defaults, and which
+    define the tool name, description and JSON schema of those fields. The
+    model is made to answer by calling the tool, so the result arrives as
+    JSON matching the schema instead of Markdown that has to be scanned.
+    """
+
+    TOOL_NAME: ClassVar[str] = ""
+    TOOL_DESCRIPTION: ClassVar[str] = ""
+    SCHEMA: ClassVar[Dict[str, Any]] = {}
+
+    @classmethod
+    def tool(cls) -> Dict[str, Any]:
+        """Get the tool definition to send with the request.
+
+        Returns:
+            Tool dictionary for the messages API.
+        """
+        return {
+            "name": cls.TOOL_NAME,
+            "description": cls.TOOL_DESCRIPTION,
+            "input_schema": cls.SCHEMA,
+        }
+
+    @classmethod
+    def from_tool_input(cls: Type[T], data: Dict[str, Any]) -> T:
+        """Build a result from the input of a tool call.
+
+        Missing fields take their defaults and values are coerced to the
+        field's type, so a slightly off-schema call still yields a usable
+        result.
+
+        Args:
+            data: Input of the tool_use block.
+
+        Returns:
+            The typed result.
+        """
+        values = {}
+        for field in fields(cls):
+            default = field.default if field.default is not MISSING else field.default_factory()
+            value = data.get(field.name)
+
+            if value is None:
+                value = default
+            elif isinstance(default, bool):
+                value = value is True or str(value).strip().lower() in ("true", "yes")
+            elif isinstance(default, list):
+                items = value if isinstance(value, list) else [value]
+                value = [str(item).strip() for item in items if str(item).strip()]
+            elif not isinstance(value, str):
+                value = str(value)
+
+            values[field.name] = value
+        return cls(**values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the result as a plain dictionary.
+
+        Returns:
+            Dictionary of the result's fields.
+        """
+        return asdict(self)
+
+    def to_message(self) -> str:
+        """Get the result as the text of an assistant message for the history.
+
+        Returns:
+            The fields as JSON.
+        """
+        return json.dumps(self.to_dict(), indent=2)
+
+
+def create_structured_message(
+    client: anthropic.Anthropic,
+    call_site: str,
+    result_type: Type[T],
+    on_api_call: Optional[ApiCallListener] = None,
+    fallback_prompt: Optional[str] = None,
+    **params: Any,
+) -> Tuple[Optional[T], str]:
+    """Send a messages request whose answer must be a call to the result's tool.
+
+    Args:
+        client: Anthropic client to use.
+        call_site: Name of the calling component.
+        result_type: StructuredResult subclass describing the output.
+        on_api_call: Optional listener for the call's metrics.
+        fallback_prompt: Optional instructions for answering in text instead
+            (e.g. a Markdown format). If the response holds no call to the
+            tool, e.g. from an endpoint without tool support, the request is
+            sent again without the tool and with these instructions appended
+            to the last message.
+        **params: Keyword arguments for messages.create.
+
+    Returns:
+        Tuple of (typed result, or None if no response called the tool; text
+        of the last response, for the caller's text parser in that case).
+    """
+    response = create_message(
+        client,
+        call_site,
+        on_api_call=on_api_call,
+        tools=[result_type.tool()],
+        tool_choice={"type": "tool", "name": result_type.TOOL_NAME},
+        **params,
+    )
+    result, text = _parse_response(response, result_type)
+
+    if result is None and fallback_prompt:
+        response = create_message(
+            client,
+            call_site,
+            on_api_call=on_api_call,
+            **_with_fallback_prompt(params, fallback_prompt),
+        )
+        text = _response_text(response)
+
+    return result, text
+
+
+def create_message_with_result(
+    client: anthropic.Anthropic,
+    call_site: str,
+    result_type: Type[T],
+    follow_up_prompt: str,
+    on_text: Optional[Callable[[str], None]] = None,
+    on_api_call: Optional[ApiCallListener] = None,
+    **params: Any,
+) -> Tuple[Optional[T], str, List[Any]]:
+    """Send a request whose text answer ends with a call to the result's tool.
+
+    The tool is offered with tool_choice 'auto', so the text before the call
+    can be streamed to ``on_text`` as usual. If the model stops without
+    calling the tool, a follow-up request with ``follow_up_prompt`` and the
+    text so far forces the call.
+
+    Args:
+        client: Anthropic client to use.
+        call_site: Name of the calling component.
+        result_type: StructuredResult subclass describing the tool's input.
+        follow_up_prompt: User message asking for the tool call; it should
+            also describe a text format for endpoints without tool support.
+        on_text: Optional callback for streamed text deltas.
+        on_api_call: Optional listener for the calls' metrics.
+        **params: Keyword arguments for messages.create / messages.stream.
+
+    Returns:
+        Tuple of (typed result, or None if no response called the tool; text
+        of the responses, for the caller's text parser in that case; the
+        responses, for token accounting).
+    """
+    response = create_message(
+        client,
+        call_site,
+        on_text=on_text,
+        on_api_call=on_api_call,
+        tools=[result_type.tool()],
+        tool_choice={"type": "auto"},
+        **params,
+    )
+    result, text = _parse_response(response, result_type)
+    if result is not None:
+        return result, text, [response]
+
+    follow_up = create_message(
+        client,
+        call_site,
+        on_api_call=on_api_call,
+        tools=[result_type.tool()],
+        tool_choice={"type": "tool", "name": result_type.TOOL_NAME},
+        **_with_follow_up(params, text, follow_up_prompt),
+    )
+    result, follow_up_text = _parse_response(follow_up, result_type)
+    return result, _join_text(text, follow_up_text), [response, follow_up]
+
+
+async def acreate_message_with_result(
+    client: anthropic.AsyncAnthropic,
+    call_site: str,
+    result_type: Type[T],
+    follow_up_prompt: str,
+    on_text: Optional[Callable[[str], None]] = None,
+    on_api_call: Optional[ApiCallListener] = None,
+    **params: Any,
+) -> Tuple[Optional[T], str, List[Any]]:
+    """Async counterpart of create_message_with_result() for AsyncAnthropic clients.
+
+    Args:
+        client: AsyncAnthropic client to use.
+        call_site: Name of the calling component.
+        result_type: StructuredResult subclass describing the tool's input.
+        follow_up_prompt: User message asking for the tool call.
+        on_text: Optional callback for streamed text deltas.
+        on_api_call: Optional listener for the calls' metrics.
+        **params: Keyword arguments for messages.create / messages.stream.
+
+    Returns:
+        Tuple of (typed result or None, text of the responses, the responses).
+    """
+    response = await acreate_message(
+        client,
+        call_site,
+        on_text=on_text,
+        on_api_call=on_api_call,
+        tools=[result_type.tool()],
+        tool_choice={"type": "auto"},
+        **params,
+    )
+    result, text = _parse_response(response, result_type)
+    if result is not None:
+        return result, text, [response]
+
+    follow_up = await acreate_message(
+        client,
+        call_site,
+        on_api_call=on_api_call,
+        tools=[result_type.tool()],
+        tool_choice={"type": "tool", "name": result_type.TOOL_NAME},
+        **_with_follow_up(params, text, follow_up_prompt),
+    )
+    result, follow_up_text = _parse_response(follow_up, result_type)
+    return result, _join_text(text, follow_up_text), [response, follow_up]
+
+
+def _parse_response(response: Any, result_type: Type[T]) -> Tuple[Optional[T], str]:
+    """Get the typed result and the text of a response.
+
+    Args:
+        response: Message from the API.
+        result_type: StructuredResult subclass to look for.
+
+    Returns:
+        Tuple of (typed result, or None if the response didn't call the
+        result's tool; text of the response).
+    """
+    for block in response.content:
+        if getattr(block, "type", "") == "tool_use" and block.name == result_type.TOOL_NAME:
+            data = block.input if isinstance(block.input, dict) else {}
+            return result_type.from_tool_input(data), _response_text(response)
+
+    return None, _response_text(response)
+
+
+def _response_text(response: Any) -> str:
+    return "".join(getattr(block, "text", "") for block in response.content)
+
+
+def _join_text(*texts: str) -> str:
+    return "\n\n".join(text.strip() for text in texts if text.strip())
+
+
+def _with_fallback_prompt(params: Dict[str, Any], fallback_prompt: str) -> Dict[str, Any]:
+    """Append text-format instructions to the last message of a request."""
+    messages = list(params.get("messages", []))
+    last = messages[-1]
+    messages[-1] = {"role": last["role"], "content": f"{last['content']}\n\n{fallback_prompt}"}
+    return dict(params, messages=messages)
+
+
+def _with_follow_up(params: Dict[str, Any], text: str, follow_up_prompt: str) -> Dict[str, Any]:
+    """Continue a request with its text answer and a prompt asking for the tool call."""
+    messages = list(params.get("messages", []))
+    if text.strip():
+        messages.append({"role": "assistant", "content": text.strip()})
+    messages.append({"role": "user", "content": follow_up_prompt})
+    return dict(params, messages=messages)
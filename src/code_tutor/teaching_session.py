@@ -1,6 +1,9 @@
 """Interactive teaching mode for learning through correcting mistakes."""
 
-from typing import Dict, List, Optional
+import random
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import ClassVar, Dict, List, Optional, Tuple
 import anthropic
 from rich.console import Console
 from rich.markdown import Markdown
@@ -8,12 +11,100 @@ from rich.panel import Panel
 from rich.prompt import Prompt, Confirm
 from rich.syntax import Syntax
 
+from .client import ApiCallListener, get_client
 from .config import ConfigManager
 from .logger import SessionLogger
+from .round_history import RoundHistory
+from .structured_output import StructuredResult, create_structured_message
+from .topic_library import TopicLibrary
+
+
+@dataclass
+class FlawedCode(StructuredResult):
+    """Flawed code for a teaching round, with the student's question about it."""
+
+    code: str = ""
+    student_question: str = ""
+    issues: List[str] = field(default_factory=list)
+
+    TOOL_NAME: ClassVar[str] = "present_flawed_code"
+    TOOL_DESCRIPTION: ClassVar[str] = "Present the student's flawed code and their question about it."
+    SCHEMA: ClassVar[Dict] = {
+        "type": "object",
+        "properties": {
+            "code": {
+                "type": "string",
+                "description": "The flawed code only, without Markdown fences.",
+            },
+            "student_question": {
+                "type": "string",
+                "description": "The student's authentic message asking for help.",
+            },
+            "issues": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "What is wrong with the code, for internal tracking.",
+            },
+        },
+        "required": ["code", "student_question", "issues"],
+    }
+
+
+@dataclass
+class HintEvaluation(StructuredResult):
+    """The student's reaction to the user's hints."""
+
+    student_response: str = ""
+    teaching_assessment: str = ""
+    understanding_achieved: bool = False
+
+    TOOL_NAME: ClassVar[str] = "respond_to_hints"
+    TOOL_DESCRIPTION: ClassVar[str] = "Respond, as the student, to the teacher's hints."
+    SCHEMA: ClassVar[Dict] = {
+        "type": "object",
+        "properties": {
+            "student_response": {
+                "type": "string",
+                "description": "The student's in-character reaction to the hints (Markdown).",
+            },
+            "teaching_assessment": {
+                "type": "string",
+                "description": "Brief note on the teaching quality of the hints (Markdown).",
+            },
+            "understanding_achieved": {
+                "type": "boolean",
+                "description": "True if the student has reached understanding through the hints.",
+            },
+        },
+        "required": ["student_response", "teaching_assessment", "understanding_achieved"],
+    }
+
+    @property
+    def feedback(self) -> str:
+        """The response and assessment as Markdown for display."""
+        return (
+            f"## Student Response\n{self.student_response}\n\n"
+            f"## Teaching Quality Assessment\n{self.teaching_assessment}"
+        )
 
 
 class TeachingSession:
-    """Manages an interactive teaching session using the Socratic method."""
+    """Manages an interactive teaching session using the Socratic method.
+
+    While the user is typing their hints, the flawed code for the next round
+    is generated in the background for both possible outcomes: a new
+    problem if the student reaches understanding, and a related example if
+    they need more guidance. The branch matching the evaluation is shown
+    immediately and the other is discarded.
+
+    Rounds showing a new problem are served from the topic library first,
+    when it has examples for the topic, language and level that this user
+    hasn't seen, so only the evaluation goes to the API.
+    """
+
+    # Next-round branches generated speculatively
+    BRANCH_NEW_PROBLEM = "new_problem"
+    BRANCH_RELATED_EXAMPLE = "related_example"
 
     def __init__(self, config_manager: ConfigManager, console: Optional[Console] = None):
         """Initialize a teaching session.
@@ -26,18 +117,32 @@ class TeachingSession:
         self.console = console or Console()
         self.client: Optional[anthropic.Anthropic] = None
         self.model: str = ""
-        self.conversation_history: List[Dict[str, str]] = []
+        self.conversation_history = RoundHistory(
+            int(self.config.get(
+                "teaching.history_rounds", RoundHistory.DEFAULT_KEEP_RECENT_ROUNDS
+            ))
+        )
         self.topic: str = ""
         self.round_number: int = 0
         self.max_rounds: int = 5
 
-        # Initialize logger if enabled
+        # Speculatively generated next rounds: branch -> future of (prompt, response)
+        self.prefetch_enabled = bool(self.config.get("teaching.prefetch_next_round", True))
+        self._prefetch_executor: Optional[ThreadPoolExecutor] = None
+        self._prefetched: Dict[str, Future] = {}
+
+        # Topic library examples for this session's topic the user hasn't seen
+        self.use_library = bool(self.config.get("teaching.use_library", True))
+        self.library: Optional[TopicLibrary] = None
+        self.library_examples: List[Dict] = []
+
+        # Initialize logger if enabled; API calls are reported to this session's logger only
         self.logger: Optional[SessionLogger] = None
+        self.on_api_call: Optional[ApiCallListener] = None
         if self.config.is_logging_enabled():
-            self.logger = SessionLogger(
-                config_dir=self.config.config_dir,
-                enabled=True
-            )
+            self.logger = SessionLogger.from_config(self.config)
+            if self.config.should_log_api_calls():
+                self.on_api_call = self.logger.log_api_call
 
     def start_session(self) -> None:
         """Start an interactive teaching session."""
@@ -49,7 +154,7 @@ class TeachingSession:
             experience_level = self.config.get("experience_level", "intermediate")
 
             # Initialize client
-            self.client = anthropic.Anthropic(api_key=api_key)
+            self.client = get_client(api_key, self.config)
 
             # Welcome message
             self._display_welcome()
@@ -60,6 +165,12 @@ class TeachingSession:
             # Get programming language preference
             language = self._get_language()
 
+            if self.use_library:
+                self.library = TopicLibrary.from_config(self.config)
+                self.library_examples = self.library.examples(
+                    self.topic, language, experience_level
+                )
+
             # Start session logging
             if self.logger:
                 self.logger.start_session("teaching", {
@@ -67,6 +178,7 @@ class TeachingSession:
                     "language": language,
                     "experience_level": experience_level,
                     "model": self.model,
+                    "library_examples": len(self.library_examples),
                 })
 
             # Start the teaching rounds
@@ -154,121 +266,342 @@ class TeachingSession:
             language: Programming language to use.
         """
         self.round_number = 0
+        branch = None
 
-        while self.round_number < self.max_rounds:
-            self.round_number += 1
+        try:
+            while self.round_number < self.max_rounds:
+                self.round_number += 1
+
+                self.console.print(f"\n[cyan]{'='*60}[/cyan]")
+                self.console.print(f"[bold cyan]Round {self.round_number}[/bold cyan]")
+                self.console.print(f"[cyan]{'='*60}[/cyan]\n")
+
+                # Serve a new problem from the library, else use the prefetched round
+                code_data = None
+                if branch != self.BRANCH_RELATED_EXAMPLE:
+                    code_data = self._take_library_example(experience_level, language)
+                if code_data is not None:
+                    self._discard_prefetched()
+                elif branch:
+                    code_data = self._take_prefetched(branch)
+                if code_data is None:
+                    code_data = self._generate_flawed_code(experience_level, language, branch)
+
+                if not code_data:
+                    self.console.print("[yellow]Failed to generate code. Ending session.[/yellow]")
+                    break
 
-            self.console.print(f"\n[cyan]{'='*60}[/cyan]")
-            self.console.print(f"[bold cyan]Round {self.round_number}[/bold cyan]")
-            self.console.print(f"[cyan]{'='*60}[/cyan]\n")
+                # Display the code and student question
+                self._display_code(code_data["code"], code_data.get("student_question", ""), language)
 
-            # Generate flawed code
-            code_data = self._generate_flawed_code(experience_level, language)
+                # Prepare both possible next rounds while the user is typing
+                if self.round_number < self.max_rounds:
+                    self._prefetch_next_round(experience_level, language)
 
-            if not code_data:
-                self.console.print("[yellow]Failed to generate code. Ending session.[/yellow]")
-                break
+                # Get user's explanation
+                explanation = self._get_user_explanation()
 
-            # Display the code and student question
-            self._display_code(code_data["code"], code_data.get("student_question", ""), language)
+                if not explanation.strip():
+                    self.console.print("[yellow]Skipping this round...[/yellow]")
+                    self.conversation_history.end_round(self.round_number, code_data["issues"])
+                    branch = self.BRANCH_NEW_PROBLEM
+                    continue
 
-            # Get user's explanation
-            explanation = self._get_user_explanation()
+                # Evaluate the explanation
+                evaluation = self._evaluate_explanation(
+                    code_data["code"],
+                    code_data["issues"],
+                    explanation,
+                    experience_level,
+                    language
+                )
 
-            if not explanation.strip():
-                self.console.print("[yellow]Skipping this round...[/yellow]")
-                continue
+                # Display evaluation
+                self._display_evaluation(evaluation)
+
+                # Log the teaching round
+                if self.logger and self.config.should_log_interactions():
+                    self.logger.log_teaching_round(
+                        self.round_number,
+                        self.topic,
+                        language,
+                        code_data["code"],
+                        explanation,
+                        evaluation.get("feedback", ""),
+                        understanding_achieved=evaluation.get("understanding_achieved", False),
+                        student_question=code_data.get("student_question", ""),
+                        issues=code_data["issues"],
+                        experience_level=experience_level,
+                    )
+
+                self.conversation_history.end_round(
+                    self.round_number,
+                    code_data["issues"],
+                    explanation,
+                    evaluation.get("understanding_achieved", False),
+                )
+
+                # Check if we should continue
+                if evaluation.get("understanding_achieved", False):
+                    self.console.print(
+                        "\n[green]Great teaching! The student has reached understanding through your hints.[/green]"
+                    )
+
+                    if not Confirm.ask("\n[cyan]Help another student with a new problem?[/cyan]", default=True):
+                        break
+                    branch = self.BRANCH_NEW_PROBLEM
+                else:
+                    self.console.print(
+                        "\n[yellow]The student needs more guidance. Let's try another related example...[/yellow]"
+                    )
+                    branch = self.BRANCH_RELATED_EXAMPLE
+        finally:
+            self._discard_prefetched()
+            if self._prefetch_executor is not None:
+                self._prefetch_executor.shutdown(wait=False, cancel_futures=True)
+                self._prefetch_executor = None
+
+    def _generate_flawed_code(
+        self, experience_level: str, language: str, branch: Optional[str] = None
+    ) -> Optional[Dict]:
+        """Generate code with intentional, instructive mistakes.
 
-            # Evaluate the explanation
-            evaluation = self._evaluate_explanation(
-                code_data["code"],
-                code_data["issues"],
-                explanation,
+        Args:
+            experience_level: User's experience level.
+            language: Programming language.
+            branch: How the previous round ended (BRANCH_NEW_PROBLEM or
+                BRANCH_RELATED_EXAMPLE), or None for the first round.
+
+        Returns:
+            Dictionary with code and issues, or None if failed.
+        """
+        try:
+            prompt, content, code_data = self._request_flawed_code(
                 experience_level,
-                language
+                language,
+                self.round_number,
+                branch,
+                self.conversation_history.messages(),
+                "TeachingSession.generate_flawed_code",
             )
+        except Exception as e:
+            self.console.print(f"[red]Error generating code:[/red] {e}")
+            return None
 
-            # Display evaluation
-            self._display_evaluation(evaluation)
+        return self._accept_flawed_code(prompt, content, code_data)
 
-            # Log the teaching round
-            if self.logger and self.config.should_log_interactions():
-                self.logger.log_teaching_round(
-                    self.round_number,
-                    self.topic,
-                    language,
-                    code_data["code"],
-                    explanation,
-                    evaluation.get("feedback", "")
-                )
+    def _request_flawed_code(
+        self,
+        experience_level: str,
+        language: str,
+        round_number: int,
+        branch: Optional[str],
+        history: List[Dict[str, str]],
+        call_site: str,
+    ) -> Tuple[str, str, Dict]:
+        """Request flawed code from the API without touching session state.
 
-            # Check if we should continue
-            if evaluation.get("understanding_achieved", False):
-                self.console.print(
-                    "\n[green]Great teaching! The student has reached understanding through your hints.[/green]"
-                )
+        Safe to call from a background thread.
 
-                if not Confirm.ask("\n[cyan]Help another student with a new problem?[/cyan]", default=True):
-                    break
-            else:
-                self.console.print(
-                    "\n[yellow]The student needs more guidance. Let's try another related example...[/yellow]"
-                )
+        Args:
+            experience_level: User's experience level.
+            language: Programming language.
+            round_number: Round the code is for.
+            branch: How the previous round ended, or None for the first round.
+            history: Conversation so far (not modified).
+            call_site: Name the call is instrumented under.
 
-    def _generate_flawed_code(self, experience_level: str, language: str) -> Optional[Dict]:
-        """Generate code with intentional, instructive mistakes.
+        Returns:
+            Tuple of (prompt, reply for the conversation history, dictionary
+            with code, student_question, and issues).
+        """
+        prompt = self._build_code_generation_prompt(
+            experience_level, language, round_number, branch
+        )
+        result, text = create_structured_message(
+            self.client,
+            call_site,
+            FlawedCode,
+            on_api_call=self.on_api_call,
+            fallback_prompt=self._build_code_fallback_prompt(language),
+            model=self.model,
+            max_tokens=2048,
+            messages=history + [{"role": "user", "content": prompt}],
+        )
+
+        # Fall back to the Markdown format if the response wasn't a tool call
+        if result is None:
+            return prompt, text, self._parse_code_response(text)
+        return prompt, result.to_message(), result.to_dict()
+
+    def _accept_flawed_code(self, prompt: str, content: str, code_data: Dict) -> Dict:
+        """Record a flawed-code exchange in the conversation.
+
+        Args:
+            prompt: Prompt that generated the code.
+            content: Reply to store in the conversation history.
+            code_data: The parsed flawed code.
+
+        Returns:
+            The code_data dictionary.
+        """
+        # Store in conversation history as the start of a new round
+        self.conversation_history.start_round()
+        self.conversation_history.append({"role": "user", "content": prompt})
+        self.conversation_history.append({"role": "assistant", "content": content})
+
+        return code_data
+
+    def _prefetch_next_round(self, experience_level: str, language: str) -> None:
+        """Start generating both possible next rounds in the background.
+
+        The requests see the conversation up to the current round's code;
+        the evaluation isn't known yet, which is what the branch-specific
+        prompts account for.
 
         Args:
             experience_level: User's experience level.
             language: Programming language.
+        """
+        if not self.prefetch_enabled:
+            return
+
+        # A new problem would come from the library; only a related example is needed
+        branches = [self.BRANCH_RELATED_EXAMPLE]
+        if not self.library_examples:
+            branches.insert(0, self.BRANCH_NEW_PROBLEM)
+
+        self._discard_prefetched()
+        if self._prefetch_executor is None:
+            self._prefetch_executor = ThreadPoolExecutor(max_workers=2)
+
+        history = self.conversation_history.messages()
+        for branch in branches:
+            self._prefetched[branch] = self._prefetch_executor.submit(
+                self._request_flawed_code,
+                experience_level,
+                language,
+                self.round_number + 1,
+                branch,
+                history,
+                "TeachingSession.prefetch_flawed_code",
+            )
+
+    def _take_prefetched(self, branch: str) -> Optional[Dict]:
+        """Use the prefetched round for a branch and discard the other.
+
+        Waits for the prefetch if it is still running.
+
+        Args:
+            branch: Branch the session is taking.
 
         Returns:
-            Dictionary with code and issues, or None if failed.
+            Parsed flawed code, or None if nothing was prefetched or the
+            prefetch failed (the caller then generates it directly).
         """
-        prompt = self._build_code_generation_prompt(experience_level, language)
+        future = self._prefetched.pop(branch, None)
+        self._discard_prefetched()
+        if future is None:
+            return None
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=2048,
-                messages=self.conversation_history + [{"role": "user", "content": prompt}],
-            )
+            prompt, content, code_data = future.result()
+        except Exception:
+            return None
 
-            content = response.content[0].text
+        return self._accept_flawed_code(prompt, content, code_data)
 
-            # Store in conversation history
-            self.conversation_history.append({"role": "user", "content": prompt})
-            self.conversation_history.append({"role": "assistant", "content": content})
+    def _take_library_example(self, experience_level: str, language: str) -> Optional[Dict]:
+        """Take an unseen topic library example for the current round.
 
-            return self._parse_code_response(content)
+        One of the examples closest to the current round's difficulty is
+        picked at random, recorded as seen by this user, and added to the
+        conversation as if it had been generated.
 
-        except Exception as e:
-            self.console.print(f"[red]Error generating code:[/red] {e}")
+        Args:
+            experience_level: User's experience level.
+            language: Programming language.
+
+        Returns:
+            Dictionary with code, student_question, and issues, or None if
+            the library has no more examples for this session.
+        """
+        if not self.library_examples:
             return None
 
-    def _build_code_generation_prompt(self, experience_level: str, language: str) -> str:
+        def distance(entry: Dict) -> int:
+            return abs(int(entry.get("round_number", 1)) - self.round_number)
+
+        closest = min(distance(entry) for entry in self.library_examples)
+        example = random.choice(
+            [entry for entry in self.library_examples if distance(entry) == closest]
+        )
+        self.library_examples.remove(example)
+        if self.library is not None:
+            try:
+                self.library.mark_served([example["id"]])
+            except OSError:
+                pass
+
+        result = FlawedCode.from_tool_input(example)
+        prompt = self._build_code_generation_prompt(experience_level, language)
+        return self._accept_flawed_code(prompt, result.to_message(), result.to_dict())
+
+    def _discard_prefetched(self) -> None:
+        """Drop prefetched rounds, cancelling those that haven't started."""
+        for future in self._prefetched.values():
+            future.cancel()
+        self._prefetched = {}
+
+    def _build_code_generation_prompt(
+        self,
+        experience_level: str,
+        language: str,
+        round_number: Optional[int] = None,
+        branch: Optional[str] = None,
+    ) -> str:
         """Build prompt for generating flawed code.
 
         Args:
             experience_level: User's experience level.
             language: Programming language.
+            round_number: Round the code is for; defaults to the current round.
+            branch: How the previous round ended (BRANCH_NEW_PROBLEM or
+                BRANCH_RELATED_EXAMPLE), or None.
 
         Returns:
             The prompt string.
         """
-        if self.round_number == 1:
+        if round_number is None:
+            round_number = self.round_number
+
+        if round_number == 1:
             # First round - introduce the concept with a clear mistake
             difficulty = "obvious but instructive"
-        elif self.round_number <= 3:
+        elif round_number <= 3:
             # Middle rounds - more subtle mistakes
             difficulty = "subtle and thought-provoking"
         else:
             # Later rounds - nuanced mistakes
             difficulty = "nuanced and requiring deep understanding"
 
+        if branch == self.BRANCH_NEW_PROBLEM:
+            context = (
+                "The previous student understood their mistake. You are a new student with a "
+                "DIFFERENT misconception than the ones already discussed.\n\n"
+            )
+        elif branch == self.BRANCH_RELATED_EXAMPLE:
+            context = (
+                "The previous student still needs more guidance. Show the SAME misconception "
+                "in a new, related example from a different angle, so the teacher can build "
+                "on their earlier hints.\n\n"
+            )
+        else:
+            context = ""
+
         return f"""You are roleplaying as a {experience_level} programmer student who needs help with {self.topic}.
 
-Your task: Create a SHORT code example in {language} (5-15 lines) that demonstrates a {difficulty} mistake related to {self.topic}.
+{context}Your task: Create a SHORT code example in {language} (5-15 lines) that demonstrates a {difficulty} mistake related to {self.topic}.
 
 The mistake should be:
 1. Instructive - teaches an important concept
@@ -276,28 +609,43 @@ The mistake should be:
 3. Realistic - something a real programmer might do
 4. Focused - demonstrates ONE specific misconception
 
-Format your response as:
+Present it by calling the {FlawedCode.TOOL_NAME} tool with:
+- code: your flawed code, without Markdown fences
+- student_question: a short, authentic message from the student perspective. Include:
+  - What they were trying to accomplish
+  - What happened when they ran it (error message, unexpected output, or weird behavior)
+  - A specific question asking for help
+  Example: "I tried running this code to X, but I got this error: [error message]. Can you help me understand what's going wrong?"
+- issues: what's wrong with the code, one item per issue - this is for your internal tracking
+
+Remember: Make the student question authentic and include helpful hints like error messages or unexpected behavior!"""
+
+    @staticmethod
+    def _build_code_fallback_prompt(language: str) -> str:
+        """Build the Markdown format for flawed code, for endpoints without tool support.
+
+        Args:
+            language: Programming language.
+
+        Returns:
+            The format instructions.
+        """
+        return f"""If you can't call tools, format your response as:
 ## Code
 ```{language.lower()}
 [your flawed code here]
 ```
 
 ## Student Question
-[Write a short, authentic message from the student perspective. Include:
-- What they were trying to accomplish
-- What happened when they ran it (error message, unexpected output, or weird behavior)
-- A specific question asking for help
-Example: "I tried running this code to X, but I got this error: [error message]. Can you help me understand what's going wrong?"]
+[The student's message]
 
 ## Hidden Issues
 [Bullet list of what's wrong - this is for your internal tracking]
 - Issue 1
-- Issue 2
-
-Remember: Make the student question authentic and include helpful hints like error messages or unexpected behavior!"""
+- Issue 2"""
 
     def _parse_code_response(self, response: str) -> Dict:
-        """Parse the code generation response.
+        """Parse a code generation response given as Markdown instead of a tool call.
 
         Args:
             response: Raw response from Claude.
@@ -424,38 +772,55 @@ Evaluate the teacher's hints:
 3. Did they ask good guiding questions that promote discovery?
 4. How well did they balance between being helpful and letting you learn?
 
-Respond as the student, staying in character:
+Respond as the student, staying in character, by calling the {HintEvaluation.TOOL_NAME} tool with:
+- student_response: your reaction to their hints. If the hints were good, show you're getting closer to understanding. If they directly gave the answer, acknowledge you got it but note it would have been better to discover it yourself. If hints were too vague, ask for clarification.
+- teaching_assessment: a brief internal note on teaching quality: Were the hints appropriately scaffolded? Did they promote active learning?
+- understanding_achieved: true if the student has reached understanding through good hints, false if more scaffolding is needed"""
+
+        fallback_prompt = """If you can't call tools, format your response as:
 
 ## Student Response
-[React to their hints. If the hints were good, show you're getting closer to understanding. If they directly gave the answer, acknowledge you got it but note it would have been better to discover it yourself. If hints were too vague, ask for clarification.]
+[Your reaction to their hints]
 
 ## Teaching Quality Assessment
-[Brief internal note on teaching quality: Were the hints appropriately scaffolded? Did they promote active learning?]
+[Brief internal note on teaching quality]
 
 ## Understanding Achieved
 [YES if the student has reached understanding through good hints, NO if more scaffolding is needed]"""
 
         try:
-            response = self.client.messages.create(
+            result, content = create_structured_message(
+                self.client,
+                "TeachingSession.evaluate_explanation",
+                HintEvaluation,
+                on_api_call=self.on_api_call,
+                fallback_prompt=fallback_prompt,
                 model=self.model,
                 max_tokens=1024,
-                messages=self.conversation_history + [{"role": "user", "content": prompt}],
+                messages=self.conversation_history.messages() + [{"role": "user", "content": prompt}],
             )
 
-            content = response.content[0].text
+            if result is None:
+                evaluation = self._parse_evaluation_response(content)
+            else:
+                content = result.to_message()
+                evaluation = {
+                    "understanding_achieved": result.understanding_achieved,
+                    "feedback": result.feedback,
+                }
 
             # Store in history
             self.conversation_history.append({"role": "user", "content": prompt})
             self.conversation_history.append({"role": "assistant", "content": content})
 
-            return self._parse_evaluation_response(content)
+            return evaluation
 
         except Exception as e:
             self.console.print(f"[red]Error evaluating explanation:[/red] {e}")
             return {"understanding_achieved": False, "feedback": "Error occurred"}
 
     def _parse_evaluation_response(self, response: str) -> Dict:
-        """Parse the evaluation response.
+        """Parse an evaluation response given as Markdown instead of a tool call.
 
         Args:
             response: Raw response from Claude.
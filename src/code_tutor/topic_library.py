@@ -0,0 +1,300 @@
+"""Library of vetted flawed-code examples served by 'teach-me' before the API."""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .config import ConfigManager
+from .fileutil import atomic_write_text, locked
+
+
+class TopicLibrary:
+    """Versioned library of flawed-code examples per topic, language and level.
+
+    Each library is a single JSON file holding a version number, bumped on
+    every build, and a list of examples (code, student question and hidden
+    issues, as produced by TeachingSession). The user library in the config
+    directory is grown by build() from logged teaching rounds; a system-wide
+    library in /etc/code-tutor (e.g. curated for a course) is read after it.
+
+    Only rounds whose hints led the simulated student to understanding are
+    added, so every example has been through a successful round before.
+
+    The IDs of examples this user has already seen, whether served by
+    'teach-me' or added by build() from their own rounds, are kept in a
+    separate file in the config directory and left out of examples().
+    """
+
+    LIBRARY_FILE = "topic_library.json"
+    SERVED_FILE = "topic_library_served.json"
+    LOCK_FILE = "topic_library.lock"
+    FORMAT_VERSION = 1
+    DEFAULT_MAX_PER_SLOT = 10
+
+    def __init__(
+        self,
+        config_dir: Optional[Path] = None,
+        system_dir: Optional[Path] = ConfigManager.SYSTEM_CONFIG_DIR,
+    ):
+        """Initialize the topic library.
+
+        Args:
+            config_dir: Optional custom configuration directory path.
+            system_dir: Directory of the read-only system library, or None
+                to use the user library only.
+        """
+        if config_dir is None:
+            config_dir = Path.home() / ".config" / "code-tutor"
+
+        self.config_dir = config_dir
+        self.library_file = config_dir / self.LIBRARY_FILE
+        self.served_file = config_dir / self.SERVED_FILE
+        self.system_file = system_dir / self.LIBRARY_FILE if system_dir else None
+
+    @classmethod
+    def from_config(cls, config_manager: ConfigManager) -> "TopicLibrary":
+        """Create a library for the directory of a configuration.
+
+        Args:
+            config_manager: Loaded configuration manager.
+
+        Returns:
+            Configured TopicLibrary.
+        """
+        return cls(config_dir=config_manager.config_dir)
+
+    @staticmethod
+    def make_key(topic: str, language: str, level: str) -> str:
+        """Build the slot key for a topic, language and level.
+
+        Args:
+            topic: Teaching topic (compared case-insensitively).
+            language: Programming language (compared case-insensitively).
+            level: Experience level.
+
+        Returns:
+            Key identifying the slot.
+        """
+        return json.dumps([
+            " ".join(topic.lower().split()),
+            language.lower().strip(),
+            level.lower().strip(),
+        ])
+
+    @staticmethod
+    def _load(path: Optional[Path]) -> Dict[str, Any]:
+        """Read a library file.
+
+        Args:
+            path: Library file, or None.
+
+        Returns:
+            The library, or an empty version 0 library if it is missing or unreadable.
+        """
+        empty = {"format": TopicLibrary.FORMAT_VERSION, "version": 0, "entries": []}
+        if path is None or not path.exists():
+            return empty
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                library = json.load(f)
+        except (IOError, json.JSONDecodeError):
+            return empty
+        if library.get("format") != TopicLibrary.FORMAT_VERSION:
+            return empty
+        return library
+
+    @property
+    def version(self) -> int:
+        """Version of the user library (0 if it hasn't been built)."""
+        return int(self._load(self.library_file).get("version", 0))
+
+    def examples(self, topic: str, language: str, level: str) -> List[Dict[str, Any]]:
+        """Get the examples for a topic, language and level this user hasn't seen.
+
+        Args:
+            topic: Teaching topic.
+            language: Programming language.
+            level: Experience level.
+
+        Returns:
+            Example dictionaries with id, code, student_question, issues and
+            round_number; user library examples first.
+        """
+        key = self.make_key(topic, language, level)
+        examples = []
+        seen = self.served_ids()
+        for path in (self.library_file, self.system_file):
+            for entry in self._load(path).get("entries", []):
+                entry_id = entry.get("id") or self._code_id(entry.get("code", ""))
+                if self._entry_key(entry) != key or entry_id in seen:
+                    continue
+                seen.add(entry_id)
+                examples.append(dict(entry, id=entry_id))
+        return examples
+
+    def served_ids(self) -> Set[str]:
+        """Get the IDs of the examples this user has already seen.
+
+        Returns:
+            Set of example IDs.
+        """
+        try:
+            with open(self.served_file, "r", encoding="utf-8") as f:
+                served = json.load(f)
+        except (IOError, json.JSONDecodeError):
+            return set()
+        return set(served) if isinstance(served, dict) else set()
+
+    def mark_served(self, entry_ids: Iterable[str]) -> None:
+        """Record examples as seen so that examples() leaves them out.
+
+        Args:
+            entry_ids: IDs of the examples.
+        """
+        self.config_dir.mkdir(parents=True, exist_ok=True)
+        lock_path = self.config_dir / self.LOCK_FILE
+
+        with open(lock_path, "a") as lock_file, locked(lock_file):
+            self._mark_served(entry_ids)
+
+    def _mark_served(self, entry_ids: Iterable[str]) -> None:
+        """Record examples as seen; must be called with the library lock held."""
+        try:
+            with open(self.served_file, "r", encoding="utf-8") as f:
+                served = json.load(f)
+        except (IOError, json.JSONDecodeError):
+            served = {}
+        if not isinstance(served, dict):
+            served = {}
+
+        now = datetime.utcnow().isoformat()
+        for entry_id in entry_ids:
+            served.setdefault(entry_id, now)
+        atomic_write_text(self.served_file, json.dumps(served))
+
+    def slots(self) -> List[Dict[str, Any]]:
+        """List the topics in the libraries with the number of examples each.
+
+        Returns:
+            Dictionaries with topic, language, level, user and system
+            counts, sorted by topic.
+        """
+        slots: Dict[str, Dict[str, Any]] = {}
+        for source, path in (("user", self.library_file), ("system", self.system_file)):
+            for entry in self._load(path).get("entries", []):
+                slot = slots.setdefault(self._entry_key(entry), {
+                    "topic": entry["topic"],
+                    "language": entry["language"],
+                    "level": entry["level"],
+                    "user": 0,
+                    "system": 0,
+                })
+                slot[source] += 1
+
+        return sorted(
+            slots.values(), key=lambda slot: (slot["topic"].lower(), slot["language"], slot["level"])
+        )
+
+    def build(
+        self,
+        events: Iterable[Dict[str, Any]],
+        max_per_slot: int = DEFAULT_MAX_PER_SLOT,
+    ) -> int:
+        """Add logged teaching rounds to the user library and bump its version.
+
+        The rounds come from this user's logs, so their examples are also
+        recorded as already seen by this user.
+
+        Args:
+            events: Logged 'teaching_round' events. Rounds that didn't reach
+                understanding, or that were logged without their issues and
+                experience level, are skipped.
+            max_per_slot: Maximum examples kept per topic, language and level.
+
+        Returns:
+            Number of examples added.
+        """
+        self.config_dir.mkdir(parents=True, exist_ok=True)
+        lock_path = self.config_dir / self.LOCK_FILE
+
+        with open(lock_path, "a") as lock_file, locked(lock_file):
+            library = self._load(self.library_file)
+            entries = library.get("entries", [])
+            ids = {entry["id"] for entry in entries}
+            counts: Dict[str, int] = {}
+            for entry in entries:
+                key = self._entry_key(entry)
+                counts[key] = counts.get(key, 0) + 1
+
+            added = 0
+            logged_ids = set()
+            for event in events:
+                entry = self._entry_from_event(event)
+                if entry is not None:
+                    logged_ids.add(entry["id"])
+                if entry is None or entry["id"] in ids:
+                    continue
+                key = self._entry_key(entry)
+                if counts.get(key, 0) >= max_per_slot:
+                    continue
+
+                entries.append(entry)
+                ids.add(entry["id"])
+                counts[key] = counts.get(key, 0) + 1
+                added += 1
+
+            if added:
+                library = {
+                    "format": self.FORMAT_VERSION,
+                    "version": int(library.get("version", 0)) + 1,
+                    "built_at": datetime.utcnow().isoformat(),
+                    "entries": entries,
+                }
+                atomic_write_text(self.library_file, json.dumps(library, indent=2))
+
+            if logged_ids:
+                self._mark_served(logged_ids)
+
+        return added
+
+    def _entry_key(self, entry: Dict[str, Any]) -> str:
+        return self.make_key(entry["topic"], entry["language"], entry["level"])
+
+    @staticmethod
+    def _code_id(code: str) -> str:
+        return hashlib.sha256(" ".join(code.split()).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _entry_from_event(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Turn a logged teaching round into a library example.
+
+        Args:
+            event: A 'teaching_round' event.
+
+        Returns:
+            Example dictionary, or None if the round doesn't qualify.
+        """
+        code = (event.get("flawed_code") or "").strip()
+        if not (
+            event.get("understanding_achieved")
+            and code
+            and event.get("issues")
+            and event.get("experience_level")
+            and event.get("topic")
+            and event.get("language")
+        ):
+            return None
+
+        return {
+            "id": TopicLibrary._code_id(code),
+            "topic": event["topic"],
+            "language": event["language"],
+            "level": event["experience_level"],
+            "round_number": event.get("round_number", 1),
+            "code": code,
+            "student_question": event.get("student_question", ""),
+            "issues": list(event["issues"]),
+            "added_at": datetime.utcnow().isoformat(),
+        }